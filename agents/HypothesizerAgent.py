@@ -3,6 +3,7 @@
 
 import os
 from discoveryworld.DiscoveryWorldAPI import DiscoveryWorldAPI
+from discoveryworld.ObservationConfig import ObservationConfig
 from discoveryworld.ScenarioMaker import ScenarioMaker, SCENARIOS, SCENARIO_NAMES, SCENARIO_INFOS, SCENARIO_DIFFICULTY_OPTIONS, getInternalScenarioName
 
 import openai
@@ -426,17 +427,15 @@ def GPT4HypothesizerOneStep(api, client, lastActionHistory, lastObservation, cur
     print(promptStr)
     print("---------------------------------------")
 
-    imageWithGrid = observation["vision"]["base64_with_grid"]
-    promptImages = [imageWithGrid]
-
-    # last image (if available)
+    promptImages = None
     lastImage = None
-    if (lastObservation != None):
-        lastImage = lastObservation["vision"]["base64_with_grid"]
+    if (includeImages == True):
+        imageWithGrid = observation["vision"]["base64_with_grid"]
+        promptImages = [imageWithGrid]
 
-    if (includeImages == False):
-        promptImages = None
-        lastImage = None
+        # last image (if available)
+        if (lastObservation != None):
+            lastImage = lastObservation["vision"]["base64_with_grid"]
 
     response = OpenAIGetCompletion(client, promptStr=promptStr, promptImages=promptImages, model=OPENAI_MODEL_TO_USE, prevImage=lastImage, temperature=0.1, maxTokens=800)
     print(response)
@@ -980,6 +979,10 @@ def runHypothesizerAgent(scenarioName:str, difficultyStr:str, seed:int=0, numSte
         print("Error: Could not load scenario '" + scenarioName + "' with difficulty '" + difficultyStr + "'.")
         return None
 
+    # Text-only runs don't need the images in the observations (the frames are still saved if a video is being exported)
+    if (includeImages == False):
+        api.setObservationConfig(ObservationConfig(vision=ObservationConfig.VISION_OFF, saveFrames=exportVideo))
+
     startTime = time.time()
     # Hypothesizer
     logFileSuffix = "." + scenarioName + "-" + difficultyStr + "-s" + str(seed) + "-images" + str(includeImages) + "-model" + OPENAI_MODEL_TO_USE + "-thread" + str(api.THREAD_ID)
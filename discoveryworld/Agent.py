@@ -18,6 +18,11 @@ from discoveryworld.objects import QuantumCrystal
 #   Agent (controlled by a user or model)
 #
 class Agent(Object):
+    # Whether this agent is controlled by the simulation (i.e. an NPC), rather than a user.  (Not every NPC sets the 'isNPC' attribute, so this is also tracked by class.)
+    controlledBySimulation = False
+    # Whether this agent can be simulated at a lower level of detail when it's far from every user agent (see World.setNPCLevelOfDetail())
+    supportsLevelOfDetail = False
+
     # Constructor
     def __init__(self, world, objectType="agent", objectName="agent", defaultSpriteName="character18_agent_facing_south"):
         # Default sprite name
@@ -34,7 +39,7 @@ class Agent(Object):
         self.knowledgeScorer = KnowledgeScorer(self.world)
 
         # Autopilot action queue and pathfinder
-        self.autopilotActionQueue = []                              # Queue of autopilot actions
+        self.autopilotActionQueue = AutopilotActionQueue()          # Queue of autopilot actions
         self.pathfinder = Pathfinder()
         self.actionTimestampCounter = 0                             # Counter for the timestamp of the last action
 
@@ -228,21 +233,28 @@ class Agent(Object):
 
                 # Pack the objects into the list, using a more minimal representation containing the name, uuid, description, and direction relative to the agent (north/east/south/west, or 'same' if the object is at the same location as the agent)
                 for obj in objsAtLocation:
+                    # Get the object's location (objects shared by every tile that hasn't been written to, like grass, aren't on any one tile -- see World.addDefaultObject())
+                    objX = obj.attributes["gridX"]
+                    objY = obj.attributes["gridY"]
+                    if (self.world.isDefaultObject(obj)):
+                        objX = x
+                        objY = y
+
                     # Get the direction relative to the agent
                     directions = []
-                    if (obj.attributes["gridY"] < self.attributes["gridY"]):
+                    if (objY < self.attributes["gridY"]):
                         directions.append("north")
-                    elif (obj.attributes["gridY"] > self.attributes["gridY"]):
+                    elif (objY > self.attributes["gridY"]):
                         directions.append("south")
-                    if (obj.attributes["gridX"] < self.attributes["gridX"]):
+                    if (objX < self.attributes["gridX"]):
                         directions.append("west")
-                    elif (obj.attributes["gridX"] > self.attributes["gridX"]):
+                    elif (objX > self.attributes["gridX"]):
                         directions.append("east")
                     if (len(directions) == 0):
                         directions.append("same_location")
 
                     # Distance
-                    distance = abs(obj.attributes["gridX"] - self.attributes["gridX"]) + abs(obj.attributes["gridY"] - self.attributes["gridY"])
+                    distance = abs(objX - self.attributes["gridX"]) + abs(objY - self.attributes["gridY"])
                     # Round distance to 1 decimal place
                     distance = round(distance, 2)
 
@@ -563,11 +575,10 @@ class Agent(Object):
             return result
 
         # First, find a reference to the object by its UUID
-        objToTeleportTo = None
-        for obj in self.world.getAllWorldObjects():
-            if (obj.uuid == objectUUID):
-                objToTeleportTo = obj
-                break
+        objToTeleportTo = self.world.getObjectByUUID(objectUUID)
+        if (objToTeleportTo == None):
+            # Objects shared by every tile that hasn't been written to (like grass) aren't on any one tile, so use the closest tile that has one (see World.addDefaultObject())
+            objToTeleportTo = self.world.getNearestDefaultObjectCopy(objectUUID, self.attributes["gridX"], self.attributes["gridY"])
 
         # Check if the object was found
         if (objToTeleportTo == None):
@@ -586,37 +597,48 @@ class Agent(Object):
         # If we reach here, the object exists and has a valid location.  Now we need to find a valid location beside the object to teleport to.
         # First we'll use the pathfinder to try and find a natural path.  If one doesn't exist, we'll just pick a location beside the object.
 
-        # TODO: Strategy 1: Pathfinding
-        # Try to find a path to the object, and then find a location beside the object to teleport to
-
-
-        # Strategy 2 (backoff) -- just find any location (N/E/S/W) that's passable
+        # Strategy 1: Pathfinding
+        # Find the location beside the object (N/E/S/W) that's closest to the agent by walking.  Only passable locations can be teleported to.
         newX = -1
         newY = -1
-        # North
-        passableNorth, blockingObjectNorth = self.world.isPassable(objLocation[0], objLocation[1] - 1)
-        passableEast, blockingObjectEast = self.world.isPassable(objLocation[0] + 1, objLocation[1])
-        passableSouth, blockingObjectSouth = self.world.isPassable(objLocation[0], objLocation[1] + 1)
-        passableWest, blockingObjectWest = self.world.isPassable(objLocation[0] - 1, objLocation[1])
-        if (passableNorth):
-            newX = objLocation[0]
-            newY = objLocation[1] - 1
-            self.attributes["faceDirection"] = "south"
-        # East
-        elif (passableEast):
-            newX = objLocation[0] + 1
-            newY = objLocation[1]
-            self.attributes["faceDirection"] = "west"
-        # South
-        elif (passableSouth):
-            newX = objLocation[0]
-            newY = objLocation[1] + 1
-            self.attributes["faceDirection"] = "north"
-        # West
-        elif (passableWest):
-            newX = objLocation[0] - 1
-            newY = objLocation[1]
-            self.attributes["faceDirection"] = "east"
+        besideLocations = {
+            (objLocation[0], objLocation[1] - 1): "south",
+            (objLocation[0] + 1, objLocation[1]): "west",
+            (objLocation[0], objLocation[1] + 1): "north",
+            (objLocation[0] - 1, objLocation[1]): "east"
+        }
+        passableLocations = [location for location in besideLocations if self.world.isPassable(location[0], location[1])[0]]
+        path = self.pathfinder.findPathToAnyGoal(self.world, self.attributes["gridX"], self.attributes["gridY"], passableLocations)
+        if (len(path) > 0):
+            newX, newY = path[-1]
+            self.attributes["faceDirection"] = besideLocations[(newX, newY)]
+
+        # Strategy 2 (backoff) -- just find any location (N/E/S/W) that's passable
+        if (newX == -1):
+            # North
+            passableNorth, blockingObjectNorth = self.world.isPassable(objLocation[0], objLocation[1] - 1)
+            passableEast, blockingObjectEast = self.world.isPassable(objLocation[0] + 1, objLocation[1])
+            passableSouth, blockingObjectSouth = self.world.isPassable(objLocation[0], objLocation[1] + 1)
+            passableWest, blockingObjectWest = self.world.isPassable(objLocation[0] - 1, objLocation[1])
+            if (passableNorth):
+                newX = objLocation[0]
+                newY = objLocation[1] - 1
+                self.attributes["faceDirection"] = "south"
+            # East
+            elif (passableEast):
+                newX = objLocation[0] + 1
+                newY = objLocation[1]
+                self.attributes["faceDirection"] = "west"
+            # South
+            elif (passableSouth):
+                newX = objLocation[0]
+                newY = objLocation[1] + 1
+                self.attributes["faceDirection"] = "north"
+            # West
+            elif (passableWest):
+                newX = objLocation[0] - 1
+                newY = objLocation[1]
+                self.attributes["faceDirection"] = "east"
 
         # Check if we found a valid location
         if (newX == -1 or newY == -1):
@@ -998,7 +1020,7 @@ class Agent(Object):
             # If the object is poisonous, set the poisonedCounter randomly to (-2, -20)
             if (eatenObj.attributes["isPoisonous"] == True):
                 #print("DEBUG: POISONED! (from " + eatenObj.name + ")")
-                self.attributes["poisonedCounter"] = random.randint(-20, -2)
+                self.attributes["poisonedCounter"] = self.rng.randint(-20, -2)
 
         result = ActionSuccess(True, "I ate the " + objToEat.name + ".")
         self.actionHistory.add(actionType=ActionType.EAT, arg1=objToEat, arg2=None, result=result)
@@ -1345,30 +1367,30 @@ class Agent(Object):
     #
     #   Autopilot: Adding actions to the queue
     #
+    # Returns a handle that can be used to cancel the action (see cancelAutopilotAction()).
     def addAutopilotActionToQueue(self, action):
         # Add a timestamp to the action
         action.timestamp = self.actionTimestampCounter
 
-        # Add the action to the queue
-        self.autopilotActionQueue.append(action)
-
         # Increment the timestamp
         self.actionTimestampCounter += 1
 
-        # Sort the autopilot action queue by priority (highest priority first).  Sort by two fields: first priority, then time added to queue 'timestamp')
+        # Add the action to the queue.  The queue is ordered by priority (highest priority first), then by time added to the queue ('timestamp')
         #  Note: The 'timestamp' field is used to break ties in priority
-        self.autopilotActionQueue.sort(key=lambda x: (x.priority, -x.timestamp), reverse=True)
+        return self.autopilotActionQueue.push(action)
+
+    # Cancel an action in the autopilot action queue, given the handle returned by addAutopilotActionToQueue().  Returns True if the action was removed.
+    def cancelAutopilotAction(self, handle):
+        return self.autopilotActionQueue.cancel(handle)
 
     # Clear the autopilot action queue
     def clearAutopilotActionQueue(self):
-        self.autopilotActionQueue = []
+        self.autopilotActionQueue.clear()
 
     # Returns TRUE if there are one or more actions in the autopilot queue with a priority greater than 1
     def isBusyAutopilot(self):
-        for action in self.autopilotActionQueue:
-            if (action.priority > 1):
-                return True
-        return False
+        maxPriority = self.autopilotActionQueue.getMaxPriority()
+        return (maxPriority != None) and (maxPriority > 1)
 
 
     # Display the autopilot queue (for debugging)
@@ -1581,6 +1603,10 @@ class Agent(Object):
 #   Non-player character (controlled by the simulation)
 #
 class NPC(Agent):
+    controlledBySimulation = True
+    # NPCs can be simulated at a lower level of detail when they're far from every user agent (see World.setNPCLevelOfDetail())
+    supportsLevelOfDetail = True
+
     # Constructor
     def __init__(self, world, name, defaultSpriteName="character17_agent_facing_south"):
         # Default sprite name
@@ -1677,6 +1703,55 @@ class NPC(Agent):
         return True
 
 
+    #
+    #   Level-of-detail simulation (see World.setNPCLevelOfDetail())
+    #
+
+    # When this NPC is far from every user agent, it's only ticked every few steps.  After each of those ticks, it catches up on the steps it skipped
+    # by taking up to 'maxSteps' extra steps towards where it's navigating to (see _getLevelOfDetailNavigationTarget()).  This only moves onto passable
+    # tiles, and stops next to the destination -- anything else (like opening or closing doors, or facing the destination) is left to the NPC's normal tick.
+    def doLevelOfDetailMacroSteps(self, maxSteps):
+        for i in range(maxSteps):
+            target = self._getLevelOfDetailNavigationTarget()
+            if (target == None):
+                return
+
+            gridX, gridY = self.getWorldLocation()
+            goalX, goalY = target
+            if (abs(goalX - gridX) + abs(goalY - gridY) <= 1):
+                return
+
+            pathSuccess, nextX, nextY, pathLength = self.pathfinder.findPathNextStep(self.world, gridX, gridY, goalX, goalY)
+            if (not pathSuccess) or ((nextX == gridX) and (nextY == gridY)):
+                return
+            isPassable, blockingObject = self.world.isPassable(nextX, nextY)
+            if (not isPassable):
+                return
+
+            # Face the next step, and move
+            self.attributes["faceDirection"] = self.convertXYDeltasToDirection(nextX - gridX, nextY - gridY)
+            self.actionMoveAgentForwardBackward(direction=+1)
+            if ("movesSinceDoorOpen" in self.attributes):
+                self.attributes["movesSinceDoorOpen"] += 1
+
+    # Get the location this NPC is currently navigating to (either the current autopilot action, if it's a GOTO_XY action, or the 'goalLocation' attribute), or None.
+    def _getLevelOfDetailNavigationTarget(self):
+        if (self.attributes['inDialogWith'] != None):
+            return None
+        if ("doorNeedsToBeClosed" in self.attributes) and (self.attributes["doorNeedsToBeClosed"] != None):
+            return None
+
+        if (len(self.autopilotActionQueue) > 0):
+            curAutopilotAction = self.autopilotActionQueue[0]
+            if (curAutopilotAction.actionType == AutopilotActionType.GOTO_XY):
+                return (curAutopilotAction.args['destinationX'], curAutopilotAction.args['destinationY'])
+            return None
+
+        if ("goalLocation" in self.attributes):
+            return self.attributes["goalLocation"]
+        return None
+
+
 #
 #   Non-player character (controlled by the simulation)
 #
@@ -1950,14 +2025,14 @@ class NPCChef(NPC):
 
 
                 elif ("wandering" in self.attributes['states']):
-                    self.attributes["goalLocation"] = (random.randint(0, self.world.sizeX - 1), random.randint(0, self.world.sizeY - 1))
+                    self.attributes["goalLocation"] = (self.rng.randint(0, self.world.sizeX - 1), self.rng.randint(0, self.world.sizeY - 1))
 
 
                 # We failed to find a path to the goal location -- pick a new goal location
                 #self.attributes["goalLocation"] = (random.randint(0, self.world.sizeX - 1), random.randint(0, self.world.sizeY - 1))
         else:
             if ("wandering" in self.attributes['states']):
-                self.attributes["goalLocation"] = (random.randint(0, self.world.sizeX - 1), random.randint(0, self.world.sizeY - 1))
+                self.attributes["goalLocation"] = (self.rng.randint(0, self.world.sizeX - 1), self.rng.randint(0, self.world.sizeY - 1))
 
         # DEBUG: End of tick -- display the agent's current state
         ##print("NPC States (name: " + self.name + "): " + str(self.attributes))
@@ -2110,14 +2185,14 @@ class NPCColonist(NPC):
                         del self.attributes["goalLocation"]
 
                 elif ("wandering" in self.attributes['states']):
-                    self.attributes["goalLocation"] = (random.randint(0, self.world.sizeX - 1), random.randint(0, self.world.sizeY - 1))
+                    self.attributes["goalLocation"] = (self.rng.randint(0, self.world.sizeX - 1), self.rng.randint(0, self.world.sizeY - 1))
 
 
                 # We failed to find a path to the goal location -- pick a new goal location
                 #self.attributes["goalLocation"] = (random.randint(0, self.world.sizeX - 1), random.randint(0, self.world.sizeY - 1))
         else:
             if ("wandering" in self.attributes['states']):
-                self.attributes["goalLocation"] = (random.randint(0, self.world.sizeX - 1), random.randint(0, self.world.sizeY - 1))
+                self.attributes["goalLocation"] = (self.rng.randint(0, self.world.sizeX - 1), self.rng.randint(0, self.world.sizeY - 1))
 
         # DEBUG: End of tick -- display the agent's current state
         ##print("NPC States (name: " + self.name + "): " + str(self.attributes))
@@ -2800,7 +2875,8 @@ class NPCFarmer1(NPC):
 # Devices
 #
 class NPCDevice(NPC):
-    pass
+    # Devices don't move, so they're always simulated in full
+    supportsLevelOfDetail = False
 
 
 #
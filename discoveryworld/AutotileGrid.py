@@ -0,0 +1,132 @@
+# AutotileGrid.py
+
+import numpy as np
+
+
+# Neighbour information for objects whose sprite depends on what's next to them (e.g. walls, fences, paths, and chairs) -- see World.hasNeighbouringObjs().
+#
+# Rather than each object checking its four neighbours with getObjectsAt(), the world keeps a grid for each object type that's asked about (indexed [x, y],
+# True where getObjectsAt() would include an object of that type), and computes the neighbours of every tile at once as a bitmask (see getNeighbourMasks()).
+# The grid for a type is built in one pass over the objects of that type, the first time it's needed (e.g. on the first tick after a scenario is built).
+# After that, only the tiles that have changed (see World.invalidateTile()) are re-checked.  When one of them gains or loses an object of a given type,
+# the objects next to it whose sprites depend on that type (see Object.autotileNeighbourTypes) are marked as needing their sprite updated, and woken up.
+class AutotileGrid:
+    # Bits of each direction in the neighbour masks
+    NORTH = 1
+    SOUTH = 2
+    WEST = 4
+    EAST = 8
+
+    # Offsets (dx, dy) of the neighbours in each direction
+    NEIGHBOUR_OFFSETS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+
+    # Constructor
+    def __init__(self, world):
+        self.world = world
+
+        # Grid for each object type (type -> NumPy boolean array indexed [x, y])
+        self.typeGrids = {}
+        # Tiles that have changed since the type grids were last updated
+        self.changedTiles = set()
+        # Incremented whenever any of the type grids change
+        self.version = 0
+        # Neighbour masks, keyed by the tuple of object types they're for.  Each value is (version, (masks, masks as nested lists)).
+        self.neighbourMaskCache = {}
+
+    # Note that the objects on a tile have changed (called by World.invalidateTile())
+    def invalidateTile(self, x, y):
+        self.changedTiles.add((x, y))
+
+    # Get the grid for an object type, building it if this is the first time it's been asked for
+    def getTypeGrid(self, objectType):
+        self.update()
+        if (objectType not in self.typeGrids):
+            self.typeGrids[objectType] = self._buildTypeGrid(objectType)
+            self.version += 1
+        return self.typeGrids[objectType]
+
+    # Build the grid for an object type, from the world's index of the objects of that type
+    def _buildTypeGrid(self, objectType):
+        world = self.world
+        grid = np.zeros((world.sizeX, world.sizeY), dtype=np.bool_)
+        index = world.objectsByType.get(objectType, {})
+        for obj in list(index.values()):
+            if (world.isObjectInWorld(obj)):
+                x, y = obj.getWorldLocation()
+                grid[x, y] = True
+        return grid
+
+    # Re-check the tiles that have changed, and mark the sprites of any objects whose neighbours changed as needing to be updated
+    def update(self):
+        if (len(self.changedTiles) == 0):
+            return
+        changedTiles = self.changedTiles
+        self.changedTiles = set()
+
+        # If no type grids have been built yet, then there's nothing to update
+        if (len(self.typeGrids) == 0):
+            return
+
+        for (x, y) in changedTiles:
+            typesOnTile = set(obj.type for obj in self.world.getObjectsAt(x, y))
+            for objectType, grid in self.typeGrids.items():
+                hasType = (objectType in typesOnTile)
+                if (grid[x, y] != hasType):
+                    grid[x, y] = hasType
+                    self.version += 1
+                    self._updateNeighbours(x, y, objectType)
+
+    # Mark the sprites of the objects next to a tile, that depend on a given object type, as needing to be updated
+    def _updateNeighbours(self, x, y, objectType):
+        world = self.world
+        for (dx, dy) in AutotileGrid.NEIGHBOUR_OFFSETS:
+            for obj in world.getObjectsAt(x + dx, y + dy):
+                if (objectType in obj.autotileNeighbourTypes):
+                    obj.needsSpriteNameUpdate = True
+                    world.wakeObjectForTick(obj)
+
+    # Get a bitmask (NORTH | SOUTH | WEST | EAST) for every tile in the world (a NumPy array indexed [x, y]), of which of its neighbours
+    # have an object of any of the given types on them.
+    # Note: The array is cached, and should not be modified.
+    def getNeighbourMasks(self, objectTypes):
+        return self._getNeighbourMasks(tuple(objectTypes))[0]
+
+    # Get the neighbour masks for a tuple of object types, as (NumPy array, the same masks as nested lists for fast lookups)
+    def _getNeighbourMasks(self, objectTypes):
+        # Check the cache
+        self.update()
+        cached = self.neighbourMaskCache.get(objectTypes)
+        if (cached != None) and (cached[0] == self.version):
+            return cached[1]
+
+        # Tiles that have any of the types on them
+        occupied = np.zeros((self.world.sizeX, self.world.sizeY), dtype=np.bool_)
+        for objectType in objectTypes:
+            occupied |= self.getTypeGrid(objectType)
+
+        # Shift the occupied tiles in each direction
+        masks = np.zeros((self.world.sizeX, self.world.sizeY), dtype=np.uint8)
+        masks[:, 1:] |= occupied[:, :-1] * np.uint8(AutotileGrid.NORTH)
+        masks[:, :-1] |= occupied[:, 1:] * np.uint8(AutotileGrid.SOUTH)
+        masks[1:, :] |= occupied[:-1, :] * np.uint8(AutotileGrid.WEST)
+        masks[:-1, :] |= occupied[1:, :] * np.uint8(AutotileGrid.EAST)
+
+        result = (masks, masks.tolist())
+        self.neighbourMaskCache[objectTypes] = (self.version, result)
+        return result
+
+    # Get whether each neighbour of a tile (north, south, west, east) has an object of any of the given types on it
+    def hasNeighbouringObjs(self, x, y, objectTypes):
+        world = self.world
+        if (world.isWithinBounds(x, y)):
+            mask = self._getNeighbourMasks(tuple(objectTypes))[1][x][y]
+            return ((mask & AutotileGrid.NORTH) != 0, (mask & AutotileGrid.SOUTH) != 0, (mask & AutotileGrid.WEST) != 0, (mask & AutotileGrid.EAST) != 0)
+
+        # Tiles outside the world (e.g. for objects that aren't on the grid) can still have neighbours inside it
+        grids = [self.getTypeGrid(objectType) for objectType in objectTypes]
+        out = []
+        for (dx, dy) in AutotileGrid.NEIGHBOUR_OFFSETS:
+            nx = x + dx
+            ny = y + dy
+            out.append(world.isWithinBounds(nx, ny) and any(bool(grid[nx, ny]) for grid in grids))
+        return tuple(out)
@@ -1,7 +1,6 @@
 # DiscoveryWorldAPI.py
-import io
 import os
-import base64
+import copy
 import random
 import subprocess
 
@@ -11,6 +10,8 @@ from discoveryworld.ActionHistory import getActionDescriptions
 from discoveryworld.ActionSuccess import MessageImportance
 from discoveryworld.World import World
 from discoveryworld.UserInterface import UserInterface
+from discoveryworld.ObservationConfig import ObservationConfig
+from discoveryworld.ImageEncoder import getPixelArray
 
 
 #
@@ -46,6 +47,8 @@ class DiscoveryWorldAPI:
 
         # Create the window
         self.window = self.createHeadlessWindow()
+        # Copy of the window with just the world rendered (before the UI), so the observation can be captured with and without the grid from one render
+        self.worldSurface = pygame.Surface(self.window.get_size(), 0, self.window)
 
         # World
         self.world = None
@@ -63,6 +66,13 @@ class DiscoveryWorldAPI:
         # Most recent step count
         self.steps = 0
 
+        # Which parts of the observation getAgentObservation() produces (by default, everything)
+        self.observationConfig = ObservationConfig()
+
+
+    # Set which parts of the observation getAgentObservation() produces (e.g. ObservationConfig(vision="off", saveFrames=False) for text-only agents)
+    def setObservationConfig(self, observationConfig:ObservationConfig):
+        self.observationConfig = observationConfig
 
     def getNameAndVersion(self):
         return self.NAME + " v" + self.VERSION
@@ -70,12 +80,15 @@ class DiscoveryWorldAPI:
     def getValidScenarios(self):
         return SCENARIO_INFOS
 
-    def loadScenario(self, scenarioName:str, difficultyStr:str, randomSeed:int=0, numUserAgents = 1):
+    # Load a scenario.  The world size (in tiles) can optionally be changed from the default (32x32) -- e.g. for stress testing on larger maps.
+    def loadScenario(self, scenarioName:str, difficultyStr:str, randomSeed:int=0, numUserAgents = 1, worldSizeX:int=32, worldSizeY:int=32):
         # Set the number of agents
         self.numUserAgents = numUserAgents
 
         # Initialize a world (blank slate)
-        self.world = World(assetPath=None, filenameSpriteIndex="spriteIndex.json", dataPath=None, filenameObjectData="objects.tsv", filenameMaterialData="materials.tsv", filenameDiscoveryFeed="discoveryFeed.json")
+        self.world = World(assetPath=None, filenameSpriteIndex="spriteIndex.json", dataPath=None, filenameObjectData="objects.tsv", filenameMaterialData="materials.tsv", filenameDiscoveryFeed="discoveryFeed.json", sizeX=worldSizeX, sizeY=worldSizeY)
+        # Scale the sprites ahead of time, for the scale that observations are rendered at
+        self.world.spriteLibrary.prewarmScales([self.renderScale])
 
         # Get the internal name for the scenario
         internalScenarioName = getInternalScenarioName(scenarioName, difficultyStr)
@@ -125,8 +138,28 @@ class DiscoveryWorldAPI:
 
 
 
-    # Gets the current observation of the world from a given agent's perspective
-    def getAgentObservation(self, agentIdx):
+    # Fork the current simulation into a new, independent API instance (e.g. for lookahead planning, where candidate actions are tried out in the fork and then discarded).
+    # The fork has its own copy of the world (see World.fork()), the agents' user interfaces, and the task progress, and shares the window with this instance.
+    def fork(self):
+        # Check that the world is initialized
+        if (self.world == None):
+            print("ERROR: fork(): World is not initialized")
+            return None
+
+        forkedAPI = copy.copy(self)
+        forkedAPI.world, forkedAPI.ui = self.world.forkWith(self.ui)
+        for forkedUI, ui in zip(forkedAPI.ui, self.ui):
+            forkedUI.shareResourcesFrom(ui)
+
+        forkedAPI.r = copy.deepcopy(self.r)
+        forkedAPI.agentsThatHaveActedThisStep = set(self.agentsThatHaveActedThisStep)
+        forkedAPI.taskProgress = copy.deepcopy(self.taskProgress)
+
+        return forkedAPI
+
+    # Gets the current observation of the world from a given agent's perspective.
+    # 'observationConfig' (optional) overrides the API's observation config (see setObservationConfig()) for this observation.
+    def getAgentObservation(self, agentIdx, observationConfig:ObservationConfig=None):
         # Start populating response
         response = {"errors": [], "ui": {}, "vision": {}}
 
@@ -140,10 +173,34 @@ class DiscoveryWorldAPI:
             response["errors"].append("World is not initialized")
             return response
 
+        # Which parts of the observation to produce
+        if (observationConfig == None):
+            observationConfig = self.observationConfig
 
         # Get a reference to this agent's UI
         ui = self.ui[agentIdx]
 
+        # Step 3+4: Render the viewport, and capture the images/frames (unless nothing needs them)
+        if (observationConfig.needsRender() == True):
+            self._renderAgentVision(agentIdx, ui, observationConfig, response)
+        else:
+            # Nothing to draw, but the UI's state (e.g. the selected arguments) is still updated, as it would be by rendering it
+            ui.updateState()
+
+        # JSON rendering
+        uiJSON = ui.renderJSON(minimal=observationConfig.isMinimalUIJSON())
+        response["ui"] = uiJSON
+
+        # Store most recent task progress
+        self.taskProgress = uiJSON["taskProgress"]
+        # Store most recent number of steps
+        self.steps = uiJSON["world_steps"]
+
+        # Return response
+        return response
+
+    # Render the viewport and UI for an agent, and add the images to the response["vision"] (and save the frames to disk) as set in the observation config
+    def _renderAgentVision(self, agentIdx, ui, observationConfig, response):
         # Get a reference to the agent
         agent = ui.currentAgent
 
@@ -157,13 +214,16 @@ class DiscoveryWorldAPI:
         # Step 3: Render the viewport (the world view) and the UI for this agent
         self.window.fill((0, 0, 0)) # Clear the viewport
         self.world.renderViewport(self.window, worldStartX, worldStartY, self.viewportSizeX, self.viewportSizeY, 0, 0, self.renderScale, includeGrid=False)
+        self.worldSurface.blit(self.window, (0, 0))     # Keep a copy of the rendered world, for the version with the grid (step 4)
+        objectToShowBefore = agent.attributes.get("objectToShow")
         ui.render()                 # Render UI
         pygame.display.flip()       # Flip the backbuffer, to display this content to the window
 
         # Capture the current window, and save to file
-        curStep = self.world.getStepCounter()
-        filenameOutPNG = self.FRAME_DIR + "/ui_agent_" + str(agentIdx) + "_frame_" + str(curStep) + ".png"
-        pygame.image.save(self.window, filenameOutPNG)
+        if (observationConfig.saveFrames == True):
+            curStep = self.world.getStepCounter()
+            filenameOutPNG = self.FRAME_DIR + "/ui_agent_" + str(agentIdx) + "_frame_" + str(curStep) + ".png"
+            observationConfig.imageEncoder.savePNG(self.window, filenameOutPNG)
 
         #self.viewportSizeX = 24
         #self.viewportSizeY = 16
@@ -172,48 +232,48 @@ class DiscoveryWorldAPI:
         agentVisionWidth = self.viewportSizeX * 32 * self.renderScale
         agentVisionHeight = self.viewportSizeY * 32 * self.renderScale
 
-        # Also capture just the first 512x512 pixels of the window, and encode it as a base64 string
+        # Also capture just the first 512x512 pixels of the window, and encode it as a base64 string (or an array)
         # This is for the agent's "vision"
-        visionSurface = pygame.Surface((agentVisionWidth, agentVisionHeight))
-        visionSurface.blit(self.window, (0, 0), (0, 0, agentVisionWidth, agentVisionHeight))
-        image_io = io.BytesIO()
-        pygame.image.save(visionSurface, image_io, 'PNG')                       # Convert to PNG
-        image_io.seek(0)                                                        # Go to the beginning of the BytesIO object
-        encodedImageNoGrid = base64.b64encode(image_io.read()).decode('utf-8')       # Convert to base64
-        encodedImageNoGrid = "data:image/png;base64," + encodedImageNoGrid
-        response["vision"]["base64_no_grid"] = encodedImageNoGrid
-
-        # Step 4: Also capture the viewport with the grid
-        self.window.fill((0, 0, 0)) # Clear the viewport
-        self.world.renderViewport(self.window, worldStartX, worldStartY, self.viewportSizeX, self.viewportSizeY, 0, 0, self.renderScale, includeGrid=True)
+        if (observationConfig.includesVisionNoGrid() == True):
+            visionSurface = pygame.Surface((agentVisionWidth, agentVisionHeight))
+            visionSurface.blit(self.window, (0, 0), (0, 0, agentVisionWidth, agentVisionHeight))
+            self._addVisionToResponse(visionSurface, observationConfig, response, "no_grid")
+
+        # The version with the grid is only needed for the observation, or the "current_viewport.png" debug frame
+        if (observationConfig.includesVisionWithGrid() == False) and (observationConfig.saveFrames == False):
+            return
+
+        # Step 4: Also capture the viewport with the grid.  The grid is drawn over the world rendered in step 3, rather than rendering the world again --
+        # unless rendering the UI changed the object the agent is shown holding (see Agent.updateLastInteractedObject()), which the world rendered
+        # in step 3 doesn't show yet.
+        if (agent.attributes.get("objectToShow") is objectToShowBefore):
+            self.window.blit(self.worldSurface, (0, 0))
+        else:
+            self.window.fill((0, 0, 0))
+            self.world.renderViewport(self.window, worldStartX, worldStartY, self.viewportSizeX, self.viewportSizeY, 0, 0, self.renderScale, includeGrid=False)
+        self.world.renderGridOverlay(self.window, worldStartX, worldStartY, self.viewportSizeX, self.viewportSizeY, 0, 0, self.renderScale)
         ui.render()                 # Render UI
         pygame.display.flip()       # Flip the backbuffer, to display this content to the window
 
-        # Capture the first 512x512 pixels of the window, and encode it as a base64 string
+        # Capture the first 512x512 pixels of the window, and encode it as a base64 string (or an array)
         # This is for the agent's "vision"
         visionSurface = pygame.Surface((agentVisionWidth, agentVisionHeight))
         visionSurface.blit(self.window, (0, 0), (0, 0, agentVisionWidth, agentVisionHeight))
-        image_io = io.BytesIO()
-        pygame.image.save(visionSurface, image_io, 'PNG')                       # Convert to PNG
-        image_io.seek(0)                                                        # Go to the beginning of the BytesIO object
-        encodedImageWithGrid = base64.b64encode(image_io.read()).decode('utf-8')       # Convert to base64
-        encodedImageWithGrid = "data:image/png;base64," + encodedImageWithGrid
-        response["vision"]["base64_with_grid"] = encodedImageWithGrid
 
         # Also dump this 'with grid' version to a debug file, called "current_viewport.png"
-        pygame.image.save(visionSurface, self.FRAME_DIR + "/ui_agent_" + str(agentIdx) + "_current_viewport.png")
-
-        # JSON rendering
-        uiJSON = ui.renderJSON()
-        response["ui"] = uiJSON
+        if (observationConfig.saveFrames == True):
+            observationConfig.imageEncoder.savePNG(visionSurface, self.FRAME_DIR + "/ui_agent_" + str(agentIdx) + "_current_viewport.png")
 
-        # Store most recent task progress
-        self.taskProgress = uiJSON["taskProgress"]
-        # Store most recent number of steps
-        self.steps = uiJSON["world_steps"]
+        if (observationConfig.includesVisionWithGrid() == True):
+            self._addVisionToResponse(visionSurface, observationConfig, response, "with_grid")
 
-        # Return response
-        return response
+    # Add a capture of the agent's vision to response["vision"] -- as a base64 data URL ("base64_<suffix>"), or a NumPy RGB array ("array_<suffix>")
+    # Note: The array is a view of the surface's pixels, so the surface shouldn't be drawn to afterwards.
+    def _addVisionToResponse(self, visionSurface, observationConfig, response, suffix):
+        if (observationConfig.isArrayVision() == True):
+            response["vision"]["array_" + suffix] = getPixelArray(visionSurface)
+        else:
+            response["vision"]["base64_" + suffix] = observationConfig.imageEncoder.encodeDataURL(visionSurface)
 
     # Returns true if all tasks are marked as complete, and false otherwise.
     def areTasksComplete(self):
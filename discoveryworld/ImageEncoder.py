@@ -0,0 +1,137 @@
+# ImageEncoder.py
+
+import io
+import zlib
+import struct
+import base64
+
+import numpy as np
+import pygame
+
+# Pillow is optional -- it's only used for the JPEG (with a given quality) and WebP codecs, and for PNGs at higher compression levels
+try:
+    from PIL import Image as PILImage
+    from PIL import features as PILFeatures
+except ImportError:
+    PILImage = None
+
+
+# Encodes rendered surfaces (e.g. the agent's vision in DiscoveryWorldAPI.getAgentObservation()) as images, or gets their pixels as NumPy arrays.
+#
+# PNGs are written by pygame.image.save() by default.  The compression level is mainly meant for speed: at low levels (up to MAX_FAST_PNG_LEVEL, e.g. 1),
+# PNGs are written directly with zlib at that level (with the 'sub' filter on every row), which is much faster, at the cost of larger files.
+# Higher levels are written by Pillow (which, like pygame, picks the filter for each row), and give files about as small as pygame's at level 6, and
+# smaller at levels 7-9.  Without Pillow, higher levels fall back to pygame.image.save().
+# JPEG and WebP are encoded with Pillow, if it's installed (JPEG falls back to pygame, at its fixed quality, if it isn't).
+class ImageEncoder:
+    # Codecs
+    CODEC_PNG = "png"
+    CODEC_JPEG = "jpeg"
+    CODEC_WEBP = "webp"
+    CODECS = (CODEC_PNG, CODEC_JPEG, CODEC_WEBP)
+
+    # MIME types (for data URLs)
+    MIME_TYPES = {CODEC_PNG: "image/png", CODEC_JPEG: "image/jpeg", CODEC_WEBP: "image/webp"}
+
+    # PNG file signature, and the filter type used on every row when writing PNGs directly
+    PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+    PNG_FILTER_SUB = 1
+
+    # Highest compression level that PNGs are written directly with zlib at (rather than with Pillow/pygame)
+    MAX_FAST_PNG_LEVEL = 3
+
+    # Constructor
+    # 'compressionLevel' is the zlib level (0-9) for PNGs (None for pygame's default), and 'quality' (1-100) is for JPEG and WebP.
+    def __init__(self, codec:str="png", compressionLevel:int=None, quality:int=85):
+        if (codec not in ImageEncoder.CODECS):
+            raise ValueError("ImageEncoder: Unknown codec '" + str(codec) + "' (valid codecs: " + ", ".join(ImageEncoder.CODECS) + ")")
+        if (isCodecAvailable(codec) == False):
+            raise ValueError("ImageEncoder: Codec '" + codec + "' is not available (it requires Pillow" + (" with WebP support" if (codec == ImageEncoder.CODEC_WEBP) else "") + ")")
+        if (compressionLevel != None) and ((compressionLevel < 0) or (compressionLevel > 9)):
+            raise ValueError("ImageEncoder: Compression level must be between 0 and 9 (or None), not " + str(compressionLevel))
+        if (quality < 1) or (quality > 100):
+            raise ValueError("ImageEncoder: Quality must be between 1 and 100, not " + str(quality))
+
+        self.codec = codec
+        self.compressionLevel = compressionLevel
+        self.quality = quality
+
+    # Encode a surface as an image (returns the bytes of the image file)
+    def encode(self, surface):
+        if (self.codec == ImageEncoder.CODEC_PNG):
+            return self._encodePNG(surface)
+
+        if (PILImage == None):
+            # JPEG only (WebP isn't available without Pillow)
+            imageIO = io.BytesIO()
+            pygame.image.save(surface, imageIO, "JPEG")
+            return imageIO.getvalue()
+
+        imageIO = io.BytesIO()
+        self._toPILImage(surface).save(imageIO, self.codec.upper(), quality=self.quality)
+        return imageIO.getvalue()
+
+    # Encode a surface as a base64 data URL (e.g. "data:image/png;base64,...")
+    def encodeDataURL(self, surface):
+        return "data:" + ImageEncoder.MIME_TYPES[self.codec] + ";base64," + base64.b64encode(self.encode(surface)).decode('utf-8')
+
+    # Save a surface to a PNG file (using the compression level, if one is set)
+    def savePNG(self, surface, filename):
+        if (self.compressionLevel == None):
+            pygame.image.save(surface, filename)
+            return
+        with open(filename, "wb") as f:
+            f.write(self._encodePNG(surface))
+
+    # Encode a surface as a PNG
+    def _encodePNG(self, surface):
+        # Low compression levels: write the PNG directly (fast)
+        if (self.compressionLevel != None) and (self.compressionLevel <= ImageEncoder.MAX_FAST_PNG_LEVEL):
+            return self._writePNG(surface, self.compressionLevel)
+
+        imageIO = io.BytesIO()
+        if (self.compressionLevel != None) and (PILImage != None):
+            # Higher compression levels: Pillow (with the filter chosen for each row)
+            self._toPILImage(surface).save(imageIO, "PNG", compress_level=self.compressionLevel)
+        else:
+            # Default (or no Pillow): pygame
+            pygame.image.save(surface, imageIO, 'PNG')
+        return imageIO.getvalue()
+
+    # Get a copy of a surface as a Pillow (RGB) image
+    def _toPILImage(self, surface):
+        return PILImage.frombuffer("RGB", surface.get_size(), pygame.image.tobytes(surface, "RGB"))
+
+    # Write an (8-bit RGB) PNG directly, compressing the pixels with zlib at a given level
+    def _writePNG(self, surface, compressionLevel):
+        width, height = surface.get_size()
+        rows = np.ascontiguousarray(getPixelArray(surface)).reshape(height, width * 3)
+
+        # Each row starts with its filter type.  The 'sub' filter stores each byte as the difference from the same byte of the pixel to its left.
+        filtered = np.empty((height, width * 3 + 1), dtype=np.uint8)
+        filtered[:, 0] = ImageEncoder.PNG_FILTER_SUB
+        filtered[:, 1:4] = rows[:, 0:3]
+        np.subtract(rows[:, 3:], rows[:, :-3], out=filtered[:, 4:])
+
+        header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)     # 8 bits per channel, RGB, no interlacing
+        return ImageEncoder.PNG_SIGNATURE + self._pngChunk(b"IHDR", header) + self._pngChunk(b"IDAT", zlib.compress(filtered, compressionLevel)) + self._pngChunk(b"IEND", b"")
+
+    # Pack one PNG chunk (length, type, data, CRC)
+    def _pngChunk(self, chunkType, data):
+        return struct.pack(">I", len(data)) + chunkType + data + struct.pack(">I", zlib.crc32(chunkType + data) & 0xFFFFFFFF)
+
+
+# Returns true if a codec can be used here (JPEG with Pillow or pygame's extended image support, and WebP with Pillow built with WebP support)
+def isCodecAvailable(codec:str):
+    if (codec == ImageEncoder.CODEC_PNG):
+        return True
+    if (codec == ImageEncoder.CODEC_JPEG):
+        return (PILImage != None) or pygame.image.get_extended()
+    if (codec == ImageEncoder.CODEC_WEBP):
+        return (PILImage != None) and PILFeatures.check("webp")
+    return False
+
+# Get the pixels of a surface as a NumPy RGB array, indexed [y, x, channel] (i.e. height x width x 3).
+# Note: This is a view of the surface's pixels where possible (not a copy), so it changes if the surface is drawn to, and the surface stays locked while it exists.
+def getPixelArray(surface):
+    return pygame.surfarray.pixels3d(surface).transpose(1, 0, 2)
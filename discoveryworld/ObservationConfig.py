@@ -0,0 +1,74 @@
+# ObservationConfig.py
+
+from discoveryworld.ImageEncoder import ImageEncoder
+
+# Which parts of an observation DiscoveryWorldAPI.getAgentObservation() should produce (see DiscoveryWorldAPI.setObservationConfig()).
+#
+# Rendering the viewport, encoding it as PNG/base64, and saving frames to disk make up most of the cost of an observation, so callers that don't
+# use some of them (e.g. text-only agents, that never look at the images) can turn them off:
+#  - vision:      Which images to include in observation["vision"] -- "off" (none), "no_grid", "with_grid", or "both" (the default).
+#  - saveFrames:  Whether to save the frame of each step to the API's frame directory (used by createAgentVideo()).
+#  - uiJSON:      "full" (the default) or "minimal".  The minimal version leaves out the nearby objects, nearby agents, and discovery feed posts.
+#  - visionFormat:  How the images are included -- "base64" (the default; as data URLs, in observation["vision"]["base64_no_grid"/"base64_with_grid"]),
+#                   or "array" (as NumPy RGB arrays, indexed [y, x, channel], in observation["vision"]["array_no_grid"/"array_with_grid"]).
+#  - imageCodec, pngCompressionLevel, imageQuality:  How base64 images are encoded (see ImageEncoder).  The PNG compression level (if set) also
+#                   applies to the saved frames.  Low levels (0-3) are for speed, and give larger files than the default; levels 7-9 give smaller
+#                   files (with Pillow), but are slower.
+# The defaults produce the same observations as before this existed.
+class ObservationConfig:
+    # Vision modes
+    VISION_OFF = "off"
+    VISION_NO_GRID = "no_grid"
+    VISION_WITH_GRID = "with_grid"
+    VISION_BOTH = "both"
+    VISION_MODES = (VISION_OFF, VISION_NO_GRID, VISION_WITH_GRID, VISION_BOTH)
+
+    # UI JSON modes
+    UI_JSON_FULL = "full"
+    UI_JSON_MINIMAL = "minimal"
+    UI_JSON_MODES = (UI_JSON_FULL, UI_JSON_MINIMAL)
+
+    # Vision formats
+    VISION_FORMAT_BASE64 = "base64"
+    VISION_FORMAT_ARRAY = "array"
+    VISION_FORMATS = (VISION_FORMAT_BASE64, VISION_FORMAT_ARRAY)
+
+    # Constructor
+    def __init__(self, vision:str="both", saveFrames:bool=True, uiJSON:str="full", visionFormat:str="base64", imageCodec:str="png", pngCompressionLevel:int=None, imageQuality:int=85):
+        if (vision not in ObservationConfig.VISION_MODES):
+            raise ValueError("ObservationConfig: Unknown vision mode '" + str(vision) + "' (valid modes: " + ", ".join(ObservationConfig.VISION_MODES) + ")")
+        if (uiJSON not in ObservationConfig.UI_JSON_MODES):
+            raise ValueError("ObservationConfig: Unknown UI JSON mode '" + str(uiJSON) + "' (valid modes: " + ", ".join(ObservationConfig.UI_JSON_MODES) + ")")
+        if (visionFormat not in ObservationConfig.VISION_FORMATS):
+            raise ValueError("ObservationConfig: Unknown vision format '" + str(visionFormat) + "' (valid formats: " + ", ".join(ObservationConfig.VISION_FORMATS) + ")")
+
+        self.vision = vision
+        self.saveFrames = saveFrames
+        self.uiJSON = uiJSON
+        self.visionFormat = visionFormat
+        # Encoder for the images and saved frames (checks the codec settings)
+        self.imageEncoder = ImageEncoder(codec=imageCodec, compressionLevel=pngCompressionLevel, quality=imageQuality)
+
+    # Returns true if the image without the grid should be included in the observation
+    def includesVisionNoGrid(self):
+        return (self.vision == ObservationConfig.VISION_NO_GRID) or (self.vision == ObservationConfig.VISION_BOTH)
+
+    # Returns true if the image with the grid should be included in the observation
+    def includesVisionWithGrid(self):
+        return (self.vision == ObservationConfig.VISION_WITH_GRID) or (self.vision == ObservationConfig.VISION_BOTH)
+
+    # Returns true if the viewport needs to be rendered at all (for the images in the observation, or for the saved frames)
+    def needsRender(self):
+        return (self.vision != ObservationConfig.VISION_OFF) or (self.saveFrames == True)
+
+    # Returns true if only the minimal UI JSON should be included in the observation
+    def isMinimalUIJSON(self):
+        return (self.uiJSON == ObservationConfig.UI_JSON_MINIMAL)
+
+    # Returns true if the images should be included as NumPy arrays (rather than base64 data URLs)
+    def isArrayVision(self):
+        return (self.visionFormat == ObservationConfig.VISION_FORMAT_ARRAY)
+
+    def __repr__(self):
+        encoder = self.imageEncoder
+        return "ObservationConfig(vision=" + repr(self.vision) + ", saveFrames=" + repr(self.saveFrames) + ", uiJSON=" + repr(self.uiJSON) + ", visionFormat=" + repr(self.visionFormat) + ", imageCodec=" + repr(encoder.codec) + ", pngCompressionLevel=" + repr(encoder.compressionLevel) + ", imageQuality=" + repr(encoder.quality) + ")"
@@ -2,64 +2,90 @@
 
 import random
 import math
+import heapq
 
 from enum import Enum
 
-from pathfinding.core.diagonal_movement import DiagonalMovement
-from pathfinding.core.grid import Grid
-from pathfinding.finder.a_star import AStarFinder
+# The 'pathfinding' package is optional -- it's only used by the "pathfinding" backend (see Pathfinder.DEFAULT_BACKEND)
+try:
+    from pathfinding.core.diagonal_movement import DiagonalMovement
+    from pathfinding.core.grid import Grid
+    from pathfinding.finder.a_star import AStarFinder
+except ImportError:
+    AStarFinder = None
 
 from discoveryworld.Layer import Layer
 from discoveryworld.ActionSuccess import ActionResult
 
 
 class Pathfinder():
+    # Maximum number of destinations to keep cached paths for
+    MAX_CACHED_PATHS = 16
+
+    # Search backend used by findPathNextStep():
+    #  - "native": The built-in grid search (GridSearch), which works directly on the world's cost grid.
+    #  - "pathfinding": The A* implementation from the 'pathfinding' package (slower, but kept for comparison).
+    DEFAULT_BACKEND = "native"
+
     # Constructor
-    def __init__(self):
-        pass
+    def __init__(self, backend=None):
+        # Search backend (see DEFAULT_BACKEND)
+        self.backend = backend if (backend != None) else Pathfinder.DEFAULT_BACKEND
+        if (self.backend == "pathfinding") and (AStarFinder == None):
+            print("WARNING: Pathfinder: The 'pathfinding' package is not installed.  Using the native backend instead.")
+            self.backend = "native"
+
+        # Cache of the most recent path found to each destination (see findPathNextStep()).
+        # Keyed by destination (x, y) (or a tuple of destinations, for findPathToAnyGoal()), each value is a dictionary with the path (a list of (x, y) tiles, starting at the agent's location), and the world's cost grid version when it was last checked.
+        self.pathCache = {}
 
     # Find a path
     # Returns the next step to take on the path, as well as the total length of the path.
+    # Paths are cached per destination, and are reused on later calls as long as the agent is still on the path, and no tile on the rest of the path has become impassable.
     def findPathNextStep(self, world, startX, startY, endX, endY):
 
-        # Step 1: Construct a cost grid representing the world, where each cell contains whether it's passable or not
-        costGrid = []
-        for y in range(world.sizeY):
-            costGrid.append([])
-            for x in range(world.sizeX):
-
-                # By default, moving to the next cell has a base cost of 1
-                passableScore = 1
-
-                # Check if the cell is passable
-                allObjs = world.getObjectsAt(x, y)
-
-                # Check if any of the objects are impassable
-                for object in allObjs:
-                    if (not object.attributes["isPassable"]):
-                        # Check to see if the object is a door, and therefore potentially passable
-                        if (object.attributes["isPassage"]):
-                            # Potentially passable, with a cost
-                            passableScore = 20
-                        else:
-                            # Not passable (score of -1)
-                            passableScore = -1
+        # Step 1: Get the cost grid representing the world, where each cell contains whether it's passable or not (and the cost of traversing it).
+        # This is maintained by the world, and is indexed [x, y].
+        costGrid = world.getCostGrid()
 
-                        break
-                # If this tile has any agents in it, increase its traversal cost
-                if (passableScore > 0):
-                    if (len(world.grid[x][y]["layers"][Layer.AGENT]) > 0):
-                        passableScore += 10
+        # Step 2: If other agents are also navigating to this destination, follow the world's shared distance field for it instead of searching
+        path = None
+        if (world.addDistanceFieldRequester(endX, endY, self)):
+            path = world.getDistanceField(endX, endY).getPath(world, startX, startY)
+            if (path == None):
+                # The field is out of date (e.g. something is now blocking the way) -- recalculate it
+                path = world.getDistanceField(endX, endY, recalculate=True).getPath(world, startX, startY)
 
+        # Step 3: Otherwise, check if there's a cached path to this destination that can be reused
+        if (path == None):
+            path = self._getCachedPath(world, costGrid, (endX, endY), startX, startY)
 
-                # Store the passability score
-                costGrid[y].append(passableScore)
+        # Step 4: If not, find a path using A*
+        if (path == None):
+            path = self._findPath(world, costGrid, startX, startY, endX, endY)
+            self._addCachedPath(world, (endX, endY), startX, startY, path)
 
-        # Step 2: Find a path using A*
+        # Get the next step in the path
+        if (len(path) > 1):
+            nextX, nextY = path[1]
+            return (True, nextX, nextY, len(path))
+        else:
+            return (False, -1, -1, -1)
+
+    # Find a path using A*
+    # Returns the path as a list of (x, y) tiles (including the start and end tiles), or an empty list if no path could be found.
+    def _findPath(self, world, costGrid, startX, startY, endX, endY):
         print("Finding path from (" + str(startX) + ", " + str(startY) + ") to (" + str(endX) + ", " + str(endY) + ")")
 
-        # Use A* library to find a path
-        grid = Grid(matrix=costGrid)
+        if (self.backend == "pathfinding"):
+            return self._findPathLibrary(costGrid, startX, startY, endX, endY)
+
+        return world.gridSearch.findPath(costGrid, startX, startY, [(endX, endY)], costGridVersion=world.costGridVersion)
+
+    # Find a path using the A* implementation from the 'pathfinding' package
+    def _findPathLibrary(self, costGrid, startX, startY, endX, endY):
+        # The cost grid is indexed [x, y] -- so transpose it to the [y, x] (row-major) format that the library expects.
+        grid = Grid(matrix=costGrid.T)
 
         start = grid.node(startX, startY)
         end = grid.node(endX, endY)
@@ -70,13 +96,79 @@ class Pathfinder():
         #print('operations:', runs, 'path length:', len(path))
         #print(grid.grid_str(path=path, start=start, end=end))
 
+        return [(node.x, node.y) for node in path]
+
+    # Find a path to whichever of several destinations (goals) is cheapest to reach, using a single search.
+    # 'goals' is a list of (x, y) tiles.  Goals that are out of bounds or impassable are ignored.
+    # Returns the next step to take on the path, the total length of the path, and the goal that was reached, as (success, nextX, nextY, pathLength, (goalX, goalY)).
+    def findPathNextStepToAnyGoal(self, world, startX, startY, goals):
+        path = self.findPathToAnyGoal(world, startX, startY, goals)
+
         # Get the next step in the path
         if (len(path) > 1):
-            nextX = path[1].x
-            nextY = path[1].y
-            return (True, nextX, nextY, len(path))
+            nextX, nextY = path[1]
+            return (True, nextX, nextY, len(path), path[-1])
         else:
-            return (False, -1, -1, -1)
+            return (False, -1, -1, -1, None)
+
+    # Find a path to whichever of several destinations (goals) is cheapest to reach, using a single search.
+    # Returns the path as a list of (x, y) tiles (including the start tile and the goal that was reached), or an empty list if none of the goals can be reached.
+    # If the start location is itself one of the goals, the path is just the start location.
+    def findPathToAnyGoal(self, world, startX, startY, goals):
+        costGrid = world.getCostGrid()
+        cacheKey = tuple(sorted(set(goals)))
+
+        # Check if there's a cached path to these destinations that can be reused
+        path = self._getCachedPath(world, costGrid, cacheKey, startX, startY)
+
+        # If not, search for one
+        if (path == None):
+            path = self._findPathToAnyGoal(world, costGrid, startX, startY, cacheKey)
+            self._addCachedPath(world, cacheKey, startX, startY, path)
+
+        return path
+
+    # Search for the cheapest path to any of the goals
+    def _findPathToAnyGoal(self, world, costGrid, startX, startY, goals):
+        print("Finding path from (" + str(startX) + ", " + str(startY) + ") to any of " + str(list(goals)))
+        return world.gridSearch.findPath(costGrid, startX, startY, goals, costGridVersion=world.costGridVersion)
+
+    # Store a path in the cache
+    def _addCachedPath(self, world, cacheKey, startX, startY, path):
+        if (len(self.pathCache) >= Pathfinder.MAX_CACHED_PATHS) and (cacheKey not in self.pathCache):
+            self.pathCache = {}
+        self.pathCache[cacheKey] = {"start": (startX, startY), "path": path, "version": world.costGridVersion}
+
+    # Get the cached path to a destination (or set of destinations), if it's still valid, trimmed so that it starts at the agent's current location.
+    # Returns None if there's no valid cached path (i.e. a new search is required).
+    def _getCachedPath(self, world, costGrid, cacheKey, startX, startY):
+        if (cacheKey not in self.pathCache):
+            return None
+        cached = self.pathCache[cacheKey]
+        path = cached["path"]
+
+        # Case 1: No path was found last time.  This is still true as long as the agent hasn't moved, and the world hasn't changed.
+        if (len(path) == 0):
+            if (cached["start"] == (startX, startY)) and (cached["version"] == world.costGridVersion):
+                return path
+            return None
+
+        # Case 2: A path was found.  Check that the agent is still on it (e.g. it may have been blocked, or teleported elsewhere)
+        if ((startX, startY) not in path):
+            return None
+        path = path[path.index((startX, startY)):]
+
+        # If the world has changed since the path was last checked, make sure none of the remaining tiles have become impassable
+        if (cached["version"] != world.costGridVersion):
+            for (x, y) in path[1:]:
+                if (costGrid[x, y] <= 0):
+                    return None
+
+        # The path is still valid
+        cached["start"] = (startX, startY)
+        cached["path"] = path
+        cached["version"] = world.costGridVersion
+        return path
 
 
     #
@@ -598,7 +690,7 @@ class Pathfinder():
                 return ActionResult.COMPLETED
 
         # If not, then randomly pick one tile
-        tileObj = random.choice(blankTiles)
+        tileObj = agent.rng.choice(blankTiles)
         tileLocation = tileObj.getWorldLocation()
 
         # Move to that spot
@@ -757,10 +849,10 @@ class Pathfinder():
         if (distToPreferred < 4):
             # We're close to the preferred location, so do a low-computation move
             # Only move 50% of the time -- keeps the agent's speed slow when it's wandering, so a user can catch up.
-            if (random.random() < probabilityToMove):
+            if (agent.rng.random() < probabilityToMove):
                 # Randomly pick a direction to move in
                 directions = ["north", "east", "south", "west"]
-                direction = random.choice(directions)
+                direction = agent.rng.choice(directions)
                 action = AutopilotAction_MoveRelative(direction, priority=args['priority']+1)
                 agent.addAutopilotActionToQueue(action)
 
@@ -797,40 +889,10 @@ class Pathfinder():
     def _doNPCAutonavigation(self, agent, world, destinationX, destinationY, besideIsOK=False):
 
         pathSuccess, nextX, nextY, pathLength = self.findPathNextStep(world, agent.attributes["gridX"], agent.attributes["gridY"], destinationX, destinationY)
-        # Back-off strategy: If 'besideIsOK=True', try to find a path to a location directly N/E/S/W from the destination
+        # Back-off strategy: If 'besideIsOK=True', try to find a path to a location directly N/E/S/W from the destination (whichever is closest)
         if (not pathSuccess) and besideIsOK:
-            pathLength = 999999
-            # North
-            _pathSuccess, _nextX, _nextY, _pathLength = self.findPathNextStep(world, agent.attributes["gridX"], agent.attributes["gridY"], destinationX, destinationY-1)
-            if (_pathSuccess) and (_pathLength < pathLength):
-                pathSuccess = _pathSuccess
-                nextX = _nextX
-                nextY = _nextY
-                pathLength = _pathLength
-
-            # East
-            _pathSuccess, _nextX, _nextY, _pathLength = self.findPathNextStep(world, agent.attributes["gridX"], agent.attributes["gridY"], destinationX+1, destinationY)
-            if (_pathSuccess) and (_pathLength < pathLength):
-                pathSuccess = _pathSuccess
-                nextX = _nextX
-                nextY = _nextY
-                pathLength = _pathLength
-
-            # South
-            _pathSuccess, _nextX, _nextY, _pathLength = self.findPathNextStep(world, agent.attributes["gridX"], agent.attributes["gridY"], destinationX, destinationY+1)
-            if (_pathSuccess) and (_pathLength < pathLength):
-                pathSuccess = _pathSuccess
-                nextX = _nextX
-                nextY = _nextY
-                pathLength = _pathLength
-
-            # West
-            _pathSuccess, _nextX, _nextY, _pathLength = self.findPathNextStep(world, agent.attributes["gridX"], agent.attributes["gridY"], destinationX-1, destinationY)
-            if (_pathSuccess) and (_pathLength < pathLength):
-                pathSuccess = _pathSuccess
-                nextX = _nextX
-                nextY = _nextY
-                pathLength = _pathLength
+            besideLocations = [(destinationX, destinationY-1), (destinationX+1, destinationY), (destinationX, destinationY+1), (destinationX-1, destinationY)]
+            pathSuccess, nextX, nextY, pathLength, _ = self.findPathNextStepToAnyGoal(world, agent.attributes["gridX"], agent.attributes["gridY"], besideLocations)
 
 
         if (not pathSuccess):
@@ -915,6 +977,198 @@ class Pathfinder():
 
 
 # Storage class for autopilot action
+
+# Grid search engine (A*, in plain Python) over the world's cost grid (indexed [x, y]), without creating an object for each tile.
+# Movement is 4-connected, entering a tile costs its value in the cost grid, and tiles with a cost <= 0 can't be entered (though a path can start on one).
+# Tiles are referred to by integer index (x * sizeY + y), and the search reads the tile costs from a flat Python list copied from the cost grid (which is
+# much faster to index than the NumPy array).  That copy is kept until the cost grid changes (see findPath()).
+# The working lists are allocated once, and reused between searches: rather than being cleared, each entry is marked with the number of the search that last wrote it.
+class GridSearch():
+    # Constructor
+    def __init__(self, sizeX, sizeY):
+        self.sizeX = sizeX
+        self.sizeY = sizeY
+        numTiles = sizeX * sizeY
+        self.costSoFar = [0] * numTiles             # Cost of the cheapest path found so far from the start to each tile (g)
+        self.cameFrom = [-1] * numTiles             # Previous tile on that path
+        self.searchNumber = [0] * numTiles          # The search that last wrote the entries above for each tile
+        self.closed = [0] * numTiles                # The search that last expanded each tile
+        self.curSearchNumber = 0
+
+        # Flat copy of the tile costs, and the cost grid (and version) it was copied from
+        self.costs = None
+        self.costsGrid = None
+        self.costsVersion = None
+
+    # Find the cheapest path from the start location to any of the goal locations.
+    # Goals that are out of bounds, or that can't be entered, are ignored.
+    # Returns the path as a list of (x, y) tiles (including the start tile and the goal that was reached), or an empty list if none of the goals can be reached.
+    # If the start location is itself one of the goals, the path is just the start location.
+    # 'costGridVersion' (see World.costGridVersion) is optional: if given, the copy of the tile costs is reused by later searches of the same cost grid,
+    # until the version changes.  Otherwise, the costs are copied for every search.
+    def findPath(self, costGrid, startX, startY, goals, costGridVersion=None):
+        sizeX = self.sizeX
+        sizeY = self.sizeY
+        if (costGrid.shape != (sizeX, sizeY)):
+            print("ERROR: GridSearch: Cost grid size " + str(costGrid.shape) + " does not match the search size (" + str(sizeX) + ", " + str(sizeY) + ").")
+            return []
+
+        goals = [(x, y) for (x, y) in goals if (x >= 0) and (x < sizeX) and (y >= 0) and (y < sizeY) and (costGrid[x, y] > 0)]
+        if ((startX, startY) in goals):
+            return [(startX, startY)]
+        if (len(goals) == 0):
+            return []
+
+        costs = self._getCosts(costGrid, costGridVersion)
+        goalIndices = set(x * sizeY + y for (x, y) in goals)
+
+        # Heuristic: Manhattan distance to the nearest goal (admissible, since every tile costs at least 1 to enter)
+        if (len(goals) == 1):
+            goalX, goalY = goals[0]
+            def heuristic(x, y):
+                return abs(x - goalX) + abs(y - goalY)
+        else:
+            def heuristic(x, y):
+                return min(abs(x - goalX) + abs(y - goalY) for (goalX, goalY) in goals)
+
+        self.curSearchNumber += 1
+        searchNumber = self.curSearchNumber
+        costSoFar = self.costSoFar
+        cameFrom = self.cameFrom
+        searchNumbers = self.searchNumber
+        closed = self.closed
+
+        # Open list entries are (estimated total cost (f), heuristic (h), insertion order, tile index).
+        # Ties on f prefer tiles closer to the goal, and then earlier insertions, so the search is deterministic.
+        startIdx = startX * sizeY + startY
+        costSoFar[startIdx] = 0
+        cameFrom[startIdx] = -1
+        searchNumbers[startIdx] = searchNumber
+        openList = [(heuristic(startX, startY), heuristic(startX, startY), 0, startIdx)]
+        numInserted = 1
+
+        while (len(openList) > 0):
+            _, _, _, idx = heapq.heappop(openList)
+            if (closed[idx] == searchNumber):
+                continue                    # Already expanded (stale entry)
+            closed[idx] = searchNumber
+
+            # Check if we've reached a goal
+            if (idx in goalIndices):
+                path = []
+                while (idx != -1):
+                    path.append((idx // sizeY, idx % sizeY))
+                    idx = cameFrom[idx]
+                path.reverse()
+                return path
+
+            # Expand the neighbours (N/E/S/W)
+            x = idx // sizeY
+            y = idx % sizeY
+            g = costSoFar[idx]
+            for (nx, ny, nIdx) in ((x, y - 1, idx - 1), (x + 1, y, idx + sizeY), (x, y + 1, idx + 1), (x - 1, y, idx - sizeY)):
+                if (nx < 0) or (nx >= sizeX) or (ny < 0) or (ny >= sizeY):
+                    continue
+                tileCost = costs[nIdx]
+                if (tileCost <= 0) or (closed[nIdx] == searchNumber):
+                    continue
+                newCost = g + tileCost
+                if (searchNumbers[nIdx] != searchNumber) or (newCost < costSoFar[nIdx]):
+                    costSoFar[nIdx] = newCost
+                    cameFrom[nIdx] = idx
+                    searchNumbers[nIdx] = searchNumber
+                    h = heuristic(nx, ny)
+                    heapq.heappush(openList, (newCost + h, h, numInserted, nIdx))
+                    numInserted += 1
+
+        # If we reach here, none of the goals are reachable
+        return []
+
+    # Get the tile costs as a flat list (indexed by tile index), reusing the last copy if the cost grid hasn't changed since it was made
+    def _getCosts(self, costGrid, costGridVersion):
+        if (costGridVersion == None) or (costGrid is not self.costsGrid) or (costGridVersion != self.costsVersion):
+            self.costs = costGrid.ravel().tolist()
+            self.costsGrid = costGrid
+            self.costsVersion = costGridVersion
+        return self.costs
+
+
+# A distance field (or flow field) for a single destination: the cost of the cheapest path from every tile in the world to that destination.
+# Any number of agents navigating to the same destination can find their next step by following the field downhill, without a search of their own.
+# Uses the same cost semantics as the A* search: 4-connected movement, entering a tile costs its value in the cost grid, and tiles with a cost <= 0 can't be entered.
+class DistanceField():
+    # Constructor
+    def __init__(self, world, destX, destY):
+        self.destX = destX
+        self.destY = destY
+        self.version = world.costGridVersion
+        self.costs = world.getCostGrid().tolist()           # The tile costs (indexed [x][y]) that the field was calculated from
+        self.distances = self._calculateDistances()
+
+    # Calculate the distance from every tile to the destination (Dijkstra's algorithm, starting at the destination)
+    def _calculateDistances(self):
+        sizeX = len(self.costs)
+        sizeY = len(self.costs[0])
+        distances = [[math.inf] * sizeY for x in range(sizeX)]
+        if (self.costs[self.destX][self.destY] <= 0):
+            # The destination can't be entered, so it can't be reached from anywhere
+            return distances
+
+        distances[self.destX][self.destY] = 0
+        openList = [(0, self.destX, self.destY)]
+        while (len(openList) > 0):
+            distance, x, y = heapq.heappop(openList)
+            if (distance > distances[x][y]):
+                continue                    # Stale entry
+            # Tiles that can't be entered can still be the start of a path (e.g. the tile an agent is standing on), but paths can't pass through them
+            tileCost = self.costs[x][y]
+            if (tileCost <= 0):
+                continue
+            # Moving from a neighbour onto this tile costs this tile's cost
+            for (nx, ny) in ((x, y - 1), (x + 1, y), (x, y + 1), (x - 1, y)):
+                if (nx < 0) or (nx >= sizeX) or (ny < 0) or (ny >= sizeY):
+                    continue
+                if (distance + tileCost < distances[nx][ny]):
+                    distances[nx][ny] = distance + tileCost
+                    heapq.heappush(openList, (distance + tileCost, nx, ny))
+
+        return distances
+
+    # Get the path from a starting location to the destination, by following the field downhill.
+    # Returns the path as a list of (x, y) tiles (including the start and end tiles), or an empty list if the destination can't be reached.
+    # If the world has changed since the field was calculated, then returns None if the path has become blocked (or there was no path), meaning that the field needs to be recalculated.
+    def getPath(self, world, startX, startY):
+        isCurrent = (self.version == world.costGridVersion)
+        if (self.distances[startX][startY] == math.inf):
+            return [] if (isCurrent) else None
+
+        costGrid = world.getCostGrid()
+        sizeX = len(self.costs)
+        sizeY = len(self.costs[0])
+        path = [(startX, startY)]
+        x, y = startX, startY
+        while (x != self.destX) or (y != self.destY):
+            # Take the step to the neighbour with the cheapest path to the destination (ties are broken in N/E/S/W order)
+            bestX, bestY = -1, -1
+            bestDistance = math.inf
+            for (nx, ny) in ((x, y - 1), (x + 1, y), (x, y + 1), (x - 1, y)):
+                if (nx < 0) or (nx >= sizeX) or (ny < 0) or (ny >= sizeY) or (self.costs[nx][ny] <= 0):
+                    continue
+                distance = self.costs[nx][ny] + self.distances[nx][ny]
+                if (distance < bestDistance):
+                    bestX, bestY = nx, ny
+                    bestDistance = distance
+
+            # If the world has changed, make sure this step hasn't become blocked
+            if (not isCurrent) and (costGrid[bestX, bestY] <= 0):
+                return None
+
+            x, y = bestX, bestY
+            path.append((x, y))
+
+        return path
+
+
 class AutopilotAction():
     # Constructor
     # ActionType is an enumeration (AutopilotActionType)
@@ -949,6 +1203,108 @@ class AutopilotAction():
         return "AutopilotAction: " + str(self.actionType) + " (args: " + str(self.args) + ", priority: " + str(self.priority) + ")"
 
 
+# A queue of autopilot actions, ordered by priority (highest first), then by timestamp (earliest first).
+# The queue is stored as a heap, so adding or removing the current (first) action takes O(log n) time, and the current action (and so the
+# highest priority in the queue) can be checked in O(1) time.  Removed actions are only marked as removed, and are dropped from the heap
+# once they reach the top.
+# It can be used like the list it replaces: len(queue), queue[0] (the current action), queue.remove(action), and iterating (in queue order).
+class AutopilotActionQueue():
+    # Heap entry fields: [-priority, timestamp, sequence number (to break ties), action (or None, if removed)]
+    ENTRY_ACTION = 3
+
+    # Constructor
+    def __init__(self):
+        self.heap = []
+        self.size = 0
+        self.sequenceCounter = 0
+
+    # Add an action to the queue.  Returns a handle that can be used to cancel the action (see cancel()).
+    # Note: The action's priority and timestamp are read when it's added -- changing them afterwards won't change its place in the queue.
+    def push(self, action):
+        entry = [-action.priority, action.timestamp, self.sequenceCounter, action]
+        self.sequenceCounter += 1
+        heapq.heappush(self.heap, entry)
+        self.size += 1
+        return entry
+
+    # Get the current (first) action in the queue, or None if the queue is empty
+    def peek(self):
+        self._dropRemovedEntries()
+        if (len(self.heap) == 0):
+            return None
+        return self.heap[0][AutopilotActionQueue.ENTRY_ACTION]
+
+    # Remove and return the current (first) action in the queue, or None if the queue is empty
+    def pop(self):
+        self._dropRemovedEntries()
+        if (len(self.heap) == 0):
+            return None
+        entry = heapq.heappop(self.heap)
+        self.size -= 1
+        action = entry[AutopilotActionQueue.ENTRY_ACTION]
+        entry[AutopilotActionQueue.ENTRY_ACTION] = None
+        return action
+
+    # Cancel an action, given the handle returned by push().  Returns True if the action was removed, or False if it was no longer in the queue.
+    def cancel(self, handle):
+        if (handle[AutopilotActionQueue.ENTRY_ACTION] == None):
+            return False
+        handle[AutopilotActionQueue.ENTRY_ACTION] = None
+        self.size -= 1
+        self._dropRemovedEntries()
+        return True
+
+    # Remove an action from the queue (the first occurrence, in queue order).  Raises a ValueError if it's not in the queue (like list.remove()).
+    def remove(self, action):
+        # Fast path: The action is usually the current action
+        self._dropRemovedEntries()
+        if (len(self.heap) > 0) and (self.heap[0][AutopilotActionQueue.ENTRY_ACTION] is action):
+            self.pop()
+            return
+
+        # Otherwise, find the first entry (in queue order) for this action
+        matchingEntries = [entry for entry in self.heap if (entry[AutopilotActionQueue.ENTRY_ACTION] is action)]
+        if (len(matchingEntries) == 0):
+            raise ValueError("AutopilotActionQueue.remove(): Action is not in the queue: " + str(action))
+        self.cancel(min(matchingEntries))
+
+    # Remove all actions from the queue
+    def clear(self):
+        # Mark the entries as removed, so that any outstanding handles to them can't be cancelled
+        for entry in self.heap:
+            entry[AutopilotActionQueue.ENTRY_ACTION] = None
+        self.heap = []
+        self.size = 0
+
+    # Get the highest priority of any action in the queue (or None, if the queue is empty)
+    def getMaxPriority(self):
+        self._dropRemovedEntries()
+        if (len(self.heap) == 0):
+            return None
+        return -self.heap[0][0]
+
+    # Get the actions in the queue, in queue order
+    def getActions(self):
+        return [entry[AutopilotActionQueue.ENTRY_ACTION] for entry in sorted(self.heap) if (entry[AutopilotActionQueue.ENTRY_ACTION] != None)]
+
+    # Drop any removed entries from the top of the heap
+    def _dropRemovedEntries(self):
+        heap = self.heap
+        while (len(heap) > 0) and (heap[0][AutopilotActionQueue.ENTRY_ACTION] == None):
+            heapq.heappop(heap)
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, idx):
+        if (idx == 0) and (self.size > 0):
+            return self.peek()
+        return self.getActions()[idx]
+
+    def __iter__(self):
+        return iter(self.getActions())
+
+
 # Specific action types
 class AutopilotAction_GotoXY(AutopilotAction):
     # Constructor
@@ -0,0 +1,101 @@
+# RegionSubscription.py
+
+# A subscription to the objects in a rectangular region of the world (see World.subscribeToRegion()).
+#
+# Rather than scanning a region every tick, an object can subscribe to it, and the world notes which tiles of the region have changed whenever
+# objects are added to, moved on, or removed from them (see World.invalidateTile()).  The subscription keeps track of the objects in the region
+# that match a predicate, and only re-checks the tiles that have changed, so checking an unchanged region is cheap:
+#  - hasChanges() returns true if any tile in the region has changed since the last call to getChanges()/getMatchingObjects().
+#  - getChanges() returns the matching objects that have entered and left the region since the last call.
+#  - getMatchingObjects() returns the matching objects currently in the region.
+#
+# Note: Only changes that invalidate a tile are noticed (i.e. objects being added/removed/moved, container contents changing, or the attributes in
+# ObjectAttributes.TILE_KEYS changing).  The predicate should only depend on things that don't change while an object is in the region (like its type),
+# or the subscriber should call invalidate() when they might have changed.
+# The predicate and callback are stored with the world (and copied by World.fork()), so they should be picklable -- e.g. module-level functions, or
+# bound methods of objects -- rather than lambdas.
+# Subscriptions made for an object (the 'owner') are removed by the world when that object is removed from it (see World.unsubscribeOwnerFromRegions()),
+# after which isActive is false.
+class RegionSubscription:
+    # Constructor
+    # The region is (x0, y0) to (x1, y1), inclusive.  'predicate' is a function (object -> bool) for the objects of interest (or None, for all objects).
+    # 'includeContents' is passed to World.getObjectsAt() (i.e. whether objects in containers count as being in the region).
+    # 'callback' (optional) is called with this subscription as soon as a tile in the region changes.  It's called in the middle of the change, so
+    # it should only make a note of it (e.g. wake the subscriber for its next tick) -- the changes themselves should be read later, with getChanges().
+    # 'owner' (optional) is the object the subscription is for.
+    def __init__(self, world, x0, y0, x1, y1, predicate=None, includeContents=True, callback=None, owner=None):
+        self.world = world
+        self.x0 = min(x0, x1)
+        self.y0 = min(y0, y1)
+        self.x1 = max(x0, x1)
+        self.y1 = max(y0, y1)
+        self.predicate = predicate
+        self.includeContents = includeContents
+        self.callback = callback
+        self.owner = owner
+        # Whether the subscription is still registered with the world (see World.unsubscribeFromRegion())
+        self.isActive = True
+
+        # Matching objects on each tile, as of the last update.  Every tile starts out changed, so the first update scans the whole region.
+        self.matchingObjectsByTile = {}
+        self.changedTiles = set(self.getTiles())
+
+    # Get the tiles in the region that are within the world bounds
+    def getTiles(self):
+        tiles = []
+        for x in range(max(self.x0, 0), min(self.x1, self.world.sizeX - 1) + 1):
+            for y in range(max(self.y0, 0), min(self.y1, self.world.sizeY - 1) + 1):
+                tiles.append((x, y))
+        return tiles
+
+    # Returns true if the region covers a given location
+    def coversLocation(self, x, y):
+        return (x >= self.x0) and (x <= self.x1) and (y >= self.y0) and (y <= self.y1)
+
+    # Called by the world when a tile in the region changes
+    def markTileChanged(self, x, y):
+        self.changedTiles.add((x, y))
+        if (self.callback != None):
+            self.callback(self)
+
+    # Mark every tile in the region as changed (e.g. if something the predicate depends on may have changed)
+    def invalidate(self):
+        self.changedTiles.update(self.getTiles())
+
+    # Returns true if any tile in the region has changed since the last update
+    def hasChanges(self):
+        return (len(self.changedTiles) > 0)
+
+    # Re-check the tiles that have changed.  Returns (objects that entered the region, objects that left the region) since the last update.
+    def getChanges(self):
+        if (len(self.changedTiles) == 0):
+            return ([], [])
+
+        before = []
+        after = []
+        for (x, y) in sorted(self.changedTiles):
+            before.extend(self.matchingObjectsByTile.get((x, y), []))
+            objects = self.world.getObjectsAt(x, y, includeContents=self.includeContents)
+            if (self.predicate != None):
+                objects = [obj for obj in objects if self.predicate(obj)]
+            if (len(objects) > 0):
+                self.matchingObjectsByTile[(x, y)] = objects
+            else:
+                self.matchingObjectsByTile.pop((x, y), None)
+            after.extend(objects)
+        self.changedTiles.clear()
+
+        # An object that moved between two changed tiles in the region hasn't entered or left it
+        beforeIds = set(id(obj) for obj in before)
+        afterIds = set(id(obj) for obj in after)
+        entered = [obj for obj in after if (id(obj) not in beforeIds)]
+        left = [obj for obj in before if (id(obj) not in afterIds)]
+        return (entered, left)
+
+    # Get the matching objects currently in the region (in tile order)
+    def getMatchingObjects(self):
+        self.getChanges()
+        out = []
+        for location in sorted(self.matchingObjectsByTile):
+            out.extend(self.matchingObjectsByTile[location])
+        return out
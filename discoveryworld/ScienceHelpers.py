@@ -1,54 +1,87 @@
 # ScienceHelpers.py
 # A collection of helper functions that are useful for calculating e.g. various physical science quantities
 
+import numpy as np
+
 
 #
 #   Radiation level
 #
 
+# Inverse-square kernels for getRadiationLevelAroundLocation() and getRadiationLevelGrid(), keyed by window size (see getRadiationKernel())
+RADIATION_KERNELS = {}
+
+# Get the inverse-square kernel for a given window size.  Returns (offsets, divisors), where 'offsets' is a list of (dx, dy) for each tile in the
+# window (in x, then y order), and 'divisors' is a NumPy array (indexed [dx + halfWindowSize, dy + halfWindowSize]) of the squared distance
+# that the radiation from that tile is divided by.
+def getRadiationKernel(windowSize=5):
+    if (windowSize not in RADIATION_KERNELS):
+        # Get half the window size
+        halfWindowSize = int((windowSize-1) / 2)
+
+        offsets = []
+        divisors = np.zeros((2*halfWindowSize+1, 2*halfWindowSize+1), dtype=np.float64)
+        for dx in range(-halfWindowSize, halfWindowSize+1):
+            for dy in range(-halfWindowSize, halfWindowSize+1):
+                offsets.append((dx, dy))
+                # Get the distance between (gridX, gridY) and (gridX+dx, gridY+dy)
+                distance = (((dx)**2 + (dy)**2)**0.5) + 2     # Plus 2 so things at the same tile will be considered distance 2.
+                # Inverse square law -- radiation level is divided by the square of the distance
+                divisors[dx + halfWindowSize, dy + halfWindowSize] = distance**2
+
+        RADIATION_KERNELS[windowSize] = (offsets, divisors)
+
+    return RADIATION_KERNELS[windowSize]
+
 # Window size is the size of the window in which to calculate the radiation level. It must be an odd number (e.g. 1, 3, 5, etc.)
 # Anything "held up to" the detector is considered to be at distance 1.  Things in the same tile are considered distance 2, things 1 tile away are considered distance 3, etc.
 # 'excludeObject' is nominally a specific object being measured by the radiation sensor (i.e. at distance 1), that we want to exclude from this background rate calculation.
 def getRadiationLevelAroundLocation(world, gridX, gridY, excludeObject=None, windowSize=5):
     # Get half the window size
     halfWindowSize = int((windowSize-1) / 2)
+    offsets, divisors = getRadiationKernel(windowSize)
 
     totalRadiationLevel = 0
 
-    for x in range(gridX-halfWindowSize, gridX+halfWindowSize+1):
-        for y in range(gridY-halfWindowSize, gridY+halfWindowSize+1):
-            #print("Examining radiation level at (" + str(x) + ", " + str(y) + ")")
-            if (world.isWithinBounds(x, y)):
-                # Get the radiation level at the current location
-                radiationLevel = getRadiationLevelAtLocation(world, x, y, excludeObject=excludeObject)
-                #print("\t Radiation level at (" + str(x) + ", " + str(y) + ") is " + str(radiationLevel) + " uSv/h")
-                # Get the distance between (gridX, gridY) and (x, y)
-                distance = (((gridX-x)**2 + (gridY-y)**2)**0.5) + 2     # Plus 2 so things at the same tile will be considered distance 2.
-                #print("\t Distance: " + str(distance))
-                # Inverse square law -- divide radiation level by the square of the distance
-                radiationLevel /= distance**2
-                #print("\t After inverse square law, radiation level is " + str(radiationLevel) + " uSv/h")
-                # Add the radiation level to the total
-                totalRadiationLevel += radiationLevel
-                #print("\t Running total: " + str(totalRadiationLevel) + " uSv/h")
-
-    #print("total: " + str(totalRadiationLevel) + " uSv/h")
+    for (dx, dy) in offsets:
+        x = gridX + dx
+        y = gridY + dy
+        if (world.isWithinBounds(x, y)):
+            # Get the radiation level at the current location
+            radiationLevel = getRadiationLevelAtLocation(world, x, y, excludeObject=excludeObject)
+            # Inverse square law -- divide radiation level by the square of the distance
+            radiationLevel /= float(divisors[dx + halfWindowSize, dy + halfWindowSize])
+            # Add the radiation level to the total
+            totalRadiationLevel += radiationLevel
+
     return totalRadiationLevel
 
 
 # Returns the total radiation level at a given location
+# The world keeps track of the radiation from each tile (see World.getTileRadiation()), so this doesn't need to look at the objects on the tile.
 def getRadiationLevelAtLocation(world, gridX, gridY, excludeObject=None):
-    # Get all objects at the current location
-    allObjectsAndParts = world.getObjectsAt(gridX, gridY, respectContainerStatus=False, includeParts=True)
+    return world.getTileRadiation(gridX, gridY, excludeObject=excludeObject)
 
-    totalRadiationLevel = 0
-    for obj in allObjectsAndParts:
-        if (excludeObject == None) or (obj.uuid != excludeObject.uuid):     # Make sure we're not including an object marked for exclusion.
-            for material in obj.attributes["materials"]:
-                if ("radiationusvh" in material):
-                    totalRadiationLevel += material["radiationusvh"]
 
-    return totalRadiationLevel
+# Returns the radiation level around every location in the world (i.e. getRadiationLevelAroundLocation() for every tile, without excluding any objects),
+# as a NumPy array indexed [x, y].  This is calculated for the whole world at once, so it's cheap enough for analysis or heatmaps.
+# Note: The values may differ from getRadiationLevelAroundLocation() in the last few decimal places, since the terms are summed in a different order.
+def getRadiationLevelGrid(world, windowSize=5):
+    # Get half the window size
+    halfWindowSize = int((windowSize-1) / 2)
+    offsets, divisors = getRadiationKernel(windowSize)
+
+    # Pad the radiation from each tile with zeros, so the window can extend past the edges of the world
+    sources = world.getRadiationSourceGrid()
+    padded = np.pad(sources, halfWindowSize)
+
+    # Add up the contribution from each offset in the window
+    radiationLevels = np.zeros(sources.shape, dtype=np.float64)
+    for (dx, dy) in offsets:
+        shifted = padded[halfWindowSize + dx : halfWindowSize + dx + sources.shape[0], halfWindowSize + dy : halfWindowSize + dy + sources.shape[1]]
+        radiationLevels += shifted / divisors[dx + halfWindowSize, dy + halfWindowSize]
+
+    return radiationLevels
 
 
 
@@ -4,6 +4,8 @@
 # The name is used to retrieve the sprite from the library.
 
 import json
+import math
+from collections import OrderedDict
 from os.path import join as pjoin
 
 import pygame
@@ -12,6 +14,9 @@ from discoveryworld.constants import ASSETS_PATH
 
 
 class SpriteLibrary:
+    # Maximum number of scaled sprites to keep (see getScaledSprite()).  The least recently used ones are discarded first.
+    MAX_SCALED_SPRITES = 2048
+
     # Constructor
     def __init__(self, assetPath, filenameIndex):
         self.assetPath = assetPath or ASSETS_PATH
@@ -19,6 +24,9 @@ class SpriteLibrary:
         self.sprites = {}
         self.warnings = []
 
+        # Cache of scaled sprites, keyed by (sprite name, scale), from least to most recently used
+        self.scaledSprites = OrderedDict()
+
         # Load sprites from index
         self.loadIndex(pjoin(self.assetPath, filenameIndex))
 
@@ -178,6 +186,71 @@ class SpriteLibrary:
     def getSpriteNames(self):
         return sorted(self.sprites.keys())
 
+    # Get a sprite scaled by a given factor.  Scaled sprites are cached (up to MAX_SCALED_SPRITES of them), so each sprite only has to be scaled once per scale.
+    # Note: The surface returned is shared, and should not be modified.
+    def getScaledSprite(self, spriteName, scale):
+        sprite = self.sprites[spriteName]
+        if (scale == 1):
+            return sprite
+
+        # Check the cache
+        key = (spriteName, scale)
+        scaledSprite = self.scaledSprites.get(key)
+        if (scaledSprite != None):
+            self.scaledSprites.move_to_end(key)
+            return scaledSprite
+
+        scaledSprite = pygame.transform.scale(sprite, (int(sprite.get_width() * scale), int(sprite.get_height() * scale)))
+        # Convert the scaled sprite to the display's pixel format (if there is a display), so it's faster to draw
+        if (pygame.display.get_surface() != None):
+            if (scaledSprite.get_flags() & pygame.SRCALPHA):
+                scaledSprite = scaledSprite.convert_alpha()
+            else:
+                scaledSprite = scaledSprite.convert()
+
+        self.scaledSprites[key] = scaledSprite
+        if (len(self.scaledSprites) > SpriteLibrary.MAX_SCALED_SPRITES):
+            self.scaledSprites.popitem(last=False)
+        return scaledSprite
+
+    # Scale every sprite in the library ahead of time, for each of the given scales (e.g. the scales the world and user interface are rendered at)
+    def prewarmScales(self, scales):
+        for scale in scales:
+            if (scale == 1):
+                continue
+            for spriteName in self.sprites:
+                self.getScaledSprite(spriteName, scale)
+
+    # Get the area of the window that renderSprite() would draw a sprite on (as a pygame.Rect), or None if it wouldn't draw anything.
+    # Positions can be fractional, in which case the rectangle includes the extra pixel that the sprite might be rounded towards.
+    def getSpriteRect(self, spriteName, x, y, scale=1, adjustY=True):
+        tileSize = 32
+        if (scale != 1):
+            tileSize = int(32 * scale)
+
+        if (spriteName not in self.sprites):
+            spriteName = "missing_missing"
+            if (spriteName not in self.sprites):
+                return None
+        sprite = self.sprites[spriteName]
+
+        if (adjustY):
+            y = y - (sprite.get_height()*scale) + tileSize
+
+        width = sprite.get_width()
+        height = sprite.get_height()
+        if (scale != 1):
+            width = int(width * scale)
+            height = int(height * scale)
+
+        left = math.floor(x)
+        top = math.floor(y)
+        if (left != x):
+            width += 1
+        if (top != y):
+            height += 1
+        return pygame.Rect(left, top, width, height)
+
     # Display a sprite
     # spriteName: The name of the sprite to display
     # window: The window to display the sprite in
@@ -210,7 +283,7 @@ class SpriteLibrary:
             #print("Original Y: " + str(y) + "    Adjusted y: " + str(adjusted_y))
 
         if (scale != 1):
-            # Scale around the center of the sprite
-            sprite = pygame.transform.scale(sprite, (int(sprite.get_width() * scale), int(sprite.get_height() * scale)))
+            # Use the pre-scaled sprite
+            sprite = self.getScaledSprite(spriteName, scale)
 
         window.blit(sprite, (x, adjusted_y))
@@ -0,0 +1,413 @@
+# StaticBackground.py
+
+import math
+from collections import OrderedDict
+
+import pygame
+
+from discoveryworld.Layer import Layer
+
+
+# A cached image of the layers of the world that rarely change (WORLD, BUILDING, and FURNITURE), at one render scale (see World.renderViewport()).
+#
+# Rather than drawing every sprite on every layer of every visible tile each frame, the static layers are drawn onto a background (over black, which is
+# what the window is cleared to before a viewport is rendered).  A viewport is then a few blits of the background, and only the dynamic layers (OBJECTS,
+# AGENT, and AIR) are drawn sprite by sprite on top of it.
+#
+# The background is stored in pieces, one per chunk of the world grid (see WorldGrid), plus pieces for the padding around the edges of the world.  A piece
+# is only drawn when a viewport first needs it, and only the most recently used pieces are kept, so the memory used doesn't grow with the size of the world.
+#
+# The sprites drawn for each tile are recorded (a chunk at a time, the first time a viewport needs the chunk).  A tile is checked again when it might have
+# changed -- when the objects on it change (see World.invalidateTile()), when anything on it is ticked (see World.tick()), or when one of its objects needs
+# its sprite name updated -- and redrawn if its sprites are different.
+# Sprites can extend past their tiles (e.g. objects on tables), so redrawing a tile also redraws the parts of any neighbouring sprites that overlap it, and
+# sprites that cross the edge of a viewport are fixed up when it's rendered, so the result is the same as drawing every sprite on the viewport's tiles.
+class StaticBackground:
+    # Layers that are drawn on the background, and layers that are drawn over it every frame
+    STATIC_LAYERS = (Layer.WORLD, Layer.BUILDING, Layer.FURNITURE)
+    DYNAMIC_LAYERS = (Layer.OBJECTS, Layer.AGENT, Layer.AIR)
+
+    # Maximum number of pieces of the background to keep (a 24x16-tile viewport covers up to 6 of them, and the rest are kept for when it moves)
+    MAX_PIECES = 12
+
+    # Constructor
+    def __init__(self, world, scale):
+        self.world = world
+        self.scale = scale
+        self.tileSize = int(32 * scale)
+
+        # Sprites drawn on each tile: (x, y) -> one tuple per static layer, of (spriteName, xOffset, yOffset, scale).  Tiles with no sprites are left out.
+        self.tileSprites = {}
+        # The area covered by each tile's sprites, relative to the tile's top-left corner (see SpriteLibrary.getSpriteRect())
+        self.tileRects = {}
+        # The objects drawn on each tile (including their contents and parts), in case any of them need their sprite names updated.
+        # The version is incremented whenever they change, and the objects in the last region checked are kept as one list (see _getRegionObjects()).
+        self.tileObjects = {}
+        self.tileObjectsVersion = 0
+        self.regionObjects = None
+        # Tiles whose sprites extend past the edges of the tile
+        self.overflowingTiles = set()
+        # Tiles that might have changed since their sprites were recorded
+        self.changedTiles = set()
+        # Chunks of the world grid (chunkX, chunkY) whose tiles have had their sprites recorded (see _recordChunks())
+        self.recordedChunks = set()
+
+        # How far (in tiles) any sprite extends past the edge of its tile.  The background has this many tiles of padding around the world.
+        self.margin = 0
+        # Pieces of the background that have been drawn: (pieceX, pieceY) -> (surface, rect), most recently used last.  Background pixel (0, 0) is the
+        # top-left corner of tile (0, 0), and each piece covers 'rect' (in background pixels) of a chunk of the world (see _getPiece()).
+        self.pieceSize = world.grid.chunkSize * self.tileSize
+        self.pieces = OrderedDict()
+        # The pixel format (bit size and masks) of the window that the pieces were drawn for
+        self.pixelFormat = None
+
+    # Note that a tile might have changed (called by World.invalidateTile())
+    def invalidateTile(self, x, y):
+        self.changedTiles.add((x, y))
+
+    # Note that a number of tiles might have changed (called by World.tick(), for the tiles that have something ticked on them)
+    def invalidateTiles(self, tiles):
+        self.changedTiles.update(tiles)
+
+    # Returns true if the background can be drawn onto a given window (i.e. blitting it copies the pixels as-is, which isn't the case for windows with per-pixel alpha)
+    def isCompatible(self, window):
+        return (window.get_flags() & pygame.SRCALPHA) == 0
+
+    #
+    #   Tiles
+    #
+
+    # Get the sprites on the static layers of a tile, the same way World.renderViewport() does
+    def _getTileSprites(self, x, y):
+        tileLayers = self.world.grid.getTileLayers(x, y)
+        sprites = []
+        for layer in StaticBackground.STATIC_LAYERS:
+            layerSprites = []
+            for object in tileLayers[layer.value]:
+                for spriteDict in object.getSpriteNamesWithContents():
+                    layerSprites.append((spriteDict["spriteName"], spriteDict.get("xOffset", 0), spriteDict.get("yOffset", 0), self.scale * spriteDict.get("scale", 1.0)))
+            sprites.append(tuple(layerSprites))
+        return tuple(sprites)
+
+    # Get the objects on the static layers of a tile, including their contents and parts
+    def _getTileObjects(self, x, y):
+        tileLayers = self.world.grid.getTileLayers(x, y)
+        objects = []
+        for layer in StaticBackground.STATIC_LAYERS:
+            objects.extend(tileLayers[layer.value])
+        idx = 0
+        while (idx < len(objects)):
+            objects.extend(objects[idx].contents)
+            objects.extend(objects[idx].parts)
+            idx += 1
+        return objects
+
+    # Returns true if getting the sprites of a tile would update any sprite names (which World.renderViewport() only does for the tiles in the viewport)
+    def _hasPendingSpriteNames(self, x, y):
+        if ((x, y) in self.changedTiles):
+            objects = self._getTileObjects(x, y)
+        else:
+            objects = self.tileObjects.get((x, y), ())
+        for object in objects:
+            if (object.needsSpriteNameUpdate):
+                return True
+        return False
+
+    # Record the current sprites of a tile.  Returns the areas of the background that need to be redrawn (if its sprites changed), relative to the tile.
+    def _updateTile(self, x, y):
+        location = (x, y)
+        self.changedTiles.discard(location)
+        sprites = self._getTileSprites(x, y)
+        objects = self._getTileObjects(x, y)
+        if (objects != self.tileObjects.get(location, [])):
+            if (len(objects) > 0):
+                self.tileObjects[location] = objects
+            else:
+                del self.tileObjects[location]
+            self.tileObjectsVersion += 1
+
+        if (sprites == self.tileSprites.get(location, ((), (), ()))):
+            return []
+
+        changedAreas = []
+        oldRect = self.tileRects.pop(location, None)
+        if (oldRect != None):
+            changedAreas.append(oldRect)
+        self.tileSprites.pop(location, None)
+        self.overflowingTiles.discard(location)
+
+        # Find the area covered by the new sprites
+        rect = None
+        for layerSprites in sprites:
+            for (spriteName, xOffset, yOffset, spriteScale) in layerSprites:
+                spriteRect = self.world.spriteLibrary.getSpriteRect(spriteName, xOffset, yOffset, spriteScale)
+                if (spriteRect != None):
+                    rect = spriteRect if (rect == None) else rect.union(spriteRect)
+
+        if (rect != None):
+            self.tileSprites[location] = sprites
+            self.tileRects[location] = rect
+            changedAreas.append(rect)
+
+            # Check whether the sprites extend past the tile (and if so, how far)
+            tileSize = self.tileSize
+            overflow = max(-rect.left, -rect.top, rect.right - tileSize, rect.bottom - tileSize)
+            if (overflow > 0):
+                self.overflowingTiles.add(location)
+                margin = math.ceil(overflow / tileSize)
+                if (margin > self.margin):
+                    # The background needs more padding, so it will have to be redrawn from scratch
+                    self.margin = margin
+                    self.pieces.clear()
+
+        return changedAreas
+
+    #
+    #   Drawing
+    #
+
+    # Draw the sprites of one static layer of a tile, with the tile's top-left corner at (screenX, screenY)
+    def _drawTileLayer(self, surface, location, layerIdx, screenX, screenY):
+        sprites = self.tileSprites.get(location)
+        if (sprites != None):
+            spriteLibrary = self.world.spriteLibrary
+            for (spriteName, xOffset, yOffset, spriteScale) in sprites[layerIdx]:
+                spriteLibrary.renderSprite(surface, spriteName, screenX + xOffset, screenY + yOffset, spriteScale)
+
+    # Get the tiles within a region of the world (tile coordinates, end exclusive) whose sprites overlap an area of a surface that tile (0, 0) is drawn at (originX, originY) on
+    def _getTilesOverlapping(self, area, originX, originY, region):
+        tileSize = self.tileSize
+        startX = max(region[0], (area.left - originX) // tileSize - self.margin)
+        startY = max(region[1], (area.top - originY) // tileSize - self.margin)
+        endX = min(region[2], (area.right - 1 - originX) // tileSize + self.margin + 1)
+        endY = min(region[3], (area.bottom - 1 - originY) // tileSize + self.margin + 1)
+        locations = []
+        for y in range(startY, endY):
+            for x in range(startX, endX):
+                rect = self.tileRects.get((x, y))
+                if (rect != None) and (rect.move(x * tileSize + originX, y * tileSize + originY).colliderect(area)):
+                    locations.append((x, y))
+        return locations
+
+    # Get the area of the background (in background pixels) covered by the world and its padding
+    def _getBounds(self):
+        tileSize = self.tileSize
+        padding = self.margin * tileSize
+        return pygame.Rect(-padding, -padding, self.world.sizeX * tileSize + 2 * padding, self.world.sizeY * tileSize + 2 * padding)
+
+    # Draw an area of the background (a pygame.Rect, in background pixels) onto a piece
+    def _drawArea(self, piece, area):
+        (surface, rect) = piece
+        tileSize = self.tileSize
+        # The surface has a gutter above and to the left of the area the piece covers, so that every sprite overlapping the piece is drawn at a
+        # non-negative position (and its fractional position is rounded the same way as on the window)
+        originX = rect.left - (surface.get_width() - rect.width)
+        originY = rect.top - (surface.get_height() - rect.height)
+        locations = self._getTilesOverlapping(area, 0, 0, (0, 0, self.world.sizeX, self.world.sizeY))
+
+        surfaceArea = area.move(-originX, -originY)
+        surface.set_clip(surfaceArea)
+        surface.fill((0, 0, 0), surfaceArea)
+        for layerIdx in range(len(StaticBackground.STATIC_LAYERS)):
+            for (x, y) in locations:
+                self._drawTileLayer(surface, (x, y), layerIdx, x * tileSize - originX, y * tileSize - originY)
+        surface.set_clip(None)
+
+    # Get a piece of the background, as (surface, rect), drawing it if it hasn't been drawn yet
+    def _getPiece(self, window, key):
+        piece = self.pieces.get(key)
+        if (piece != None):
+            self.pieces.move_to_end(key)
+            return piece
+
+        pieceSize = self.pieceSize
+        rect = pygame.Rect(key[0] * pieceSize, key[1] * pieceSize, pieceSize, pieceSize).clip(self._getBounds())
+        # Sprites can start up to (2 * margin) tiles above or to the left of the piece (from tiles up to 'margin' tiles away)
+        gutter = 2 * self.margin * self.tileSize
+        surface = pygame.Surface((rect.width + gutter, rect.height + gutter), 0, window)
+        piece = (surface, rect)
+        self._drawArea(piece, rect)
+
+        self.pieces[key] = piece
+        if (len(self.pieces) > StaticBackground.MAX_PIECES):
+            # Drop the least recently used piece
+            self.pieces.popitem(last=False)
+        return piece
+
+    # Redraw an area of the background (a pygame.Rect, in background pixels) on any pieces that have been drawn
+    def _redrawArea(self, area):
+        for piece in self.pieces.values():
+            pieceArea = area.clip(piece[1])
+            if (pieceArea.width > 0) and (pieceArea.height > 0):
+                self._drawArea(piece, pieceArea)
+
+    # Get the objects drawn on the tiles in a region of the world, as a list of (object, location).  The list is kept until any tile's objects change.
+    def _getRegionObjects(self, region):
+        if (self.regionObjects != None) and (self.regionObjects[0] == region) and (self.regionObjects[1] == self.tileObjectsVersion):
+            return self.regionObjects[2]
+
+        (startX, startY, endX, endY) = region
+        regionObjects = []
+        for y in range(startY, endY):
+            for x in range(startX, endX):
+                objects = self.tileObjects.get((x, y))
+                if (objects != None):
+                    for object in objects:
+                        regionObjects.append((object, (x, y)))
+        self.regionObjects = (region, self.tileObjectsVersion, regionObjects)
+        return regionObjects
+
+    # Bring the background up to date for a region of the world (tile coordinates, end exclusive).  Every changed tile in the region has its sprites
+    # checked.  Returns false if that can't be done, because getting the sprites of the tiles outside 'viewport' would update sprite names.
+    def _update(self, window, region, viewport):
+        (startX, startY, endX, endY) = region
+        changedTiles = [location for location in self.changedTiles if (startX <= location[0] < endX) and (startY <= location[1] < endY)]
+        # Also check for objects whose sprite names need updating
+        for (object, location) in self._getRegionObjects(region):
+            if (object.needsSpriteNameUpdate) and (location not in changedTiles):
+                changedTiles.append(location)
+        if (len(changedTiles) == 0):
+            return True
+
+        (viewStartX, viewStartY, viewEndX, viewEndY) = viewport
+        for (x, y) in changedTiles:
+            inViewport = (viewStartX <= x < viewEndX) and (viewStartY <= y < viewEndY)
+            if (not inViewport) and (self._hasPendingSpriteNames(x, y)):
+                return False
+
+        tileSize = self.tileSize
+        changedAreas = []
+        for (x, y) in sorted(changedTiles, key=lambda location: (location[1], location[0])):
+            for rect in self._updateTile(x, y):
+                changedAreas.append((x, y, rect))
+
+        for (x, y, rect) in changedAreas:
+            self._redrawArea(rect.move(x * tileSize, y * tileSize))
+        return True
+
+    # Record the sprites of the tiles in every chunk that overlaps a region of the world (tile coordinates, end exclusive), if they haven't been recorded yet.
+    # Tiles that can't be recorded without updating sprite names (i.e. outside 'viewport') are left as changed.
+    def _recordChunks(self, region, viewport):
+        chunkSize = self.world.grid.chunkSize
+        (viewStartX, viewStartY, viewEndX, viewEndY) = viewport
+        for chunkX in range(region[0] // chunkSize, (region[2] + chunkSize - 1) // chunkSize):
+            for chunkY in range(region[1] // chunkSize, (region[3] + chunkSize - 1) // chunkSize):
+                if ((chunkX, chunkY) in self.recordedChunks):
+                    continue
+                self.recordedChunks.add((chunkX, chunkY))
+                for x in range(chunkX * chunkSize, min((chunkX + 1) * chunkSize, self.world.sizeX)):
+                    for y in range(chunkY * chunkSize, min((chunkY + 1) * chunkSize, self.world.sizeY)):
+                        inViewport = (viewStartX <= x < viewEndX) and (viewStartY <= y < viewEndY)
+                        if (inViewport) or (not self._hasPendingSpriteNames(x, y)):
+                            self._updateTile(x, y)
+                        else:
+                            self.changedTiles.add((x, y))
+
+    # Draw the static layers of a viewport onto a window (with the same arguments as World.renderViewport()).  Assumes the window has been cleared to black.
+    # Returns false if the background can't be used for this window (in which case nothing is drawn, and the static layers should be drawn as normal).
+    def render(self, window, worldStartX, worldStartY, sizeTilesX, sizeTilesY, offsetX, offsetY):
+        if (not self.isCompatible(window)) or (offsetX < 0) or (offsetY < 0):
+            return False
+        # If the window has a different pixel format than the background was drawn for, then it has to be redrawn
+        pixelFormat = (window.get_bitsize(), window.get_masks())
+        if (pixelFormat != self.pixelFormat):
+            self.pieces.clear()
+            self.pixelFormat = pixelFormat
+
+        world = self.world
+        tileSize = self.tileSize
+        viewport = (max(0, worldStartX), max(0, worldStartY), min(world.sizeX, worldStartX + sizeTilesX), min(world.sizeY, worldStartY + sizeTilesY))
+
+        # Bring the viewport, and any tiles around it whose sprites could overlap it, up to date.  If the margin grows, the region around it does too.
+        # The tiles drawn on the pieces that the viewport covers are recorded first (the pieces line up with the chunks of the world grid).
+        chunkSize = world.grid.chunkSize
+        while True:
+            margin = self.margin
+            pieceRegion = (max(0, (viewport[0] // chunkSize) * chunkSize - margin), max(0, (viewport[1] // chunkSize) * chunkSize - margin),
+                           min(world.sizeX, -(-viewport[2] // chunkSize) * chunkSize + margin), min(world.sizeY, -(-viewport[3] // chunkSize) * chunkSize + margin))
+            self._recordChunks(pieceRegion, viewport)
+            if (self.margin != margin):
+                continue
+            region = (max(0, viewport[0] - margin), max(0, viewport[1] - margin), min(world.sizeX, viewport[2] + margin), min(world.sizeY, viewport[3] + margin))
+            if (not self._update(window, region, viewport)):
+                return False
+            if (self.margin == margin):
+                break
+
+        # Copy the viewport from the pieces of the background that it covers
+        viewportRect = pygame.Rect(offsetX, offsetY, sizeTilesX * tileSize, sizeTilesY * tileSize)
+        area = pygame.Rect(worldStartX * tileSize, worldStartY * tileSize, viewportRect.width, viewportRect.height)
+        clippedArea = area.clip(self._getBounds())
+        if (clippedArea.width > 0) and (clippedArea.height > 0):
+            pieceSize = self.pieceSize
+            for pieceY in range(clippedArea.top // pieceSize, (clippedArea.bottom - 1) // pieceSize + 1):
+                for pieceX in range(clippedArea.left // pieceSize, (clippedArea.right - 1) // pieceSize + 1):
+                    (surface, rect) = self._getPiece(window, (pieceX, pieceY))
+                    pieceArea = clippedArea.clip(rect)
+                    surfaceArea = pieceArea.move(surface.get_width() - rect.right, surface.get_height() - rect.bottom)
+                    window.blit(surface, (offsetX + pieceArea.left - area.left, offsetY + pieceArea.top - area.top), surfaceArea)
+
+        # Sprites that cross the edge of the viewport: only the tiles in the viewport are drawn, so sprites from tiles outside it shouldn't show up inside it,
+        # and sprites from tiles inside it should still be drawn past its edges.
+        (viewStartX, viewStartY, viewEndX, viewEndY) = viewport
+        areasToRedraw = []
+        crossingOut = []
+        for location in self.overflowingTiles:
+            (x, y) = location
+            inViewport = (viewStartX <= x < viewEndX) and (viewStartY <= y < viewEndY)
+            rect = self.tileRects[location].move((x - worldStartX) * tileSize + offsetX, (y - worldStartY) * tileSize + offsetY)
+            if (inViewport) and (not viewportRect.contains(rect)):
+                crossingOut.append((location, rect))
+                # Sprites at negative (fractional) positions are rounded differently than on the background, so those are drawn directly
+                if (rect.left < 0) or (rect.top < 0):
+                    self._addArea(areasToRedraw, rect.clip(viewportRect))
+            elif (not inViewport) and (rect.colliderect(viewportRect)):
+                self._addArea(areasToRedraw, rect.clip(viewportRect))
+
+        if (len(areasToRedraw) > 0) or (len(crossingOut) > 0):
+            windowClip = window.get_clip()
+
+            # Redraw the parts of the viewport that sprites from outside it overlap, directly from the tiles inside it
+            for area in areasToRedraw:
+                locations = self._getTilesOverlapping(area, offsetX - worldStartX * tileSize, offsetY - worldStartY * tileSize, viewport)
+                self._drawLocations(window, area.clip(windowClip), locations, worldStartX, worldStartY, offsetX, offsetY, clearArea=True)
+
+            # Draw the parts of sprites from inside the viewport that are outside it (above, below, left, and right of it)
+            windowRect = window.get_rect()
+            outside = [pygame.Rect(windowRect.left, windowRect.top, windowRect.width, viewportRect.top - windowRect.top),
+                       pygame.Rect(windowRect.left, viewportRect.bottom, windowRect.width, windowRect.bottom - viewportRect.bottom),
+                       pygame.Rect(windowRect.left, viewportRect.top, viewportRect.left - windowRect.left, viewportRect.height),
+                       pygame.Rect(viewportRect.right, viewportRect.top, windowRect.right - viewportRect.right, viewportRect.height)]
+            for area in outside:
+                locations = [location for (location, rect) in crossingOut if rect.colliderect(area)]
+                if (len(locations) > 0):
+                    self._drawLocations(window, area.clip(windowClip), locations, worldStartX, worldStartY, offsetX, offsetY, clearArea=False)
+
+            window.set_clip(windowClip)
+
+        return True
+
+    # Add an area to a list of areas to redraw, merging it with any area it's close to (e.g. the overlapping sprites of a row of tables)
+    def _addArea(self, areas, area):
+        if (area.width <= 0) or (area.height <= 0):
+            return
+        nearbyArea = area.inflate(self.tileSize, self.tileSize)
+        for idx in range(len(areas)):
+            if (areas[idx].colliderect(nearbyArea)):
+                area = areas.pop(idx).union(area)
+                self._addArea(areas, area)
+                return
+        areas.append(area)
+
+    # Draw the static layers of some tiles directly onto a window (in the same order as World.renderViewport()), clipped to an area
+    def _drawLocations(self, window, area, locations, worldStartX, worldStartY, offsetX, offsetY, clearArea):
+        if (area.width <= 0) or (area.height <= 0):
+            return
+        window.set_clip(area)
+        if (clearArea):
+            window.fill((0, 0, 0), area)
+        tileSize = self.tileSize
+        locations = sorted(locations, key=lambda location: (location[1], location[0]))
+        for layerIdx in range(len(StaticBackground.STATIC_LAYERS)):
+            for (x, y) in locations:
+                self._drawTileLayer(window, (x, y), layerIdx, (x - worldStartX) * tileSize + offsetX, (y - worldStartY) * tileSize + offsetY)
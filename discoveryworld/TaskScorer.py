@@ -1815,8 +1815,9 @@ class SoilNutrientTaskNormal(Task):
             self.scorecardUseSoilNutrientMeter.updateScore(score=numSoilTilesChecked, completed=isComplete, associatedUUIDs=list(soilTilesChecked), associatedNotes="The following soil tiles have been checked with the soil nutrient meter: " + str(soilTilesChecked))
 
         # Check for at least one seed that is not a starting seed to be in the ground
-        # First, get all objects
-        allObjects = self.world.getAllWorldObjects()
+        # First, get all the seeds and mushrooms (from the world's type/class indices, rather than scanning every object)
+        allSeeds = self.world.findObjects(type="seed")
+        allMushrooms = self.world.findObjects(objClass=Mushroom)
 
         if (not self.scorecardAtLeastTwoSeedsPlanted.completed):
             # Get locations of test soil tiles
@@ -1824,26 +1825,25 @@ class SoilNutrientTaskNormal(Task):
             for testSoilTile in self.scoringInfo["testSoilTiles"]:
                 testSoilTileLocations.append(testSoilTile.getWorldLocation())
 
-            for obj in allObjects:
-                if (obj.type == "seed"):
-                    # Make sure this seed isn't in the list of starting seeds
-                    if (obj not in self.scoringInfo["startingSeeds"]):
-                        # Check if the seed is in the ground
-                        parentContainer = obj.parentContainer
-                        if (parentContainer != None):
-                            if (parentContainer.type == "soil"):
-                                # Make sure there's no hole in the soil (i.e. the hole is filled in/the seed is planted)
-                                if (parentContainer.attributes['hasHole'] == False):
-                                    # Check to see if the location of this object is one of the test soil tiles
-                                    isOnTestSoilTile = False
-                                    for testSoilTileLocation in testSoilTileLocations:
-                                        print("Checking if " + str(obj.getWorldLocation()) + " is on " + str(testSoilTileLocation))
-                                        if (obj.getWorldLocation() == testSoilTileLocation):
-                                            isOnTestSoilTile = True
-                                            print("\tMATCH")
-                                            break
-                                    if (isOnTestSoilTile):
-                                        self.newSeedsPlanted.add(obj.uuid)
+            for obj in allSeeds:
+                # Make sure this seed isn't in the list of starting seeds
+                if (obj not in self.scoringInfo["startingSeeds"]):
+                    # Check if the seed is in the ground
+                    parentContainer = obj.parentContainer
+                    if (parentContainer != None):
+                        if (parentContainer.type == "soil"):
+                            # Make sure there's no hole in the soil (i.e. the hole is filled in/the seed is planted)
+                            if (parentContainer.attributes['hasHole'] == False):
+                                # Check to see if the location of this object is one of the test soil tiles
+                                isOnTestSoilTile = False
+                                for testSoilTileLocation in testSoilTileLocations:
+                                    print("Checking if " + str(obj.getWorldLocation()) + " is on " + str(testSoilTileLocation))
+                                    if (obj.getWorldLocation() == testSoilTileLocation):
+                                        isOnTestSoilTile = True
+                                        print("\tMATCH")
+                                        break
+                                if (isOnTestSoilTile):
+                                    self.newSeedsPlanted.add(obj.uuid)
 
             numNewSeedsPlanted = len(self.newSeedsPlanted)
             isCompleted = False
@@ -1861,17 +1861,16 @@ class SoilNutrientTaskNormal(Task):
                 testSoilTileLocations.append(testSoilTile.getWorldLocation())
 
             # Check for new plants, that weren't in the simulation when it was initialized
-            for obj in allObjects:
-                if (isinstance(obj, Mushroom)):
-                    if (obj not in self.scoringInfo["startingPlants"]):
-                        if ("locationGrown" in obj.attributes):
-                            grownOnTestLocation = False
-                            for testSoilTileLocation in testSoilTileLocations:
-                                if (obj.attributes["locationGrown"] == testSoilTileLocation):
-                                    grownOnTestLocation = True
-                                    break
-                            if (grownOnTestLocation):
-                                self.newPlantsGrown.add(obj)
+            for obj in allMushrooms:
+                if (obj not in self.scoringInfo["startingPlants"]):
+                    if ("locationGrown" in obj.attributes):
+                        grownOnTestLocation = False
+                        for testSoilTileLocation in testSoilTileLocations:
+                            if (obj.attributes["locationGrown"] == testSoilTileLocation):
+                                grownOnTestLocation = True
+                                break
+                        if (grownOnTestLocation):
+                            self.newPlantsGrown.add(obj)
 
             # Count the number of new plants
             numMaturePlants = len(self.newPlantsGrown)
@@ -2193,8 +2192,9 @@ class SoilNutrientTaskChallenge(Task):
             self.scorecardUseSoilNutrientMeter.updateScore(score=numSoilTilesChecked, completed=isComplete, associatedUUIDs=list(soilTilesChecked), associatedNotes="The following soil tiles have been checked with the soil nutrient meter: " + str(soilTilesChecked))
 
         # Check for at least one seed that is not a starting seed to be in the ground
-        # First, get all objects
-        allObjects = self.world.getAllWorldObjects()
+        # First, get all the seeds and mushrooms (from the world's type/class indices, rather than scanning every object)
+        allSeeds = self.world.findObjects(type="seed")
+        allMushrooms = self.world.findObjects(objClass=Mushroom)
 
         if (not self.scorecardAtLeastTwoSeedsPlanted.completed):
             # Get locations of test soil tiles
@@ -2202,26 +2202,25 @@ class SoilNutrientTaskChallenge(Task):
             for testSoilTile in self.scoringInfo["testSoilTiles"]:
                 testSoilTileLocations.append(testSoilTile.getWorldLocation())
 
-            for obj in allObjects:
-                if (obj.type == "seed"):
-                    # Make sure this seed isn't in the list of starting seeds
-                    if (obj not in self.scoringInfo["startingSeeds"]):
-                        # Check if the seed is in the ground
-                        parentContainer = obj.parentContainer
-                        if (parentContainer != None):
-                            if (parentContainer.type == "soil"):
-                                # Make sure there's no hole in the soil (i.e. the hole is filled in/the seed is planted)
-                                if (parentContainer.attributes['hasHole'] == False):
-                                    # Check to see if the location of this object is one of the test soil tiles
-                                    isOnTestSoilTile = False
-                                    for testSoilTileLocation in testSoilTileLocations:
-                                        print("Checking if " + str(obj.getWorldLocation()) + " is on " + str(testSoilTileLocation))
-                                        if (obj.getWorldLocation() == testSoilTileLocation):
-                                            isOnTestSoilTile = True
-                                            print("\tMATCH")
-                                            break
-                                    if (isOnTestSoilTile):
-                                        self.newSeedsPlanted.add(obj.uuid)
+            for obj in allSeeds:
+                # Make sure this seed isn't in the list of starting seeds
+                if (obj not in self.scoringInfo["startingSeeds"]):
+                    # Check if the seed is in the ground
+                    parentContainer = obj.parentContainer
+                    if (parentContainer != None):
+                        if (parentContainer.type == "soil"):
+                            # Make sure there's no hole in the soil (i.e. the hole is filled in/the seed is planted)
+                            if (parentContainer.attributes['hasHole'] == False):
+                                # Check to see if the location of this object is one of the test soil tiles
+                                isOnTestSoilTile = False
+                                for testSoilTileLocation in testSoilTileLocations:
+                                    print("Checking if " + str(obj.getWorldLocation()) + " is on " + str(testSoilTileLocation))
+                                    if (obj.getWorldLocation() == testSoilTileLocation):
+                                        isOnTestSoilTile = True
+                                        print("\tMATCH")
+                                        break
+                                if (isOnTestSoilTile):
+                                    self.newSeedsPlanted.add(obj.uuid)
 
             numNewSeedsPlanted = len(self.newSeedsPlanted)
             isCompleted = False
@@ -2239,17 +2238,16 @@ class SoilNutrientTaskChallenge(Task):
                 testSoilTileLocations.append(testSoilTile.getWorldLocation())
 
             # Check for new plants, that weren't in the simulation when it was initialized
-            for obj in allObjects:
-                if (isinstance(obj, Mushroom)):
-                    if (obj not in self.scoringInfo["startingPlants"]):
-                        if ("locationGrown" in obj.attributes):
-                            grownOnTestLocation = False
-                            for testSoilTileLocation in testSoilTileLocations:
-                                if (obj.attributes["locationGrown"] == testSoilTileLocation):
-                                    grownOnTestLocation = True
-                                    break
-                            if (grownOnTestLocation):
-                                self.newPlantsGrown.add(obj)
+            for obj in allMushrooms:
+                if (obj not in self.scoringInfo["startingPlants"]):
+                    if ("locationGrown" in obj.attributes):
+                        grownOnTestLocation = False
+                        for testSoilTileLocation in testSoilTileLocations:
+                            if (obj.attributes["locationGrown"] == testSoilTileLocation):
+                                grownOnTestLocation = True
+                                break
+                        if (grownOnTestLocation):
+                            self.newPlantsGrown.add(obj)
 
             # Count the number of new plants
             numMaturePlants = len(self.newPlantsGrown)
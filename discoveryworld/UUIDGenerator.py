@@ -1,25 +1,141 @@
 # UUID Generator
 
-# A class that randomly generates UUIDs, represented as integers. 
+# A class that generates UUIDs, represented as integers.
+#
+# UUIDs are generated by counting up (0, 1, 2, ...), and (optionally) scrambling the count with a seeded permutation, so that the UUIDs
+# look random but are unique and reproducible for a given seed.  Each UUID takes constant time to generate, regardless of how many have
+# been generated before.
+#
+# The first 2^width UUIDs are all less than 2^width.  After that, the UUIDs grow one bit at a time: the UUIDs for counts in [2^b, 2^(b+1))
+# are a permutation of the values in [2^b, 2^(b+1)), so UUIDs never collide, no matter how many are generated.
+#
+# Blocks of UUIDs can also be reserved (see reserveBlock()).  Blocks for copies of a world (see reserveForkBlock()) come from a separate range of
+# counts, so a copy can generate UUIDs that won't collide with the UUIDs generated by the original, without changing the original's own sequence.
+# Another range of counts is set aside for fixed blocks (see getFixedBlock()), whose UUIDs only depend on where the block is, not on what was generated before.
 
 # Imports
 import random
 
 # Class definition
 class UUIDGenerator():
+    # Default width of the UUIDs (in bits)
+    DEFAULT_WIDTH = 16
+
+    # Default size of the blocks that a block generator reserves from its parent when it runs out (see reserveBlock())
+    DEFAULT_BLOCK_SIZE = 2**16
+
+    # Counts from here up to FORK_COUNT_START are only used for fixed blocks (see getFixedBlock())
+    FIXED_COUNT_START = 2**47
+    # Counts from here on are only used for fork blocks (see reserveForkBlock()), so they never overlap the counts a generator uses itself
+    FORK_COUNT_START = 2**48
+
     # Constructor
-    def __init__(self, seed:int = 0):
+    # 'seed': Seed for the permutation.  'width': The number of bits in the UUIDs (before they start to grow).  'scramble': If False, UUIDs are sequential.
+    def __init__(self, seed:int = 0, width:int = DEFAULT_WIDTH, scramble:bool = True):
         self.seed = seed
-        self.random = random.Random(seed)
-        self.existingUUIDs = set()
+        self.width = width
+        self.scramble = scramble
+
+        # Keys for the permutation (64 bits each, masked to the width of each permutation).  The multipliers must be odd.
+        r = random.Random(seed)
+        self.mulKeys = (r.getrandbits(64) | 1, r.getrandbits(64) | 1)
+        self.addKeys = (r.getrandbits(64), r.getrandbits(64))
+
+        # The next count to generate a UUID for, and the end of the block of counts that this generator can use (or None, for no limit)
+        self.nextCount = 0
+        self.blockEnd = None
+        # For generators of reserved blocks, the generator that the block was reserved from (see reserveBlock())
+        self.parent = None
+        # The next count to reserve a fork block from, as a one-element list that's shared with every generator forked from this one (see reserveForkBlock())
+        self.nextForkCount = [UUIDGenerator.FORK_COUNT_START]
+        # True if this generator's blocks come from the fork counts (rather than from a parent)
+        self.isForkBlock = False
 
     # Generate a new UUID
     def generateUUID(self):
-        #MAX_UUID = 2**30
-        MAX_UUID = 2**16
-        uuid = self.random.randint(0, MAX_UUID)
-        while uuid in self.existingUUIDs:
-            uuid = self.random.randint(0, MAX_UUID)
-        self.existingUUIDs.add(uuid)
-        return uuid
-        
\ No newline at end of file
+        # If this generator's block has run out, then reserve another one from the parent
+        if (self.blockEnd != None) and (self.nextCount >= self.blockEnd):
+            if (not self._reserveNextBlock(UUIDGenerator.DEFAULT_BLOCK_SIZE)):
+                print("ERROR: UUIDGenerator: Reserved block of UUIDs has run out, and there is no parent generator to reserve another block from.")
+                return None
+
+        count = self.nextCount
+        self.nextCount += 1
+        return self.getUUIDForCount(count)
+
+    # Get the UUID for a given count (i.e. the count'th UUID generated by a generator with this seed)
+    def getUUIDForCount(self, count:int):
+        if (not self.scramble):
+            return count
+
+        # The first 2^width counts are permuted among themselves, and after that, counts in [2^b, 2^(b+1)) are permuted among themselves
+        if (count < (1 << self.width)):
+            bits = self.width
+            base = 0
+        else:
+            bits = count.bit_length() - 1
+            base = 1 << bits
+        return base + self._permute(count - base, bits)
+
+    # A seeded permutation of the values in [0, 2^bits).  Each step (multiplying by an odd number, adding, and xor-ing with a right shift) is invertible modulo 2^bits.
+    def _permute(self, value:int, bits:int):
+        mask = (1 << bits) - 1
+        shift = max(1, bits // 2)
+        for i in range(2):
+            value = (value * self.mulKeys[i] + self.addKeys[i]) & mask
+            value ^= (value >> shift)
+        return value
+
+    # Reserve a block of 'size' UUIDs, and return a new generator that generates them (in the same sequence that this generator would have).
+    # UUIDs generated by the new generator won't collide with UUIDs generated by this generator (or any other blocks reserved from it).
+    # If the new generator runs out of UUIDs, it reserves another block from this generator.
+    def reserveBlock(self, size:int = DEFAULT_BLOCK_SIZE):
+        blockGenerator = UUIDGenerator(self.seed, self.width, self.scramble)
+        blockGenerator.nextCount = self._reserveCounts(size)
+        blockGenerator.blockEnd = blockGenerator.nextCount + size
+        blockGenerator.parent = self
+        return blockGenerator
+
+    # Reserve a block of 'size' UUIDs for a copy of a world (see World.fork()), and return a new generator that generates them.
+    # The block comes from a separate range of counts that this generator (and any generator forked from it) shares, so this generator's own
+    # sequence is unchanged, and the UUIDs won't collide with UUIDs generated by this generator or by any other fork.
+    # If the new generator runs out of UUIDs, it reserves another block from the same range.
+    def reserveForkBlock(self, size:int = DEFAULT_BLOCK_SIZE):
+        blockGenerator = UUIDGenerator(self.seed, self.width, self.scramble)
+        blockGenerator.nextForkCount = self.nextForkCount
+        blockGenerator.isForkBlock = True
+        blockGenerator._reserveNextBlock(size)
+        return blockGenerator
+
+    # Get a generator for a fixed block of 'size' counts, starting 'offset' counts into the range set aside for fixed blocks (e.g. the block for one tile of
+    # the world, see World.materializeTile()).  Nothing is reserved: the same offset always gives the same UUIDs (for the same seed, including in forks),
+    # so the caller is responsible for giving each block its own offset.  The new generator can't generate more than 'size' UUIDs.
+    def getFixedBlock(self, offset:int, size:int):
+        blockGenerator = UUIDGenerator(self.seed, self.width, self.scramble)
+        blockGenerator.nextCount = UUIDGenerator.FIXED_COUNT_START + offset
+        blockGenerator.blockEnd = blockGenerator.nextCount + size
+        return blockGenerator
+
+    # Replace this generator's block with a new block of (at least) 'size' counts, from its parent or the fork counts.  Returns false if there's nowhere to get one from.
+    def _reserveNextBlock(self, size:int):
+        if (self.parent != None):
+            self.nextCount = self.parent._reserveCounts(size)
+        elif (self.isForkBlock):
+            self.nextCount = self.nextForkCount[0]
+            self.nextForkCount[0] += size
+        else:
+            return False
+        self.blockEnd = self.nextCount + size
+        return True
+
+    # Reserve a block of 'size' counts, and return the first one
+    def _reserveCounts(self, size:int):
+        # If this generator is itself a block generator, then the new block must come out of its own block
+        if (self.blockEnd != None) and (self.nextCount + size > self.blockEnd):
+            if (not self._reserveNextBlock(max(size, UUIDGenerator.DEFAULT_BLOCK_SIZE))):
+                print("ERROR: UUIDGenerator: Not enough UUIDs left in this generator's reserved block to reserve a block of size " + str(size) + ".")
+                return None
+
+        start = self.nextCount
+        self.nextCount += size
+        return start
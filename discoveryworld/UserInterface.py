@@ -15,6 +15,9 @@ from discoveryworld.ActionHistory import *
 ARROWS_FACE_AND_MOVE = os.environ.get("MARC", False)
 
 class UserInterface:
+    # Resources that are shared (rather than copied) when the UI is forked along with the world (see DiscoveryWorldAPI.fork())
+    SHARED_ATTRIBUTES = ("window", "spriteLibrary", "fontCaption", "font", "fontBold")
+
     # Constructor
     def __init__(self, window, spriteLibrary, showScoreToUser=False):
         # Fonts
@@ -65,6 +68,18 @@ class UserInterface:
     def setAgent(self, agent):
         self.currentAgent = agent
 
+    # Pickling (used when forking the world).  The shared resources are left out -- see shareResourcesFrom().
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for key in UserInterface.SHARED_ATTRIBUTES:
+            state[key] = None
+        return state
+
+    # Use the same shared resources (window, sprite library, fonts) as another user interface (e.g. the one this was forked from)
+    def shareResourcesFrom(self, otherUI):
+        for key in UserInterface.SHARED_ATTRIBUTES:
+            setattr(self, key, getattr(otherUI, key))
+
 
     #
     #   Message queue
@@ -158,16 +173,14 @@ class UserInterface:
     #   Rendering
     #
 
-    def render(self):
+    # Update the UI's state for the current step (the objects that can be selected as arguments, the selected arguments, and whether a modal is
+    # showing), without drawing anything.  Called by render(), and directly when an observation is taken without rendering the viewport.
+    # Returns (inventory objects, environment objects) that can be selected as arguments.
+    def updateState(self):
         # Reset the modal flag
         self.inModal = False
 
-        # Step 1: Render the inventory
-        #self.renderInventory()
-
-        # Step 1: Render argument boxes
-
-        # Step 1A: First, collect all objects (inventory, objects in front of the agent)
+        # Collect all objects (inventory, objects in front of the agent)
         objsInv = []
         objsEnv = []
         if (self.currentAgent != None):
@@ -181,15 +194,28 @@ class UserInterface:
         # Update the list of objects that can be used as arguments
         self.updateArgumentObjects(allObjs)
 
-        # Render argument 1 box
+        # Argument 1
         if (self.curSelectedArgument1Idx >= len(allObjs)):
             self.curSelectedArgument1Idx = len(allObjs) - 1
         self.changeArgumentBox(delta=0, whichBox=1)     # Bound checking/Make sure the references to the selected objects are up to date
-        self.renderObjectSelectionBox(objsInv, objsEnv, self.curSelectedArgument1Idx, offsetX=32, offsetY=-(32*9)+20, labelPrefixStr="Arg 1: ")
-        # Render argument 2 box
+        # Argument 2
         if (self.curSelectedArgument2Idx >= len(allObjs)):
             self.curSelectedArgument2Idx = len(allObjs) - 1
         self.changeArgumentBox(delta=0, whichBox=2)     # Bound checking/Make sure the references to the selected objects are up to date
+
+        # Pop-ups: the dialog box isn't a modal, but the top message in the message queue is
+        if (self.dialogToDisplay == None) and (len(self.messageQueueText) > 0):
+            self.inModal = True
+
+        return objsInv, objsEnv
+
+    def render(self):
+        # Step 1: Render the inventory
+        #self.renderInventory()
+
+        # Step 1: Render argument boxes
+        objsInv, objsEnv = self.updateState()
+        self.renderObjectSelectionBox(objsInv, objsEnv, self.curSelectedArgument1Idx, offsetX=32, offsetY=-(32*9)+20, labelPrefixStr="Arg 1: ")
         self.renderObjectSelectionBox(objsInv, objsEnv, self.curSelectedArgument2Idx, offsetX=32, offsetY=-(32*6)+20, labelPrefixStr="Arg 2: ")
 
         # Step 2: Render any pop-ups (e.g. dialog, or modals from the message queue)
@@ -203,15 +229,11 @@ class UserInterface:
 
             # Render the dialog box
             self.renderTextBox(dialogBoxStr)
-            # Not in a modal
-            self.inModal = False
 
         elif (len(self.messageQueueText) > 0):
             # Render the top message in the message queue
             nextMessage = self.messageQueueText[0]
             self.renderTextBox(nextMessage)
-            # Set the modal flag
-            self.inModal = True
 
         # Render the last action message
         self.renderLastActionMessage()
@@ -284,8 +306,8 @@ class UserInterface:
 
 
 
-    # A JSON version of the user interface
-    def renderJSON(self):
+    # A JSON version of the user interface.  If 'minimal' is true, the nearby objects, nearby agents, and Discovery Feed posts are left out.
+    def renderJSON(self, minimal:bool=False):
         # Out
         out = {}
 
@@ -315,23 +337,25 @@ class UserInterface:
         out.update(invAndEnvObjs)
 
 
-        # Show nearby objects
-        #nearbyObjectsMaxDistance = 2
-        nearbyObjectsMaxDistance = 3
-        nearbyObjectsFull, nearbyObjects, nearbyObjectsByDirection = self.currentAgent.getNearbyVisibleObjects(maxDistance=nearbyObjectsMaxDistance, includeUUID=True)
-        # Note: nearbyObjectsByDirection is smaller
-        out["nearbyObjects"] = {
-            "note": "The objects below are within " + str(nearbyObjectsMaxDistance) + " tiles of the agent, but may not neccesarily be usable if they're not in the agent inventory, or directly in front of the agent.  This list should help in navigating to objects you'd like to interact with or use.  Objects to interact with or use should be in the 'accessibleEnvironmentObjects' or 'inventoryObjects' lists.",
-            #"objects": nearbyObjects
-            "distance": nearbyObjectsMaxDistance,
-            "objects": nearbyObjectsByDirection
-        }
+        # Nearby objects, agents, and Discovery Feed posts (left out of the minimal version)
+        if (minimal == False):
+            # Show nearby objects
+            #nearbyObjectsMaxDistance = 2
+            nearbyObjectsMaxDistance = 3
+            nearbyObjectsFull, nearbyObjects, nearbyObjectsByDirection = self.currentAgent.getNearbyVisibleObjects(maxDistance=nearbyObjectsMaxDistance, includeUUID=True)
+            # Note: nearbyObjectsByDirection is smaller
+            out["nearbyObjects"] = {
+                "note": "The objects below are within " + str(nearbyObjectsMaxDistance) + " tiles of the agent, but may not neccesarily be usable if they're not in the agent inventory, or directly in front of the agent.  This list should help in navigating to objects you'd like to interact with or use.  Objects to interact with or use should be in the 'accessibleEnvironmentObjects' or 'inventoryObjects' lists.",
+                #"objects": nearbyObjects
+                "distance": nearbyObjectsMaxDistance,
+                "objects": nearbyObjectsByDirection
+            }
 
-        # For any agents in the nearby objects list, show their recent action history to the user, to show what they're doing.
-        out["nearbyAgents"] = self.getRecentActionHistoryOfAgents(nearbyObjectsFull)
+            # For any agents in the nearby objects list, show their recent action history to the user, to show what they're doing.
+            out["nearbyAgents"] = self.getRecentActionHistoryOfAgents(nearbyObjectsFull)
 
-        # Recent posts on Discovery Feed
-        out["discoveryFeed"] = self.currentAgent.world.discoveryFeed.getRecentPosts(curStep=self.currentAgent.world.getStepCounter(), lastNSteps=3)
+            # Recent posts on Discovery Feed
+            out["discoveryFeed"] = self.currentAgent.world.discoveryFeed.getRecentPosts(curStep=self.currentAgent.world.getStepCounter(), lastNSteps=3)
 
         # Pop-up boxes/Dialog
         dialogBoxDict = {}
@@ -1299,6 +1323,19 @@ class UserInterface:
             if (self.curSelectedArgument2Obj == None):
                 return ActionSuccess(success=False, message="Action '" + actionName + "' requires argument 2.")
 
+        # Actions can change their arguments, so objects shared by every tile that hasn't been written to (like grass) are swapped for the copy on the
+        # tile the agent is facing (see World.addDefaultObject()).  The agent's own tile always has its own objects, so they can only come from there.
+        facingX, facingY = self.currentAgent.getWorldLocationAgentIsFacing()
+        arg1Before = self.curSelectedArgument1Obj
+        if (self.curSelectedArgument1Obj != None):
+            self.curSelectedArgument1Obj = self.currentAgent.world.getDefaultObjectCopy(self.curSelectedArgument1Obj, facingX, facingY)
+        if (self.curSelectedArgument2Obj is arg1Before):
+            self.curSelectedArgument2Obj = self.curSelectedArgument1Obj
+        elif (self.curSelectedArgument2Obj != None):
+            self.curSelectedArgument2Obj = self.currentAgent.world.getDefaultObjectCopy(self.curSelectedArgument2Obj, facingX, facingY)
+        if ((arg1) and (self.curSelectedArgument1Obj == None)) or ((arg2) and (self.curSelectedArgument2Obj == None)):
+            return ActionSuccess(success=False, message="Action '" + actionName + "': That object is no longer accessible.")
+
         # If we reach here, the arguments should be valid
         return None
 
@@ -1,16 +1,24 @@
 # World.py
 
+import copy
 import time
 import zlib
 import pickle
 import json
+import weakref
 from os.path import join as pjoin
 
 import pygame
+import numpy as np
 
 from discoveryworld.SpriteLibrary import SpriteLibrary
 from discoveryworld.ObjectMaker import ObjectMaker
 from discoveryworld.Layer import Layer
+from discoveryworld.WorldGrid import WorldGrid
+from discoveryworld.Pathfinding import DistanceField, GridSearch
+from discoveryworld.RegionSubscription import RegionSubscription
+from discoveryworld.AutotileGrid import AutotileGrid
+from discoveryworld.StaticBackground import StaticBackground
 from discoveryworld.TaskScorer import *
 from discoveryworld.UUIDGenerator import *
 from discoveryworld.DiscoveryFeed import *
@@ -20,11 +28,36 @@ from discoveryworld.JSONEncoder import CustomJSONEncoder
 
 # Storage class for the world (including the full environment grid)
 class World:
+    # Traversal costs (see getCostGrid())
+    COST_DEFAULT = 1                # Passable tile
+    COST_PASSAGE = 20               # Impassable, but potentially passable (e.g. a closed door)
+    COST_IMPASSABLE = -1            # Impassable
+    COST_AGENT_PENALTY = 10         # Extra cost for traversing a tile with an agent on it
+
+    # Maximum number of shared distance fields to keep (see getDistanceField()), and destinations to track requests for
+    MAX_DISTANCE_FIELDS = 16
+    MAX_DISTANCE_FIELD_DESTINATIONS = 256
+
+    # Number of UUIDs set aside for the copies of the shared default objects on each tile (see materializeTile())
+    DEFAULT_OBJECT_UUIDS_PER_TILE = 16
+
+    # Maximum number of render scales to keep a cached background of the static layers for (see renderViewport())
+    MAX_STATIC_BACKGROUNDS = 4
+
+    # Grid overlays (see renderGridOverlay()): the colour used for the transparent parts of the cached overlay, and the maximum number of overlays to keep
+    GRID_OVERLAY_COLORKEY = (255, 0, 255)
+    MAX_GRID_OVERLAYS = 16
+
+    # Forking (see fork()): resources that are shared between a world and its forks (since they don't change once they're loaded),
+    # and indices/caches/history that are rebuilt or shared by fork() rather than copied.
+    FORK_SHARED_ATTRIBUTES = ("spriteLibrary", "objectMaker", "font")
+    FORK_REBUILT_ATTRIBUTES = ("objectsByUUID", "objectsByType", "objectsByClass", "tickActiveObjects", "tickWokenObjects", "distanceFieldRequesters", "distanceFieldDestinations", "objectsAtCache", "gridSearch", "worldHistory", "staticBackgrounds", "gridOverlays", "gridLabels")
+
     # Constructor
-    def __init__(self, assetPath, filenameSpriteIndex, dataPath, filenameObjectData, filenameMaterialData, filenameDiscoveryFeed):
+    def __init__(self, assetPath, filenameSpriteIndex, dataPath, filenameObjectData, filenameMaterialData, filenameDiscoveryFeed, sizeX=32, sizeY=32):
         # World size (in tiles)
-        self.sizeX = 32
-        self.sizeY = 32
+        self.sizeX = sizeX
+        self.sizeY = sizeY
 
         # Default parameters of the world that can change (like background radiation level)
         self.parameters = {
@@ -34,14 +67,66 @@ class World:
         # UUID Generator
         self.uuidGenerator = UUIDGenerator()
 
+        # Index of every object created in this world, keyed by UUID (populated by the Object constructor).
+        # Weak references, so objects that are discarded (e.g. eaten, or reacted away) don't linger in the index.
+        self.objectsByUUID = weakref.WeakValueDictionary()
+        # Secondary indices (for findObjects()), keyed by object type, and by object class (including base classes).  Each value is a weak (uuid -> object) dictionary.
+        self.objectsByType = {}
+        self.objectsByClass = {}
+
+        # Tick scheduling (see tick()): objects that need to be ticked every step, and objects with a static tick that need to be ticked on the next step only
+        self.tickActiveObjects = weakref.WeakSet()
+        self.tickWokenObjects = weakref.WeakSet()
+
+        # Level-of-detail simulation for NPCs that are far from every user agent (see setNPCLevelOfDetail()).  Disabled by default.
+        self.npcLODRadius = None
+        self.npcLODInterval = 1
+
         # Load sprites
         self.spriteLibrary = SpriteLibrary(assetPath, filenameSpriteIndex)
 
         # Load object data
         self.objectMaker = ObjectMaker(dataPath, filenameObjectData, filenameMaterialData, world=self, knownSpriteNames=self.spriteLibrary.getSpriteNames())
 
-        # Initialize grid
-        self.grid = [[self.mkBlankGridTile() for x in range(self.sizeX)] for y in range(self.sizeY)]
+        # Initialize grid (stored in chunks, that are allocated when objects are first added to them)
+        self.grid = WorldGrid(self.sizeX, self.sizeY)
+        # Objects that cover every tile that hasn't been written to, by sharing a single copy (see addDefaultObject()), as (layer, object reference name, shared object)
+        self.defaultObjects = []
+
+        # Traversal cost of each tile (indexed [x, y]), used for passability checks and pathfinding (see getCostGrid()).
+        # Kept up to date incrementally: tiles are marked as changed when objects move, or change whether they're passable, and only those tiles are recomputed.
+        self.costGrid = np.full((self.sizeX, self.sizeY), World.COST_DEFAULT, dtype=np.int16)
+        self.costGridChangedTiles = set()
+        self.costGridVersion = 0                # Incremented whenever the cost of any tile changes (e.g. so cached paths can be revalidated)
+
+        # Radiation emitted from each tile (indexed [x, y]): the sum of 'radiationusvh' over the materials of the objects (and parts) on it (see getTileRadiation()).
+        # Kept up to date the same way as the cost grid -- tiles are marked as changed when anything on them changes, and only those tiles are recomputed.
+        self.radiationSources = np.zeros((self.sizeX, self.sizeY), dtype=np.float64)
+        self.radiationSourcesChangedTiles = set()
+
+        # Which neighbours of each tile have objects of a given type on them, for objects whose sprites depend on their neighbours (see hasNeighbouringObjs())
+        self.autotileGrid = AutotileGrid(self)
+
+        # Version number of each tile (indexed [x][y]), incremented whenever anything on that tile changes (see invalidateTile()).
+        # Used to cache the results of getObjectsAt() -- keyed by (x, y, query arguments), each value is (tile version, objects).
+        self.tileVersions = [[0] * self.sizeY for x in range(self.sizeX)]
+        self.objectsAtCache = {}
+
+        # Region subscriptions (see subscribeToRegion()), indexed by the tiles they cover: (x, y) -> list of subscriptions
+        self.regionSubscriptionsByTile = {}
+        # Region subscriptions that have an owner, indexed by the owner's UUID: uuid -> list of subscriptions
+        self.regionSubscriptionsByOwner = {}
+
+        # Cached backgrounds of the static layers, for rendering (see renderViewport()), keyed by render scale
+        self.staticBackgrounds = {}
+
+        # Grid search engine used for pathfinding on the cost grid (its working memory is shared by all the agents in this world)
+        self.gridSearch = GridSearch(self.sizeX, self.sizeY)
+
+        # Distance fields for destinations that more than one agent is navigating to (see getDistanceField()), keyed by destination (x, y)
+        self.distanceFields = {}
+        self.distanceFieldRequesters = {}       # The pathfinders that have asked for a path to each destination
+        self.distanceFieldDestinations = weakref.WeakKeyDictionary()       # The destination that each of those pathfinders most recently asked for
 
         # Initialize agent array
         self.agents = []
@@ -62,6 +147,10 @@ class World:
         # Font
         self.font = pygame.font.SysFont("Arial", 8)
 
+        # Cached grid lines (keyed by size, in tiles, and tile size) and grid location labels (keyed by location), for rendering the grid (see renderGridOverlay())
+        self.gridOverlays = {}
+        self.gridLabels = {}
+
         # World history
         self.worldHistory = []
 
@@ -79,6 +168,73 @@ class World:
         self.rng = None
 
 
+    #
+    #   Forking
+    #
+
+    # Fork this world into a new, independent simulation (e.g. for lookahead planning, where candidate actions are tried out in the fork and then discarded).
+    # The fork gets its own copy of every object, agent, the task scorer, the discovery feed, and the random number generators.
+    # The sprite library, object/material catalogs, and the world history recorded so far are shared with this world.
+    # The copy is eager (the whole world is pickled), so a fork costs a good fraction of loading the scenario again -- it is not copy-on-write.
+    # Giving both worlds the same actions gives the same observations, until one of them creates an object: new objects in a fork get UUIDs
+    # from a fork block, so they differ from the UUIDs this world would give them (copies of default objects are the exception -- see materializeTile()).
+    def fork(self):
+        forkedWorld, _ = self.forkWith(None)
+        return forkedWorld
+
+    # Fork this world, along with other things that refer to it or its objects (e.g. user interfaces), which are copied so that they refer to the fork instead.
+    # Returns (forked world, copy of 'attached').
+    def forkWith(self, attached):
+        # Copy the world (and everything it refers to) in one pass, by pickling it.  The indices (and the distance field requesters) are weak references,
+        # so the objects in them are included explicitly.
+        indices = {
+            "uuid": list(self.objectsByUUID.values()),
+            "type": {objectType: list(index.values()) for objectType, index in self.objectsByType.items()},
+            "class": {cls: list(index.values()) for cls, index in self.objectsByClass.items()},
+            "tickActive": list(self.tickActiveObjects),
+            "tickWoken": list(self.tickWokenObjects),
+            "distanceFieldRequesters": {location: list(requesters) for location, requesters in self.distanceFieldRequesters.items()},
+        }
+        forkedWorld, forkedIndices, forkedAttached = pickle.loads(pickle.dumps((self, indices, attached), protocol=pickle.HIGHEST_PROTOCOL))
+
+        # Shared resources
+        forkedWorld.spriteLibrary = self.spriteLibrary
+        forkedWorld.font = self.font
+        forkedWorld.objectMaker = copy.copy(self.objectMaker)        # Shares the object/material catalogs, but creates objects in the fork
+        forkedWorld.objectMaker.world = forkedWorld
+
+        # World history (steps that have already been saved never change, so they're shared)
+        forkedWorld.worldHistory = list(self.worldHistory)
+
+        # New objects in the fork get UUIDs from a fork block, so they won't collide with new objects in this world (or in its other forks).
+        # This doesn't change the UUIDs that this world generates.
+        forkedWorld.uuidGenerator = self.uuidGenerator.reserveForkBlock()
+
+        # Rebuild the indices
+        forkedWorld.objectsByUUID = weakref.WeakValueDictionary([(obj.uuid, obj) for obj in forkedIndices["uuid"]])
+        forkedWorld.objectsByType = {objectType: weakref.WeakValueDictionary([(obj.uuid, obj) for obj in objs]) for objectType, objs in forkedIndices["type"].items()}
+        forkedWorld.objectsByClass = {cls: weakref.WeakValueDictionary([(obj.uuid, obj) for obj in objs]) for cls, objs in forkedIndices["class"].items()}
+        forkedWorld.tickActiveObjects = weakref.WeakSet(forkedIndices["tickActive"])
+        forkedWorld.tickWokenObjects = weakref.WeakSet(forkedIndices["tickWoken"])
+        forkedWorld.distanceFieldRequesters = {location: weakref.WeakSet(requesters) for location, requesters in forkedIndices["distanceFieldRequesters"].items()}
+        forkedWorld.distanceFieldDestinations = weakref.WeakKeyDictionary([(requester, location) for location, requesters in forkedIndices["distanceFieldRequesters"].items() for requester in requesters])
+
+        # Caches (these are rebuilt on demand)
+        forkedWorld.objectsAtCache = {}
+        forkedWorld.gridSearch = GridSearch(forkedWorld.sizeX, forkedWorld.sizeY)
+        forkedWorld.staticBackgrounds = {}
+        forkedWorld.gridOverlays = {}
+        forkedWorld.gridLabels = {}
+
+        return forkedWorld, forkedAttached
+
+    # Pickling (used by forkWith()).  The shared resources, indices, and caches are left out -- forkWith() reattaches/rebuilds them.
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for key in World.FORK_SHARED_ATTRIBUTES + World.FORK_REBUILT_ATTRIBUTES:
+            state[key] = None
+        return state
+
     # Set if a live user is playing (e.g. for a user study)
     def setLiveUserPlaying(self):
         self.liveUserPlaying = True
@@ -138,18 +294,6 @@ class World:
     #   Grid
     #
 
-    # Create a blank grid tile
-    def mkBlankGridTile(self):
-        gridTile = {
-            "layers": {}
-        }
-
-        for layer in Layer:
-            gridTile["layers"][layer] = []
-
-        return gridTile
-
-
     # Add an object to the world
     def addObject(self, x, y, layer, object:Object):
         # Bound checking: Make sure the object is within the world bounds
@@ -159,6 +303,9 @@ class World:
             return False
 
 
+        # If the tile only has the shared default objects on it, then it needs its own copies of them first
+        self.materializeTile(x, y)
+
         # Remove the object from its current container
         object.removeSelfFromContainer()
 
@@ -181,24 +328,41 @@ class World:
 
         # All layers can hold multiple objects (prevents objects suddenly disappearing when a new object is moved to the same world location)
         if layer in Layer:
-           self.grid[x][y]["layers"][layer].append(object)
+           self.grid.getLayerForWrite(x, y, layer).append(object)
         else:
             raise ValueError("Error: Invalid layer: " + str(layer))
 
+        # Make sure the object is ticked at its new location
+        self.wakeObjectForTick(object)
+        self.invalidateTile(x, y)
+
     # Get all objects at a given position
+    # Results are cached per tile, until something on that tile changes (see invalidateTile()).  The list returned is a copy, and can be modified by the caller.
     def getObjectsAt(self, x, y, respectContainerStatus=False, includeParts=False, excludeObjectsOnAgents=False, respectObscuringLowerLayers=False, includeContents=True):
         # Bound checking: Make sure the object is within the world bounds
         if x < 0 or x >= self.sizeX or y < 0 or y >= self.sizeY:
             #print("Error: Object out of bounds: " + str(x) + ", " + str(y))
             return []
 
+        # Check the cache
+        cacheKey = (x, y, respectContainerStatus, includeParts, excludeObjectsOnAgents, respectObscuringLowerLayers, includeContents)
+        tileVersion = self.tileVersions[x][y]
+        cached = self.objectsAtCache.get(cacheKey)
+        if (cached != None) and (cached[0] == tileVersion):
+            return list(cached[1])
+
+        objects = self._getObjectsAt(x, y, respectContainerStatus, includeParts, excludeObjectsOnAgents, respectObscuringLowerLayers, includeContents)
+        self.objectsAtCache[cacheKey] = (tileVersion, tuple(objects))
+        return objects
+
+    # Get all objects at a given position (uncached -- see getObjectsAt())
+    def _getObjectsAt(self, x, y, respectContainerStatus, includeParts, excludeObjectsOnAgents, respectObscuringLowerLayers, includeContents):
         #print("\t\t\tGetting objects at (" + str(x) + ", " + str(y) + ")")
         # Get the objects
         objects = []
         #for layer in Layer:
-        for layer in reversed(list(Layer)):         # Reverse the order of layers, so that the top layer is processed first, to handle obscuring objects
+        for objsToAdd in reversed(self.grid.getTileLayers(x, y)):         # Reverse the order of layers, so that the top layer is processed first, to handle obscuring objects
             #objects += self.grid[x][y]["layers"][layer]
-            objsToAdd = self.grid[x][y]["layers"][layer]
             if (len(objsToAdd) > 0):
                 #print("\t\t\t\tLayer: " + str(layer) + " (" + str(len(objsToAdd)) + " objects)")
                 foundObscuringObject = False
@@ -242,23 +406,202 @@ class World:
 
         return objects
 
+    # Put an object (e.g. grass) on every tile of the world, without creating a copy for every tile.  Tiles that have already been written to get their
+    # own copy now.  Every other tile shares a single copy, which getObjectsAt() returns as it is (so looking at a tile never changes the world).
+    # A tile only gets its own copy (see materializeTile()) when an object is added to it, or an action is about to change the shared object on it
+    # (see getDefaultObjectCopy()).  The shared object isn't on any one tile, so its location is (-1, -1).
+    # The shared object must be passable and not radiating, since the cost and radiation grids aren't updated for it.
+    def addDefaultObject(self, layer, objectReferenceName):
+        # Tiles that have already been written to get their own copy (in the same order as filling every tile, row by row)
+        for (x, y) in self.grid.getAllocatedLocations(rowMajor=True):
+            self.addObject(x, y, layer, self.createObject(objectReferenceName))
+
+        sharedObject = self.createObject(objectReferenceName)
+        if (not sharedObject.attributes["isPassable"]) or any(("radiationusvh" in material) and (material["radiationusvh"] != 0) for material in sharedObject.attributes["materials"]):
+            print("WARNING: addDefaultObject(): " + str(objectReferenceName) + " is impassable or radiating, so it can't be shared.  Adding a copy to every tile instead.")
+            for y in range(self.sizeY):
+                for x in range(self.sizeX):
+                    if (self.grid.isDefaultTile(x, y)):
+                        self.addObject(x, y, layer, self.createObject(objectReferenceName))
+            return
+
+        # The shared object isn't on any one tile (so it's never returned by findObjects() or getObjectByUUID())
+        sharedObject.setWorldLocation(-1, -1)
+        sharedObject.inferSpriteName(force=True)
+        self.defaultObjects.append((layer, objectReferenceName, sharedObject))
+
+        defaultTile = [list(objects) for objects in self.grid.defaultTile]
+        defaultTile[layer.value].append(sharedObject)
+        self.grid.setDefaultTile(defaultTile)
+
+        # Anything cached about the tiles that haven't been written to is out of date
+        self.objectsAtCache.clear()
+        self.staticBackgrounds.clear()
+
+    # Give a tile that hasn't been written to its own copies of the default objects (see addDefaultObject()), so it can be changed
+    # Returns the copies (in the same order as 'defaultObjects'), or an empty list if the tile already has its own objects.
+    def materializeTile(self, x, y):
+        if (len(self.defaultObjects) == 0) or (not self.grid.isDefaultTile(x, y)):
+            return []
+
+        # Allocate the tile first, so that adding the copies doesn't try to materialize it again
+        self.grid.getLayerForWrite(x, y, self.defaultObjects[0][0])
+
+        # The copies get UUIDs from a block set aside for this tile, so they're the same whenever (and in whichever fork) the tile is copied,
+        # and copying tiles doesn't change the UUIDs of any other objects that are created
+        worldUUIDGenerator = self.uuidGenerator
+        self.uuidGenerator = worldUUIDGenerator.getFixedBlock((x * self.sizeY + y) * World.DEFAULT_OBJECT_UUIDS_PER_TILE, World.DEFAULT_OBJECT_UUIDS_PER_TILE)
+        copies = []
+        try:
+            for (layer, objectReferenceName, _) in self.defaultObjects:
+                obj = self.createObject(objectReferenceName)
+                obj.inferSpriteName(force=True)         # In case it's rendered before its first tick
+                copies.append(obj)
+        finally:
+            self.uuidGenerator = worldUUIDGenerator
+
+        for (layer, _, _), obj in zip(self.defaultObjects, copies):
+            self.addObject(x, y, layer, obj)
+        return copies
+
+    # Returns true if an object is one of the shared default objects (see addDefaultObject())
+    def isDefaultObject(self, obj):
+        for (_, _, sharedObject) in self.defaultObjects:
+            if (sharedObject is obj):
+                return True
+        return False
+
+    # Get the object that an action on a given tile should use in place of a shared default object (see addDefaultObject()): that tile's own copy of it,
+    # giving the tile its own copies first.  Any other object is returned as it is.  Returns None if the tile doesn't have the shared object on it.
+    def getDefaultObjectCopy(self, obj, x, y):
+        if (not self.isDefaultObject(obj)):
+            return obj
+        if (not self.isWithinBounds(x, y)):
+            return None
+        copies = self.materializeTile(x, y)
+        for idx, (_, _, sharedObject) in enumerate(self.defaultObjects):
+            if (sharedObject is obj) and (idx < len(copies)):
+                return copies[idx]
+        return None
+
+    # Get a copy of the shared default object with a given UUID (see addDefaultObject()), on the closest tile (by Manhattan distance) to (x, y)
+    # that still has it -- e.g. for actions that refer to the object by UUID, which doesn't say which tile is meant.
+    # Returns None if there's no shared default object with that UUID, or no tile still has it.
+    def getNearestDefaultObjectCopy(self, uuid, x, y):
+        sharedObjects = [sharedObject for (_, _, sharedObject) in self.defaultObjects if (sharedObject.uuid == uuid)]
+        if (len(sharedObjects) == 0):
+            return None
+
+        for distance in range(self.sizeX + self.sizeY):
+            for dx in range(-distance, distance + 1):
+                dy = distance - abs(dx)
+                for tileY in sorted(set([y - dy, y + dy])):
+                    if (self.isWithinBounds(x + dx, tileY)) and (self.grid.isDefaultTile(x + dx, tileY)):
+                        return self.getDefaultObjectCopy(sharedObjects[0], x + dx, tileY)
+        return None
+
     # Helper to get all world objects (for example, for scoring)
+    # Note: Tiles that haven't been written to each list the shared default objects (see addDefaultObject()), like getObjectsAt() does for them.
     def getAllWorldObjects(self):
         allObjects = []
+        if (len(self.defaultObjects) == 0):
+            # Only tiles that have been written to have objects on them
+            for (x, y) in self.grid.getAllocatedLocations():
+                allObjects += self.getObjectsAt(x, y)
+            return allObjects
+
+        sharedObjects = [sharedObject for (_, _, sharedObject) in self.defaultObjects]
         for x in range(self.sizeX):
             for y in range(self.sizeY):
-                allObjects += self.getObjectsAt(x, y)
+                if (self.grid.isDefaultTile(x, y)):
+                    allObjects += sharedObjects
+                else:
+                    allObjects += self.getObjectsAt(x, y)
         return allObjects
 
     # Helper to get a specific world object, by its UUID
+    # Returns None if no object with that UUID exists, or if it is no longer in the world (mirrors the objects returned by getObjectsAt())
     def getObjectByUUID(self, uuid):
-        for x in range(self.sizeX):
-            for y in range(self.sizeY):
-                allObjectsThisTile = self.getObjectsAt(x, y)
-                for obj in allObjectsThisTile:
-                    if obj.uuid == uuid:
-                        return obj
-        return None
+        obj = self.objectsByUUID.get(uuid, None)
+        if (obj == None) or (not self.isObjectInWorld(obj)):
+            return None
+        return obj
+
+    # Helper to find all world objects matching some criteria, without scanning the whole grid.
+    # Candidates come from the type/class indices, so the cost is proportional to the number of matching objects.
+    #   type: Only return objects with this type (e.g. "seed")
+    #   objClass: Only return objects that are instances of this class (e.g. Mushroom)
+    #   attributeValues: Only return objects whose attributes have these values (e.g. isPoisonous=True)
+    # Objects are returned in the order they were created.  Like getAllWorldObjects(), only objects in the world are returned.
+    def findObjects(self, type=None, objClass=None, **attributeValues):
+        # Pick the candidate set from the most specific index available
+        if (type != None):
+            candidates = self.objectsByType.get(type, {})
+        elif (objClass != None):
+            candidates = self.objectsByClass.get(objClass, {})
+        else:
+            candidates = self.objectsByUUID
+
+        out = []
+        for obj in list(candidates.values()):
+            if (type != None) and (obj.type != type):
+                continue
+            if (objClass != None) and (not isinstance(obj, objClass)):
+                continue
+            if any(obj.attributes.get(key, None) != value for key, value in attributeValues.items()):
+                continue
+            if (not self.isObjectInWorld(obj)):
+                continue
+            out.append(obj)
+
+        return out
+
+    # Add an object to the UUID (and type/class) indices.  Called from the Object constructor, so every object is indexed as soon as it's created.
+    def registerObject(self, obj):
+        self.objectsByUUID[obj.uuid] = obj
+        self.updateObjectTypeIndex(obj, None)
+        for cls in obj.__class__.__mro__:
+            if (cls not in self.objectsByClass):
+                self.objectsByClass[cls] = weakref.WeakValueDictionary()
+            self.objectsByClass[cls][obj.uuid] = obj
+
+        # Tick scheduling
+        if (obj.hasStaticTick()):
+            # Static objects still need their first tick (to infer their initial sprite)
+            self.tickWokenObjects.add(obj)
+        else:
+            self.tickActiveObjects.add(obj)
+
+    # Make sure an object is ticked on the next step, even if it has a static tick (e.g. because it moved, or its contents changed)
+    def wakeObjectForTick(self, obj):
+        self.tickWokenObjects.add(obj)
+
+    # Move an object to the correct bucket of the type index, after its type changes (e.g. when ObjectMaker populates a generic object)
+    def updateObjectTypeIndex(self, obj, oldType):
+        if (oldType in self.objectsByType):
+            self.objectsByType[oldType].pop(obj.uuid, None)
+        if (obj.type not in self.objectsByType):
+            self.objectsByType[obj.type] = weakref.WeakValueDictionary()
+        self.objectsByType[obj.type][obj.uuid] = obj
+
+    # Returns true if an object is currently in the world -- i.e. it's on a grid tile, or (recursively) in the contents of an object on a grid tile.
+    # Parts are not included, to match the default behavior of getObjectsAt().
+    # This is derived from the container back-references, so it stays correct through any sequence of World/Object addObject()/removeObject() calls.
+    def isObjectInWorld(self, obj):
+        # Walk up to the outermost container
+        while (obj.parentContainer != None):
+            if (obj not in obj.parentContainer.contents):
+                return False
+            obj = obj.parentContainer
+
+        # Check that the outermost container is on the grid tile it thinks it's on
+        x, y = obj.getWorldLocation()
+        if (not self.isWithinBounds(x, y)):
+            return False
+        for objects in self.grid.getTileLayers(x, y):
+            if obj in objects:
+                return True
+        return False
 
 
     # Remove an object from the world
@@ -271,12 +614,16 @@ class World:
         # Remove the object from its current container
         object.removeSelfFromContainer()
 
+        # Remove any region subscriptions the object (or its contents) had
+        self.unsubscribeOwnerFromRegions(object)
+
         # Remove the object from the world
         if (objX >= 0) and (objY >= 0):
-            for layer in Layer:
-                if object in self.grid[objX][objY]["layers"][layer]:
+            self.invalidateTile(objX, objY)
+            for objects in self.grid.getTileLayers(objX, objY):
+                if object in objects:
                     # Remove object from this layer
-                    self.grid[objX][objY]["layers"][layer].remove(object)
+                    objects.remove(object)
                     # Success
                     return True
 
@@ -311,7 +658,7 @@ class World:
 
         # Check if the tile has any objects
         for layer in checkLayers:
-            if len(self.grid[x][y]["layers"][layer]) > 0:
+            if len(self.grid.getLayer(x, y, layer)) > 0:
                 return True
 
         # If we reach here, the tile has no objects
@@ -332,16 +679,211 @@ class World:
             #print("Error: Object out of bounds: " + str(x) + ", " + str(y))
             return (False, None)
 
-        # Check if the tile is passable
-        # Collect all the objects across all layers
-        allObjs = self.getObjectsAt(x, y)
-        # Check if any of the objects are impassable
-        for object in allObjs:
+        # Check if the tile is passable (i.e. it doesn't contain any impassable objects)
+        cost = self.getTileCost(x, y)
+        if (cost == World.COST_DEFAULT) or (cost == World.COST_DEFAULT + World.COST_AGENT_PENALTY):
+            return (True, None)
+
+        # If we reach here, the tile is not passable -- find the (first) object that's blocking it
+        for object in self.getObjectsAt(x, y):
             if (not object.attributes["isPassable"]):
                 return (False, object)
 
-        # If we reach here, the tile is passable
-        return (True, None)
+        return (False, None)
+
+    # Get the cost of traversing a tile (one of the COST_* values, plus COST_AGENT_PENALTY if there's an agent on a passable tile)
+    def getTileCost(self, x, y):
+        if ((x, y) in self.costGridChangedTiles):
+            self.costGridChangedTiles.remove((x, y))
+            self._updateTileCost(x, y)
+        return self.costGrid[x, y]
+
+    # Get the cost grid for the whole world (a NumPy array indexed [x, y]).  Tiles that have changed since the last call are recomputed.
+    # Note: This is the world's own copy, and should not be modified.
+    def getCostGrid(self):
+        for (x, y) in self.costGridChangedTiles:
+            self._updateTileCost(x, y)
+        self.costGridChangedTiles.clear()
+        return self.costGrid
+
+    # Recalculate the cost of a single tile, and update the cost grid version if it changed
+    def _updateTileCost(self, x, y):
+        cost = self._calculateTileCost(x, y)
+        if (cost != self.costGrid[x, y]):
+            self.costGrid[x, y] = cost
+            self.costGridVersion += 1
+
+    # Calculate the cost of traversing a single tile, from the objects on it
+    def _calculateTileCost(self, x, y):
+        # By default, moving to the next cell has a base cost of 1
+        cost = World.COST_DEFAULT
+
+        # Check if any of the objects are impassable
+        for object in self.getObjectsAt(x, y):
+            if (not object.attributes["isPassable"]):
+                # Check to see if the object is a door, and therefore potentially passable
+                if (object.attributes["isPassage"]):
+                    # Potentially passable, with a cost
+                    cost = World.COST_PASSAGE
+                else:
+                    # Not passable
+                    cost = World.COST_IMPASSABLE
+                break
+
+        # If this tile has any agents in it, increase its traversal cost
+        if (cost > 0):
+            if (len(self.grid.getLayer(x, y, Layer.AGENT)) > 0):
+                cost += World.COST_AGENT_PENALTY
+
+        return cost
+
+    #
+    #   Radiation
+    #
+
+    # Get the radiation emitted from a tile (the sum of 'radiationusvh' over the materials of every object and part on it).
+    # 'excludeObject' (optional) is an object whose own materials shouldn't be counted (e.g. the object being measured by a radiation meter).
+    def getTileRadiation(self, x, y, excludeObject=None):
+        if ((x, y) in self.radiationSourcesChangedTiles):
+            self.radiationSourcesChangedTiles.remove((x, y))
+            self.radiationSources[x, y] = self._calculateTileRadiation(x, y)
+        radiationLevel = float(self.radiationSources[x, y])
+
+        # If anything on this tile is radiating, and an object is being excluded, then the tile has to be added up again without it
+        # (radiation levels are never negative, so if the total is zero, excluding an object can't change it)
+        if (excludeObject != None) and (radiationLevel != 0):
+            return self._calculateTileRadiation(x, y, excludeObject=excludeObject)
+        return radiationLevel
+
+    # Get the radiation emitted from every tile in the world (a NumPy array indexed [x, y]).  Tiles that have changed since the last call are recomputed.
+    # Note: This is the world's own copy, and should not be modified.
+    def getRadiationSourceGrid(self):
+        for (x, y) in self.radiationSourcesChangedTiles:
+            self.radiationSources[x, y] = self._calculateTileRadiation(x, y)
+        self.radiationSourcesChangedTiles.clear()
+        return self.radiationSources
+
+    # Calculate the radiation emitted from a single tile, from the materials of the objects (and parts) on it
+    def _calculateTileRadiation(self, x, y, excludeObject=None):
+        # Get all objects at the current location
+        allObjectsAndParts = self.getObjectsAt(x, y, respectContainerStatus=False, includeParts=True)
+
+        totalRadiationLevel = 0
+        for obj in allObjectsAndParts:
+            if (excludeObject == None) or (obj.uuid != excludeObject.uuid):     # Make sure we're not including an object marked for exclusion.
+                for material in obj.attributes["materials"]:
+                    if ("radiationusvh" in material):
+                        totalRadiationLevel += material["radiationusvh"]
+
+        return totalRadiationLevel
+
+    # Note that the objects on a tile have changed (e.g. an object was added/removed, either directly or inside a container on that tile, or changed whether it's passable)
+    def invalidateTile(self, x, y):
+        if (self.isWithinBounds(x, y)):
+            self.tileVersions[x][y] += 1
+            self.costGridChangedTiles.add((x, y))
+            self.radiationSourcesChangedTiles.add((x, y))
+            self.autotileGrid.invalidateTile(x, y)
+            for background in self.staticBackgrounds.values():
+                background.invalidateTile(x, y)
+
+            # Let any subscriptions to regions covering this tile know that it's changed
+            subscriptions = self.regionSubscriptionsByTile.get((x, y))
+            if (subscriptions != None):
+                for subscription in subscriptions:
+                    subscription.markTileChanged(x, y)
+
+    # Note that an object has changed, so the tile it's on (if any) needs to be updated
+    def invalidateObjectTile(self, obj):
+        x, y = obj.getWorldLocation()
+        self.invalidateTile(x, y)
+
+    #
+    #   Region subscriptions
+    #
+
+    # Subscribe to the objects in a region of the world, from (x0, y0) to (x1, y1) inclusive, that match a predicate (object -> bool, or None for all objects).
+    # Instead of scanning the region every tick, the subscriber can check whether anything has changed, and which matching objects have entered or left it
+    # (see RegionSubscription).  Returns the subscription, which should be passed to unsubscribeFromRegion() when it's no longer needed.
+    # If the subscription is for an object ('owner'), it's also removed automatically when that object is removed from the world.
+    def subscribeToRegion(self, x0, y0, x1, y1, predicate=None, includeContents=True, callback=None, owner=None):
+        subscription = RegionSubscription(self, x0, y0, x1, y1, predicate=predicate, includeContents=includeContents, callback=callback, owner=owner)
+        for location in subscription.getTiles():
+            if (location not in self.regionSubscriptionsByTile):
+                self.regionSubscriptionsByTile[location] = []
+            self.regionSubscriptionsByTile[location].append(subscription)
+        if (owner != None):
+            if (owner.uuid not in self.regionSubscriptionsByOwner):
+                self.regionSubscriptionsByOwner[owner.uuid] = []
+            self.regionSubscriptionsByOwner[owner.uuid].append(subscription)
+        return subscription
+
+    # Get a subscription to a region, reusing an existing subscription if it already covers exactly that region (e.g. for subscribers that check whether
+    # they've moved each tick).  Otherwise, the existing subscription (if any) is removed, and a new one is made.
+    def updateRegionSubscription(self, subscription, x0, y0, x1, y1, predicate=None, includeContents=True, callback=None, owner=None):
+        if (subscription != None):
+            if (subscription.isActive) and (subscription.x0 == min(x0, x1)) and (subscription.y0 == min(y0, y1)) and (subscription.x1 == max(x0, x1)) and (subscription.y1 == max(y0, y1)):
+                return subscription
+            self.unsubscribeFromRegion(subscription)
+        return self.subscribeToRegion(x0, y0, x1, y1, predicate=predicate, includeContents=includeContents, callback=callback, owner=owner)
+
+    # Remove a subscription to a region (see subscribeToRegion())
+    def unsubscribeFromRegion(self, subscription):
+        if (not subscription.isActive):
+            return
+        subscription.isActive = False
+
+        for location in subscription.getTiles():
+            subscriptions = self.regionSubscriptionsByTile.get(location)
+            if (subscriptions == None) or (subscription not in subscriptions):
+                continue
+            subscriptions.remove(subscription)
+            if (len(subscriptions) == 0):
+                del self.regionSubscriptionsByTile[location]
+
+        if (subscription.owner != None):
+            ownerSubscriptions = self.regionSubscriptionsByOwner.get(subscription.owner.uuid)
+            if (ownerSubscriptions != None) and (subscription in ownerSubscriptions):
+                ownerSubscriptions.remove(subscription)
+                if (len(ownerSubscriptions) == 0):
+                    del self.regionSubscriptionsByOwner[subscription.owner.uuid]
+
+    # Remove the region subscriptions of an object, and of any objects it contains (e.g. when it's removed from the world)
+    def unsubscribeOwnerFromRegions(self, obj):
+        if (len(self.regionSubscriptionsByOwner) == 0):
+            return
+        for owner in [obj] + obj.getAllContainedObjectsRecursive():
+            for subscription in list(self.regionSubscriptionsByOwner.get(owner.uuid, [])):
+                self.unsubscribeFromRegion(subscription)
+
+    # Note that a pathfinder (i.e. an agent) is navigating to a given destination (and is no longer navigating to the one it asked for before, if any).
+    # Returns true if more than one pathfinder is navigating there, meaning that it's worth sharing a distance field for that destination between them.
+    def addDistanceFieldRequester(self, x, y, requester):
+        previousLocation = self.distanceFieldDestinations.get(requester)
+        if (previousLocation != None) and (previousLocation != (x, y)):
+            previousRequesters = self.distanceFieldRequesters.get(previousLocation)
+            if (previousRequesters != None):
+                previousRequesters.discard(requester)
+                if (len(previousRequesters) == 0):
+                    del self.distanceFieldRequesters[previousLocation]
+        self.distanceFieldDestinations[requester] = (x, y)
+
+        if ((x, y) not in self.distanceFieldRequesters):
+            if (len(self.distanceFieldRequesters) >= World.MAX_DISTANCE_FIELD_DESTINATIONS):
+                self.distanceFieldRequesters = {}
+            self.distanceFieldRequesters[(x, y)] = weakref.WeakSet()
+        self.distanceFieldRequesters[(x, y)].add(requester)
+        return (len(self.distanceFieldRequesters[(x, y)]) > 1)
+
+    # Get the (shared) distance field for a given destination.  Fields are calculated on demand, and cached.
+    # Cached fields may be older than the current cost grid -- the DistanceField checks that the paths it gives are still passable.  Use 'recalculate' to force an update.
+    def getDistanceField(self, x, y, recalculate=False):
+        if (recalculate) or ((x, y) not in self.distanceFields):
+            if (len(self.distanceFields) >= World.MAX_DISTANCE_FIELDS) and ((x, y) not in self.distanceFields):
+                # Remove the oldest field
+                del self.distanceFields[next(iter(self.distanceFields))]
+            self.distanceFields[(x, y)] = DistanceField(self, x, y)
+        return self.distanceFields[(x, y)]
 
 
     #
@@ -352,30 +894,71 @@ class World:
     def isWithinBounds(self, x, y):
         return (x >= 0) and (x < self.sizeX) and (y >= 0) and (y < self.sizeY)
 
+    #
+    #   Level-of-detail NPC simulation
+    #
+
+    # Enable level-of-detail simulation for NPCs (or disable it, if 'radius' is None).  NPCs that are more than 'radius' tiles away from every user agent
+    # are only ticked every 'interval' steps, and catch up by taking several steps along their path at once (see NPC.doLevelOfDetailMacroSteps()).
+    # NPCs within the radius of a user agent are always simulated in full, so anything a user agent can observe behaves as usual.
+    def setNPCLevelOfDetail(self, radius, interval=4):
+        if (radius != None) and (interval < 1):
+            print("ERROR: setNPCLevelOfDetail(): Interval must be at least 1 (specified: " + str(interval) + ")")
+            return
+        self.npcLODRadius = radius
+        self.npcLODInterval = interval if (radius != None) else 1
+
+    # Get the NPCs that are simulated at a low level of detail this step (i.e. are far from every user agent).
+    # Returns a dictionary (NPC -> True if it should be ticked this step, False if its tick should be skipped).
+    def _getLowDetailNPCs(self):
+        lowDetailNPCs = {}
+        if (self.npcLODRadius == None) or (self.npcLODInterval <= 1):
+            return lowDetailNPCs
+
+        userAgents = [agent for agent in self.agents if (not agent.controlledBySimulation)]
+        for agent in self.agents:
+            if (not agent.controlledBySimulation) or (not agent.supportsLevelOfDetail):
+                continue
+            if any(agent.distanceTo(userAgent) <= self.npcLODRadius for userAgent in userAgents):
+                continue
+            # Stagger the NPCs, so they aren't all ticked on the same step
+            lowDetailNPCs[agent] = ((self.step + agent.uuid) % self.npcLODInterval == 0)
+
+        return lowDetailNPCs
+
+
     #
     #   World update
     #
     def tick(self):
         # Update all objects in the world
+        # Note: There's no need to reset whether each object has had its tick() function called -- 'tickCompleted' is tracked per step number.
 
-        # First, reset whether each object has had its tick() function called this tick
-        for x in range(self.sizeX):
-            for y in range(self.sizeY):
-                for layer in Layer:
-                    for object in self.grid[x][y]["layers"][layer]:
-                        object.resetTick()
+        # Wake up any objects whose sprites depend on neighbours that have changed (see hasNeighbouringObjs())
+        self.autotileGrid.update()
 
-                # alObjs = self.getObjectsAt(x, y, respectContainerStatus=False, includeParts=True)   # We need to do it this way, to make sure we reset the tick for all the nested parts.
-                # for object in alObjs:
-                #         object.tickCompleted = False
+        # First, collect the tiles that have something to tick on them: an active object (possibly nested inside a container), or a static object that was woken up.
+        # Every other tile only has static objects, whose tick() would do nothing.
+        tilesToTick = set()
+        wokenObjects = self.tickWokenObjects
+        self.tickWokenObjects = weakref.WeakSet()           # Objects woken during this step are ticked on the next step
+        for object in list(self.tickActiveObjects) + list(wokenObjects):
+            x, y = object.getWorldLocation()
+            if (self.isWithinBounds(x, y)):
+                tilesToTick.add((x, y))
 
+        # The sprites of anything on those tiles may change (see renderViewport())
+        for background in self.staticBackgrounds.values():
+            background.invalidateTiles(tilesToTick)
 
-        # Then, call tick() on each object in the world
-        for x in range(self.sizeX):
-            for y in range(self.sizeY):
-                for layer in Layer:
-                    for object in self.grid[x][y]["layers"][layer]:
-                        object.tick()
+        # NPCs that are far from every user agent only get ticked every few steps (if level-of-detail simulation is enabled)
+        lowDetailNPCs = self._getLowDetailNPCs()
+
+        # Then, call tick() on each object on those tiles (in the same x, y, layer order as a full traversal of the grid)
+        for (x, y) in sorted(tilesToTick):
+            for objects in self.grid.getTileLayers(x, y):
+                for object in objects:
+                    self._tickObject(object, wokenObjects, lowDetailNPCs)
 
 
         # Also do a tick of the task scorer, to measure task progress
@@ -397,6 +980,28 @@ class World:
         self.step += 1
 
 
+    # Tick an object, unless it has a static tick and hasn't been woken up.  In that case, its contents and parts (which may not be static) are still visited.
+    # NPCs simulated at a low level of detail (see _getLowDetailNPCs()) are treated the same way on the steps they skip.
+    def _tickObject(self, object, wokenObjects, lowDetailNPCs):
+        if (object.tickCompleted):
+            return
+
+        if (object in lowDetailNPCs):
+            if (lowDetailNPCs[object]):
+                # Tick, then catch up on the skipped steps
+                object.tick()
+                object.doLevelOfDetailMacroSteps(self.npcLODInterval - 1)
+            else:
+                for obj in object.contents + object.parts:
+                    self._tickObject(obj, wokenObjects, lowDetailNPCs)
+        elif (not object.hasStaticTick()) or (object in wokenObjects):
+            # Object.tick() also ticks all contents and parts
+            object.tick()
+        else:
+            for obj in object.contents + object.parts:
+                self._tickObject(obj, wokenObjects, lowDetailNPCs)
+
+
     #
     #   Saving a world history
     #
@@ -423,25 +1028,33 @@ class World:
             "runtime_seconds": round(time.time() - self.startTime, 1),
         }
 
-        # Clone everything in the grid into this record
+        # Clone everything in the grid into this record.  Only tiles that have been written to have their own objects on them -- every other tile has
+        # the shared default objects (see addDefaultObject()), which are packed once, and then listed on each of those tiles with the tile's location.
         totalObjects = 0
-        for x in range(self.sizeX):
-            packed["grid"].append([])
-            for y in range(self.sizeY):
-                # Add all objects in this tile
-                allObjs = []
-                for layer in Layer:
-                    for object in self.grid[x][y]["layers"][layer]:
-
-                        # For each object, get all the objects it contains/that are its parts.
-                        allObjContentsAndParts = object.getAllContainedObjectsAndParts()
-                        # Add them to the list of objects to save
-                        for obj in allObjContentsAndParts:
-                            # Pack to dict using the to_dict() method
-                            allObjs.append( obj.to_dict() )
+        packed["grid"] = [[[] for y in range(self.sizeY)] for x in range(self.sizeX)]
+        if (len(self.defaultObjects) > 0):
+            packedDefaultObjects = [obj.to_dict() for (_, _, obj) in self.defaultObjects]
+            for x in range(self.sizeX):
+                for y in range(self.sizeY):
+                    if (self.grid.isDefaultTile(x, y)):
+                        for packedObj in packedDefaultObjects:
+                            packedCopy = dict(packedObj)
+                            packedCopy["attributes"] = dict(packedObj["attributes"], gridX=x, gridY=y)
+                            packed["grid"][x][y].append(packedCopy)
                             totalObjects += 1
-
-                packed["grid"][x].append(allObjs)
+        for (x, y) in self.grid.getAllocatedLocations():
+            # Add all objects in this tile
+            allObjs = packed["grid"][x][y]
+            for objects in self.grid.getTileLayers(x, y):
+                for object in objects:
+
+                    # For each object, get all the objects it contains/that are its parts.
+                    allObjContentsAndParts = object.getAllContainedObjectsAndParts()
+                    # Add them to the list of objects to save
+                    for obj in allObjContentsAndParts:
+                        # Pack to dict using the to_dict() method
+                        allObjs.append( obj.to_dict() )
+                        totalObjects += 1
 
         # Save the history
         #packed["objects"] = allObjs
@@ -583,56 +1196,59 @@ class World:
     #
     def render(self, window, cameraX, cameraY):
         #world.spriteLibrary.displaySprite("house1_house_corner_tl", window, 0, 0)
-        # Render the world
-        for y in range(self.sizeY):
-            for x in range(self.sizeX):
-
-                # Render the world layer
-                for object in self.grid[x][y]["layers"][Layer.WORLD]:
-                    #print("Rendering: " + object.name)
-                    #self.spriteLibrary.renderSprite(window, object.getSpriteName(), x * 32 - cameraX, y * 32 - cameraY)
-                    #for spriteName in object.getSpriteNamesWithContents():
-                    #    self.spriteLibrary.renderSprite(window, spriteName, x * 32 - cameraX, y * 32 - cameraY)
-                    for spriteDict in object.getSpriteNamesWithContents():
-                        self.spriteLibrary.renderSprite(window, spriteDict["spriteName"], x * 32 - cameraX, y * 32 - cameraY + spriteDict["yOffset"])
-
-                # Render the building layer
-                for object in self.grid[x][y]["layers"][Layer.BUILDING]:
-                    #print("Rendering: " + object.name)
-                    #self.spriteLibrary.renderSprite(window, object.getSpriteName(), x * 32 - cameraX, y * 32 - cameraY)
-                    #for spriteName in object.getSpriteNamesWithContents():
-                    #    self.spriteLibrary.renderSprite(window, spriteName, x * 32 - cameraX, y * 32 - cameraY)
-                    for spriteDict in object.getSpriteNamesWithContents():
-                        self.spriteLibrary.renderSprite(window, spriteDict["spriteName"], x * 32 - cameraX, y * 32 - cameraY + spriteDict["yOffset"])
-
-
-                # Render the furniture layer
-                for object in self.grid[x][y]["layers"][Layer.FURNITURE]:
-                    #print("Rendering: " + object.name)
-                    #self.spriteLibrary.renderSprite(window, object.getSpriteName(), x * 32 - cameraX, y * 32 - cameraY)
-                    #for spriteName in object.getSpriteNamesWithContents():
-                    #    self.spriteLibrary.renderSprite(window, spriteName, x * 32 - cameraX, y * 32 - cameraY)
-                    for spriteDict in object.getSpriteNamesWithContents():
-                        self.spriteLibrary.renderSprite(window, spriteDict["spriteName"], x * 32 - cameraX, y * 32 - cameraY + spriteDict["yOffset"])
-
-                # Render the objects layer
-                for object in self.grid[x][y]["layers"][Layer.OBJECTS]:
-                    #print("Rendering: " + object.name)
-                    #self.spriteLibrary.renderSprite(window, object.getSpriteName(), x * 32 - cameraX, y * 32 - cameraY)
-                    #for spriteName in object.getSpriteNamesWithContents():
-                    #    self.spriteLibrary.renderSprite(window, spriteName, x * 32 - cameraX, y * 32 - cameraY)
-                    for spriteDict in object.getSpriteNamesWithContents():
-                        self.spriteLibrary.renderSprite(window, spriteDict["spriteName"], x * 32 - cameraX, y * 32 - cameraY + spriteDict["yOffset"])
-
-
-                # Render the player layer
-                for object in self.grid[x][y]["layers"][Layer.AGENT]:
-                    #print("Rendering: " + object.name)
-                    #self.spriteLibrary.renderSprite(window, object.getSpriteName(), x * 32 - cameraX, y * 32 - cameraY)
-                    #for spriteName in object.getSpriteNamesWithContents():
-                    #    self.spriteLibrary.renderSprite(window, spriteName, x * 32 - cameraX, y * 32 - cameraY)
-                    for spriteDict in object.getSpriteNamesWithContents():
-                        self.spriteLibrary.renderSprite(window, spriteDict["spriteName"], x * 32 - cameraX, y * 32 - cameraY + spriteDict["yOffset"])
+        # Render the world (only tiles that have been written to can have objects on them, unless there are shared default objects on every other tile)
+        if (len(self.defaultObjects) > 0):
+            locations = [(x, y) for y in range(self.sizeY) for x in range(self.sizeX)]
+        else:
+            locations = self.grid.getAllocatedLocations(rowMajor=True)
+        for (x, y) in locations:
+            tileLayers = self.grid.getTileLayers(x, y)
+            # Render the world layer
+            for object in tileLayers[Layer.WORLD.value]:
+                #print("Rendering: " + object.name)
+                #self.spriteLibrary.renderSprite(window, object.getSpriteName(), x * 32 - cameraX, y * 32 - cameraY)
+                #for spriteName in object.getSpriteNamesWithContents():
+                #    self.spriteLibrary.renderSprite(window, spriteName, x * 32 - cameraX, y * 32 - cameraY)
+                for spriteDict in object.getSpriteNamesWithContents():
+                    self.spriteLibrary.renderSprite(window, spriteDict["spriteName"], x * 32 - cameraX, y * 32 - cameraY + spriteDict["yOffset"])
+
+            # Render the building layer
+            for object in tileLayers[Layer.BUILDING.value]:
+                #print("Rendering: " + object.name)
+                #self.spriteLibrary.renderSprite(window, object.getSpriteName(), x * 32 - cameraX, y * 32 - cameraY)
+                #for spriteName in object.getSpriteNamesWithContents():
+                #    self.spriteLibrary.renderSprite(window, spriteName, x * 32 - cameraX, y * 32 - cameraY)
+                for spriteDict in object.getSpriteNamesWithContents():
+                    self.spriteLibrary.renderSprite(window, spriteDict["spriteName"], x * 32 - cameraX, y * 32 - cameraY + spriteDict["yOffset"])
+
+
+            # Render the furniture layer
+            for object in tileLayers[Layer.FURNITURE.value]:
+                #print("Rendering: " + object.name)
+                #self.spriteLibrary.renderSprite(window, object.getSpriteName(), x * 32 - cameraX, y * 32 - cameraY)
+                #for spriteName in object.getSpriteNamesWithContents():
+                #    self.spriteLibrary.renderSprite(window, spriteName, x * 32 - cameraX, y * 32 - cameraY)
+                for spriteDict in object.getSpriteNamesWithContents():
+                    self.spriteLibrary.renderSprite(window, spriteDict["spriteName"], x * 32 - cameraX, y * 32 - cameraY + spriteDict["yOffset"])
+
+            # Render the objects layer
+            for object in tileLayers[Layer.OBJECTS.value]:
+                #print("Rendering: " + object.name)
+                #self.spriteLibrary.renderSprite(window, object.getSpriteName(), x * 32 - cameraX, y * 32 - cameraY)
+                #for spriteName in object.getSpriteNamesWithContents():
+                #    self.spriteLibrary.renderSprite(window, spriteName, x * 32 - cameraX, y * 32 - cameraY)
+                for spriteDict in object.getSpriteNamesWithContents():
+                    self.spriteLibrary.renderSprite(window, spriteDict["spriteName"], x * 32 - cameraX, y * 32 - cameraY + spriteDict["yOffset"])
+
+
+            # Render the player layer
+            for object in tileLayers[Layer.AGENT.value]:
+                #print("Rendering: " + object.name)
+                #self.spriteLibrary.renderSprite(window, object.getSpriteName(), x * 32 - cameraX, y * 32 - cameraY)
+                #for spriteName in object.getSpriteNamesWithContents():
+                #    self.spriteLibrary.renderSprite(window, spriteName, x * 32 - cameraX, y * 32 - cameraY)
+                for spriteDict in object.getSpriteNamesWithContents():
+                    self.spriteLibrary.renderSprite(window, spriteDict["spriteName"], x * 32 - cameraX, y * 32 - cameraY + spriteDict["yOffset"])
 
 
 
@@ -653,8 +1269,14 @@ class World:
         # if (includeGrid):
         #    tileSize += 1
 
-        # Render the world layers in order.
-        for layer in [Layer.WORLD, Layer.BUILDING, Layer.FURNITURE, Layer.OBJECTS, Layer.AGENT, Layer.AIR]:
+        # Render the world layers in order.  The static layers (WORLD, BUILDING, FURNITURE) are drawn from a cached background when possible, so only the
+        # dynamic layers have to be drawn sprite by sprite (see StaticBackground).  Note: This assumes the window has been cleared to black before rendering.
+        layersToRender = [Layer.WORLD, Layer.BUILDING, Layer.FURNITURE, Layer.OBJECTS, Layer.AGENT, Layer.AIR]
+        if (self.getStaticBackground(scale).render(window, worldStartX, worldStartY, sizeTilesX, sizeTilesY, offsetX, offsetY)):
+            layersToRender = StaticBackground.DYNAMIC_LAYERS
+
+        for layer in layersToRender:
+            layerIdx = layer.value
 
             for y in range(worldStartY, worldStartY + sizeTilesY):
                 for x in range(worldStartX, worldStartX + sizeTilesX):
@@ -667,31 +1289,74 @@ class World:
                     screenX = (x - worldStartX) * tileSize + offsetX
                     screenY = (y - worldStartY) * tileSize + offsetY
 
-                    for object in self.grid[x][y]["layers"][layer]:
+                    for object in self.grid.getTileLayers(x, y)[layerIdx]:
                         #object.render(self.spriteLibrary, window, screenX, screenY, scale)
                         for spriteDict in object.getSpriteNamesWithContents():
                             self.spriteLibrary.renderSprite(window, spriteDict["spriteName"], screenX + spriteDict.get("xOffset", 0), screenY + spriteDict.get("yOffset", 0), scale * spriteDict.get("scale", 1.0))
 
 
         if renderGridLocations or includeGrid:
-            for y in range(worldStartY, worldStartY + sizeTilesY):
-                for x in range(worldStartX, worldStartX + sizeTilesX):
-                    # Bound checking: Make sure the object is within the world bounds
-                    if (x < 0) or (x >= self.sizeX) or (y < 0) or (y >= self.sizeY):
-                        #print("Error: Object out of bounds: " + str(x) + ", " + str(y))
-                        continue
+            self.renderGridOverlay(window, worldStartX, worldStartY, sizeTilesX, sizeTilesY, offsetX, offsetY, scale)
 
-                    # Determine screen x/y coordinates
-                    screenX = (x - worldStartX) * tileSize + offsetX
-                    screenY = (y - worldStartY) * tileSize + offsetY
-
-                    # Draw a rectangle around the tile
-                    pygame.draw.rect(window, (0, 0, 0), (screenX, screenY, tileSize, tileSize), 1)
+    # Draw the grid over a viewport (a black rectangle around each tile, and each tile's location), as renderViewport() does when 'includeGrid' is set.
+    # This can be drawn over an already rendered viewport (e.g. to get the same frame with and without the grid, without rendering the world twice).
+    # The lines are drawn from a cached overlay, and the location labels are cached, since they're the same from frame to frame.
+    def renderGridOverlay(self, window, worldStartX, worldStartY, sizeTilesX, sizeTilesY, offsetX, offsetY, scale=1.0):
+        tileSize = int(32 * scale)
 
-                    # If enabled, render the grid location (for debugging)
-                    if (renderGridLocations):
-                        text = self.font.render(str(x) + "," + str(y), True, (0, 0, 0))
-                        window.blit(text, (screenX, screenY))
+        # Only the tiles within the world bounds have a grid
+        startX = max(worldStartX, 0)
+        startY = max(worldStartY, 0)
+        endX = min(worldStartX + sizeTilesX, self.sizeX)
+        endY = min(worldStartY + sizeTilesY, self.sizeY)
+        if (startX >= endX) or (startY >= endY):
+            return
+
+        # Get the location labels
+        labels = []
+        labelsFitInTiles = True
+        for y in range(startY, endY):
+            for x in range(startX, endX):
+                label = self.gridLabels.get((x, y))
+                if (label == None):
+                    label = self.font.render(str(x) + "," + str(y), True, (0, 0, 0))
+                    self.gridLabels[(x, y)] = label
+                if (label.get_width() > tileSize) or (label.get_height() > tileSize):
+                    labelsFitInTiles = False
+                labels.append((label, ((x - worldStartX) * tileSize + offsetX, (y - worldStartY) * tileSize + offsetY)))
+
+        # If the labels extend past their tiles, then the lines of later tiles can be drawn over them, so draw each tile's lines and label in turn
+        if (not labelsFitInTiles):
+            for (label, (screenX, screenY)) in labels:
+                pygame.draw.rect(window, (0, 0, 0), (screenX, screenY, tileSize, tileSize), 1)
+                window.blit(label, (screenX, screenY))
+            return
+
+        # Otherwise, draw all the lines at once, then the labels
+        key = (endX - startX, endY - startY, tileSize)
+        overlay = self.gridOverlays.get(key)
+        if (overlay == None):
+            overlay = pygame.Surface(((endX - startX) * tileSize, (endY - startY) * tileSize))
+            overlay.fill(World.GRID_OVERLAY_COLORKEY)
+            overlay.set_colorkey(World.GRID_OVERLAY_COLORKEY)
+            for y in range(endY - startY):
+                for x in range(endX - startX):
+                    pygame.draw.rect(overlay, (0, 0, 0), (x * tileSize, y * tileSize, tileSize, tileSize), 1)
+            if (len(self.gridOverlays) >= World.MAX_GRID_OVERLAYS):
+                self.gridOverlays.clear()
+            self.gridOverlays[key] = overlay
+
+        window.blit(overlay, ((startX - worldStartX) * tileSize + offsetX, (startY - worldStartY) * tileSize + offsetY))
+        window.blits(labels, doreturn=False)
+
+    # Get the cached background of the static layers for a render scale (creating it if needed)
+    def getStaticBackground(self, scale):
+        if (scale not in self.staticBackgrounds):
+            if (len(self.staticBackgrounds) >= World.MAX_STATIC_BACKGROUNDS):
+                # Drop the oldest one
+                del self.staticBackgrounds[next(iter(self.staticBackgrounds))]
+            self.staticBackgrounds[scale] = StaticBackground(self, scale)
+        return self.staticBackgrounds[scale]
 
     #
     #   Teleport locations
@@ -711,6 +1376,12 @@ class World:
                 return True
         return False
 
+    # Get whether each neighbour of a tile (north, south, west, east) has an object of any of the given types on it (as a tuple of 4 bools).
+    # This is meant for objects whose sprites depend on their neighbours (e.g. walls, fences, paths), and is much faster than calling hasObj() on each
+    # neighbour.  Objects that use it should list the types in their 'autotileNeighbourTypes', so their sprites are updated when their neighbours change.
+    def hasNeighbouringObjs(self, x, y, objectTypes):
+        return self.autotileGrid.hasNeighbouringObjs(x, y, objectTypes)
+
 
     #
     #   Filtering
@@ -718,23 +1389,21 @@ class World:
 
     # Filter out objects that can never be visible -- e.g. initial Grass tiles that are always covered by buildings
     def initialFilter(self):
-        for x in range(self.sizeX):
-            for y in range(self.sizeY):
-                # Get all the objects at this location
-                objects = self.getObjectsAt(x, y)
-
-                grassObjs = [x for x in objects if (x.type == "grass")]
-                obscuringObjects = []
-                obscuringTypes = ["path", "floor", "cave floor", "soil", "cave wall"]
-                foundObscuringObject = False
-                for obj in objects:
-                    if (obj.type in obscuringTypes):
-                        foundObscuringObject = True
-                        break
-                if (foundObscuringObject):
-                    for obj in grassObjs:
-                        self.removeObject(obj)
-                        #print("Removing grass object at (" + str(x) + ", " + str(y) + ")")
+        obscuringTypes = ["path", "floor", "cave floor", "soil", "cave wall"]
+        # Only tiles that have grass on them need to be checked
+        for grassObj in self.findObjects(type="grass"):
+            x, y = grassObj.getWorldLocation()
+            # Get all the objects at this location
+            objects = self.getObjectsAt(x, y)
+
+            foundObscuringObject = False
+            for obj in objects:
+                if (obj.type in obscuringTypes):
+                    foundObscuringObject = True
+                    break
+            if (foundObscuringObject):
+                self.removeObject(grassObj)
+                #print("Removing grass object at (" + str(x) + ", " + str(y) + ")")
 
 
     #
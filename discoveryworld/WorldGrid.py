@@ -0,0 +1,121 @@
+# WorldGrid.py
+
+from discoveryworld.Layer import Layer
+
+
+# Storage for the objects on each tile of the world grid.
+# The grid is split into square chunks (chunkSize x chunkSize tiles).  A chunk is only allocated when an object is first added to one of its tiles,
+# so large worlds that are mostly empty only use memory (and iteration time) for the parts that have something on them.
+#
+# Tiles are stored compactly: each tile is a list with one entry per layer (indexed by the layer's value, in Layer order), and each entry is the
+# list of objects on that layer.  Tiles that have never had an object on them are None, and layers that have never had an object on them
+# share a single empty (read-only) tuple, so only the layers actually in use have their own list.
+#
+# Tiles that have never been written to all read as the same default tile.  This is empty unless the world sets one (e.g. a single shared grass
+# object covering the whole world, see World.addDefaultObject()), so uniform ground cover doesn't need a chunk (or an object) for every tile.
+class WorldGrid:
+    # Default chunk size (in tiles)
+    CHUNK_SIZE = 16
+
+    # Number of layers on each tile
+    NUM_LAYERS = len(Layer)
+
+    # Shared read-only layer, for layers that have never had an object on them
+    EMPTY_LAYER = ()
+    # Shared read-only tile, returned for tiles that have never had an object on them
+    EMPTY_TILE = (EMPTY_LAYER,) * NUM_LAYERS
+
+    # Constructor
+    def __init__(self, sizeX, sizeY, chunkSize=CHUNK_SIZE):
+        self.sizeX = sizeX
+        self.sizeY = sizeY
+        self.chunkSize = chunkSize
+
+        # Allocated chunks, indexed by (chunkX * numChunksY + chunkY), or None if not allocated.
+        # Each chunk is a list of tiles, indexed by (localX * chunkSize + localY).
+        self.numChunksX = (sizeX + chunkSize - 1) // chunkSize
+        self.numChunksY = (sizeY + chunkSize - 1) // chunkSize
+        self.chunks = [None] * (self.numChunksX * self.numChunksY)
+        self.numAllocatedChunks = 0
+
+        # The (read-only) tile returned for tiles that have never been written to
+        self.defaultTile = WorldGrid.EMPTY_TILE
+
+    # Get the layers of a tile (a sequence with one entry per layer, in Layer order, each of which is a sequence of objects).
+    # Tiles that have never had an object on them return the shared (read-only) default tile.
+    # Note: No bounds checking is performed -- that's handled by the World.
+    def getTileLayers(self, x, y):
+        chunkSize = self.chunkSize
+        chunk = self.chunks[(x // chunkSize) * self.numChunksY + (y // chunkSize)]
+        if (chunk == None):
+            return self.defaultTile
+        tile = chunk[(x % chunkSize) * chunkSize + (y % chunkSize)]
+        if (tile == None):
+            return self.defaultTile
+        return tile
+
+    # Get the objects on a given layer of a tile.  Layers that have never had an object on them return a shared empty (read-only) layer.
+    def getLayer(self, x, y, layer):
+        return self.getTileLayers(x, y)[layer.value]
+
+    # Get the objects on a given layer of a tile, for modification (allocating the tile's chunk, tile, and layer, if required).
+    # Note: A newly allocated tile starts out empty, not as a copy of the default tile -- see World.materializeTile().
+    def getLayerForWrite(self, x, y, layer):
+        chunkSize = self.chunkSize
+        chunkIdx = (x // chunkSize) * self.numChunksY + (y // chunkSize)
+        chunk = self.chunks[chunkIdx]
+        if (chunk == None):
+            chunk = [None] * (chunkSize * chunkSize)
+            self.chunks[chunkIdx] = chunk
+            self.numAllocatedChunks += 1
+
+        tileIdx = (x % chunkSize) * chunkSize + (y % chunkSize)
+        tile = chunk[tileIdx]
+        if (tile == None):
+            tile = [WorldGrid.EMPTY_LAYER] * WorldGrid.NUM_LAYERS
+            chunk[tileIdx] = tile
+
+        layerIdx = layer.value
+        if (tile[layerIdx] is WorldGrid.EMPTY_LAYER):
+            tile[layerIdx] = []
+        return tile[layerIdx]
+
+    # Returns true if the chunk containing a given tile has been allocated
+    def isAllocated(self, x, y):
+        return self.chunks[(x // self.chunkSize) * self.numChunksY + (y // self.chunkSize)] != None
+
+    # Returns true if a tile has never been written to (i.e. it reads as the default tile)
+    def isDefaultTile(self, x, y):
+        chunkSize = self.chunkSize
+        chunk = self.chunks[(x // chunkSize) * self.numChunksY + (y // chunkSize)]
+        return (chunk == None) or (chunk[(x % chunkSize) * chunkSize + (y % chunkSize)] == None)
+
+    # Set the tile returned for tiles that have never been written to (a sequence with one entry per layer, each of which is a sequence of objects)
+    def setDefaultTile(self, tile):
+        self.defaultTile = tuple(tuple(objects) for objects in tile)
+
+    # Get the locations (x, y) of every tile that has been written to (i.e. that doesn't just read as the default tile), sorted by x then y
+    # (or by y then x, if 'rowMajor' is True).
+    def getAllocatedLocations(self, rowMajor=False):
+        locations = []
+        chunkSize = self.chunkSize
+        for chunkIdx in range(len(self.chunks)):
+            chunk = self.chunks[chunkIdx]
+            if (chunk == None):
+                continue
+            chunkX = chunkIdx // self.numChunksY
+            chunkY = chunkIdx % self.numChunksY
+            for x in range(chunkX * chunkSize, min((chunkX + 1) * chunkSize, self.sizeX)):
+                for y in range(chunkY * chunkSize, min((chunkY + 1) * chunkSize, self.sizeY)):
+                    if (chunk[(x % chunkSize) * chunkSize + (y % chunkSize)] != None):
+                        locations.append((x, y))
+
+        if (rowMajor):
+            locations.sort(key=lambda location: (location[1], location[0]))
+        else:
+            locations.sort()
+        return locations
+
+    # Get the number of allocated chunks
+    def getNumAllocatedChunks(self):
+        return self.numAllocatedChunks
@@ -3,11 +3,11 @@ from discoveryworld.buildings import Layer
 
 
 def mkGrassFill(world):
-    """ Fill the world with a base layer of grass. """
+    """ Fill the world with a base layer of grass.
 
-    for y in range(world.sizeY):
-        for x in range(world.sizeX):
-            world.addObject(x, y, Layer.WORLD, world.createObject("Grass"))
+    Tiles share a single grass object until they're written to or looked at (see World.addDefaultObject()).
+    """
+    world.addDefaultObject(Layer.WORLD, "Grass")
 
 
 def mkSandFill(world):
@@ -1111,6 +1111,9 @@ class SoilNutrientMeter(Object):
 
 
 class SoilTile(Object):
+    tickIsStatic = True                     # Only changes when its contents, or the objects on its tile, change (see _onTileChanged())
+    autotileNeighbourTypes = ("soil",)     # Sprite depends on the neighbouring tiles
+
     # Constructor
     def __init__(self, world):
         # Default sprite name
@@ -1125,6 +1128,9 @@ class SoilTile(Object):
         dirt = self.world.createObject("Dirt")
         self.addObject(dirt, force=True)
 
+        # Subscription to the tile this soil is on (see tick())
+        self.tileSubscription = None
+
 
     #def __init__(self, success, message, generatedItem = None, importance = MessageImportance.NORMAL):
     def useWithShovelResult(self):
@@ -1156,6 +1162,15 @@ class SoilTile(Object):
         # Return success
         return UseWithSuccess(True, "You dig a hole in the soil, creating a hole and dirt.", generatedObjects)
 
+    # Returns true if an object on this tile would fall into the hole (i.e. it's not the soil tile itself, an agent, or grass)
+    def _canFallIntoHole(self, obj):
+        return (obj.uuid != self.uuid) and (obj.attributes["isAgent"] == False) and (obj.type != "grass")
+
+    # Called when the objects on this tile change (see tick()).  If there's a hole, then wake up on the next tick, so anything new can fall into it.
+    def _onTileChanged(self, subscription):
+        if (self.attributes["hasHole"]):
+            self.world.wakeObjectForTick(self)
+
 
     def tick(self):
         # Call superclass
@@ -1173,16 +1188,14 @@ class SoilTile(Object):
             self.attributes["hasHole"] = True
 
         # If it 'hasHole', then make any objects on this tile fall into it.
-        if (self.attributes["hasHole"]):
-            # First, get a list of objects on this tile
-            objectsOnTile = self.world.getObjectsAt(self.attributes["gridX"], self.attributes["gridY"], includeContents=False)
-            # For each object, check that it's not the soil tile itself, or an agent
-            for obj in objectsOnTile:
-                #print("FOUND OBJECT ON SOIL TILE: " + str(obj.uuid) + " (" + str(obj.type) + ")")
-                if (obj.uuid != self.uuid) and (obj.attributes["isAgent"] == False) and (obj.type != "grass"):
-                    # Make the object fall into the hole
-                    #print("\t ADDED!")
-                    self.addObject(obj, force=True)
+        # The tile is watched with a region subscription, which wakes this soil tile up when something on it changes (its contents changing wakes it up too),
+        # so it doesn't need to be ticked otherwise.
+        self.tileSubscription = self.world.updateRegionSubscription(self.tileSubscription, self.attributes["gridX"], self.attributes["gridY"], self.attributes["gridX"], self.attributes["gridY"], predicate=self._canFallIntoHole, includeContents=False, callback=self._onTileChanged, owner=self)
+        if (self.attributes["hasHole"]) and (self.tileSubscription.hasChanges()):
+            # First, get a list of objects on this tile (that aren't the soil tile itself, an agent, or grass)
+            for obj in self.tileSubscription.getMatchingObjects():
+                # Make the object fall into the hole
+                self.addObject(obj, force=True)
 
 
         # Check to see if the object has a hole (and if so, change the name, and add the sprite modifier)
@@ -1195,9 +1208,10 @@ class SoilTile(Object):
                 # If so, then we need to update the sprite name
                 self.needsSpriteNameUpdate = True
 
-            # Allow the object to be a container, and be open
-            self.attributes["isContainer"] = True
-            self.attributes["isOpenContainer"] = True
+            # Allow the object to be a container, and be open.  (Only set these when they change -- 'isOpenContainer' changes the tile, which would wake this tile up again)
+            if (not self.attributes["isOpenContainer"]):
+                self.attributes["isContainer"] = True
+                self.attributes["isOpenContainer"] = True
         else:
             # No sprite modifier needed (they are cleared each tick automatically)
             # Change the name of the object to "soil"
@@ -1206,8 +1220,9 @@ class SoilTile(Object):
                 self.needsSpriteNameUpdate = True
 
             # Object is not a container, and not open
-            self.attributes["isContainer"] = False
-            self.attributes["isOpenContainer"] = False
+            if (self.attributes["isOpenContainer"]):
+                self.attributes["isContainer"] = False
+                self.attributes["isOpenContainer"] = False
 
 
     # Sprite
@@ -1218,10 +1233,7 @@ class SoilTile(Object):
             return
 
         # Check to see if the neighbouring tiles have paths
-        hasPathNorth = self.world.hasObj(self.attributes["gridX"], self.attributes["gridY"] - 1, "soil")
-        hasPathSouth = self.world.hasObj(self.attributes["gridX"], self.attributes["gridY"] + 1, "soil")
-        hasPathWest = self.world.hasObj(self.attributes["gridX"] - 1, self.attributes["gridY"], "soil")
-        hasPathEast = self.world.hasObj(self.attributes["gridX"] + 1, self.attributes["gridY"], "soil")
+        hasPathNorth, hasPathSouth, hasPathWest, hasPathEast = self.world.hasNeighbouringObjs(self.attributes["gridX"], self.attributes["gridY"], ("soil",))
 
         # 4 positives
         if (hasPathNorth and hasPathSouth and hasPathEast and hasPathWest):
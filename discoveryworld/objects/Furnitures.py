@@ -3,6 +3,8 @@ from discoveryworld.objects.Object import Object
 
 
 class Bed(Object):
+    tickIsStatic = True
+
     # Constructor
     def __init__(self, world):
         # Default sprite name
@@ -39,6 +41,8 @@ class Bookcase(Object):
         self.attributes["manualMaterialNames"] = ["Wood"]
 
 class Chair(Object):
+    autotileNeighbourTypes = ("table",)     # Sprite depends on the neighbouring tiles
+
     # Constructor
     def __init__(self, world, curDirection="west"):
         Object.__init__(self, world, "chair", "chair", defaultSpriteName = "house1_chair_l")
@@ -58,18 +62,6 @@ class Chair(Object):
         # Rendering attributes
         self.curDirection = curDirection
 
-    # Sprite helper: Look to see if there's a table nearby
-    def _hasTable(self, x, y):
-        # Check to see if there is a wall at the given location
-        # First, get objects at a given location
-        objects = self.world.getObjectsAt(x, y)
-        # Then, check to see if any of them are walls
-        for object in objects:
-            if object.type == "table":
-                return True
-        # If we get here, there are no walls
-        return False
-
     # Sprite
     # Updates the current sprite name based on the current state of the object
     def inferSpriteName(self, force:bool=False):
@@ -78,10 +70,7 @@ class Chair(Object):
             return
 
         # Check to see if there is a table north, east, south, or west of us
-        hasTableNorth = self._hasTable(self.attributes["gridX"], self.attributes["gridY"] - 1)
-        hasTableSouth = self._hasTable(self.attributes["gridX"], self.attributes["gridY"] + 1)
-        hasTableEast = self._hasTable(self.attributes["gridX"] + 1, self.attributes["gridY"])
-        hasTableWest = self._hasTable(self.attributes["gridX"] - 1, self.attributes["gridY"])
+        hasTableNorth, hasTableSouth, hasTableWest, hasTableEast = self.world.hasNeighbouringObjs(self.attributes["gridX"], self.attributes["gridY"], ("table",))
 
         # If we have a table to the north, then we need to use the north sprite
         if (hasTableNorth):
@@ -180,6 +169,8 @@ class Fridge(Object):
 
 
 class Sink(Object):
+    tickIsStatic = True
+
     # Constructor
     def __init__(self, world):
         Object.__init__(self, world, "sink", "sink", defaultSpriteName = "house1_sink_off")
@@ -334,6 +325,8 @@ class Stove(Object):
 
 
 class Table(Object):
+    tickIsStatic = True
+
     # Constructor
     def __init__(self, world):
         # Default sprite name
@@ -361,6 +354,8 @@ class Table(Object):
 
 
 class TableBedside(Object):
+    tickIsStatic = True
+
     # Constructor
     def __init__(self, world):
         # Default sprite name
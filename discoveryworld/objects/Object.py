@@ -8,142 +8,370 @@ import numpy as np
 from discoveryworld import ActionSuccess
 
 
-# Storage class for a single object
-class Object:
-
-    # Constructor
-    def __init__(self, world, objectType, objectName, defaultSpriteName, rngSeed=None):
-        self.type = objectType
-        self.name = objectName
-        self.defaultSpriteName = defaultSpriteName
-        self.uuid = world.uuidGenerator.generateUUID()          # Generate a unique integer to represent this object
-        self.rng = random.Random()                              # Random number generator for this object
-
-        # Whether the agent has had tick() called already this past update
-        self.tickCompleted = False
-
-        # Whether the sprite name needs to be recalculated
-        # By default this is off (i.e. static sprites).
-        # If your object changes sprites based on status, then you should set this to True,
-        # especially in tick() whenever the object changes state.
-        self.needsSpriteNameUpdate = False
-
-        # Name of the current and last sprite names
-        self.curSpriteName = None
-        self.curSpriteModifiers = set()
-        self.lastSpriteName = None
-        self.tempLastSpriteName = None      # Used to store what the next 'lastSpriteName' will be -- updated when the backbuffer flips
-
-        # World back-reference
-        self.world = world
-
-        # Properties/attributes
-        self.attributes = {}
-
-        # Initial world location (undefined)
-        if ("gridX" not in self.attributes):
-            self.attributes["gridX"] = -1
-        if ("gridY" not in self.attributes):
-            self.attributes["gridY"] = -1
-
-        # Agent action history (if applicable)
-        self.actionHistory = None
-        self.attributes["isAgent"] = False                          # Is this object an agent? (e.g. a person)
-        self.attributes["isNPC"] = False                            # Is this agent an NPC?
+# Attribute storage for a single object.  This acts like a regular dictionary, with two differences:
+#
+# - Only the attributes that an object changes from the defaults (see DEFAULTS) are stored with the object -- the rest are read from the
+#   shared defaults.  Most objects (e.g. grass, walls, floor tiles) leave nearly all of them unchanged, so this saves a lot of memory (and
+#   construction time) for large worlds.  Mutable defaults (lists/dicts) are copied into the object the first time they're accessed,
+#   since callers may modify them in place.  The most frequently read attributes (HOT_KEYS) are always stored with the object, so
+#   that reading them is a plain dictionary lookup.
+#
+# - Changes to the attributes that the world keeps per-tile information about are reported to the world -- e.g. whether an object can be
+#   walked over (see World.getCostGrid()), or attributes that change which objects World.getObjectsAt() returns (which is cached per tile).
+class ObjectAttributes(dict):
+    # Default attributes, shared by every object
+    DEFAULTS = {
+        # World location (undefined)
+        "gridX": -1,
+        "gridY": -1,
+
+        # Agents
+        "isAgent": False,                           # Is this object an agent? (e.g. a person)
+        "isNPC": False,                             # Is this agent an NPC?
 
         # Default attributes
-        self.attributes["isMovable"] = True                         # Can it be moved?
-        self.attributes["isPassable"] = True                        # Can an agent walk over this?
+        "isMovable": True,                          # Can it be moved?
+        "isPassable": True,                         # Can an agent walk over this?
 
         # Whether this object obscures objects on lower layers (like a floor tile on the furniture layer obscuring grass or soil on the world layer)
-        self.attributes["obscuresObjectsBelow"] = False            # Does it obscure/hide objects on layers below it?
+        "obscuresObjectsBelow": False,              # Does it obscure/hide objects on layers below it?
 
         # Rendering attributes
-        self.attributes["screenXOffset"] = 0                        # Small X offset in rendering contents. This is to make it look like (e.g.) the contents of an object (like a table) are sitting on it.
-        self.attributes["screenYOffset"] = 0                        # Small Y offset in rendering contents. This is to make it look like (e.g.) the contents of an object (like a table) are sitting on it.
+        "screenXOffset": 0,                         # Small X offset in rendering contents. This is to make it look like (e.g.) the contents of an object (like a table) are sitting on it.
+        "screenYOffset": 0,                         # Small Y offset in rendering contents. This is to make it look like (e.g.) the contents of an object (like a table) are sitting on it.
 
         # Materials
-        self.attributes["materials"] = []                           # List of materials that this object is made of
-        self.attributes["manualMaterialNames"] = []                 # A list of material types to add during initialization (in code, rather than from the spreadsheet)
-
-        # Contents (for containers)
-        self.parentContainer = None                                 # Back-reference for the container that this object is in
-        self.attributes['isContainer'] = False                      # Is it a container?
-        self.attributes['isOpenable'] = False                       # If it's a container, can you open/close it?
-        self.attributes['isOpenContainer'] = False                  # If it's a container, then is it open?
-        self.attributes['containerPrefix'] = ""                     # Container prefix (e.g. "in" or "on")
-        self.attributes['isOpen'] = False                           # Closed by default
-        self.attributes['contentsVisible2D'] = True                 # If it is a container, do we render the contents in the 2D representation, or is that already handled (e.g. for pots/jars, that render generic contents if they contain any objects)
-        self.contents = []                                          # Contents of the container (other objects)
+        "materials": [],                            # List of materials that this object is made of
+        "manualMaterialNames": [],                  # A list of material types to add during initialization (in code, rather than from the spreadsheet)
 
-        # Parts (for composite objects -- similar to containers)
-        self.parts = []                                             # List of parts that this object is made of
+        # Containers
+        "isContainer": False,                       # Is it a container?
+        "isOpenable": False,                        # If it's a container, can you open/close it?
+        "isOpenContainer": False,                   # If it's a container, then is it open?
+        "containerPrefix": "",                      # Container prefix (e.g. "in" or "on")
+        "isOpen": False,                            # Closed by default
+        "contentsVisible2D": True,                  # If it is a container, do we render the contents in the 2D representation, or is that already handled (e.g. for pots/jars, that render generic contents if they contain any objects)
 
         # Whether the object has a hole in it (e.g. a hole in the ground), that allows objects to be contained inside it.
-        self.attributes['hasHole'] = False                          # Does it have a hole?
+        "hasHole": False,                           # Does it have a hole?
 
         # Passage (for dynamic passages like doors, that can be opened/closed)
-        self.attributes['isPassage'] = False                        # Is this a passage?
+        "isPassage": False,                         # Is this a passage?
 
         # Device (is activable)
-        self.attributes['isActivatable'] = False                    # Is this a device? (more specifically, can it be activated/deactivated?)
-        self.attributes['isActivated'] = False                      # Is this device currently activated?
-        self.attributes['isUsable'] = False                         # Can this device be used with another object? (e.g. specifically through the 'use' action)
+        "isActivatable": False,                     # Is this a device? (more specifically, can it be activated/deactivated?)
+        "isActivated": False,                       # Is this device currently activated?
+        "isUsable": False,                          # Can this device be used with another object? (e.g. specifically through the 'use' action)
 
         # Dialog attributes
-        self.attributes['isDialogable'] = False                     # Can it be dialoged with?
+        "isDialogable": False,                      # Can it be dialoged with?
 
         # Food attributes
-        self.attributes['isEdible'] = False                         # Can it be eaten?
-        self.attributes['isCooked'] = False                         # Is it cooked?
+        "isEdible": False,                          # Can it be eaten?
+        "isCooked": False,                          # Is it cooked?
 
         # Poison/health attributes
-        self.attributes['isPoisonous'] = False                     # Is it poisonous?
+        "isPoisonous": False,                       # Is it poisonous?
 
         # Can it be used with a shovel (e.g. dug up?).  The function is called useWithShovelResult().
-        self.attributes['isShovelable'] = False                    # Can it be shoveled?
+        "isShovelable": False,                      # Can it be shoveled?
 
         # Readable
-        self.attributes['isReadable'] = False                      # Can it be read?
-        self.attributes['document'] = ""                           # Any text to read
+        "isReadable": False,                        # Can it be read?
+        "document": "",                             # Any text to read
 
         # Temperature
-        self.attributes['temperatureC'] = 20                       # The default object temeprature, in Celsius
-        self.attributes['heatSourceMaxTemp'] = 0                   # If it is a heat source, then this is the maximum temperature that it can reach
-        self.attributes['coolSourceMinTemp'] = 0                   # If it is a cool source, then this is the minimum temperature that it can reach
+        "temperatureC": 20,                         # The default object temeprature, in Celsius
+        "heatSourceMaxTemp": 0,                     # If it is a heat source, then this is the maximum temperature that it can reach
+        "coolSourceMinTemp": 0,                     # If it is a cool source, then this is the minimum temperature that it can reach
 
         # Alive
-        self.attributes['isLiving'] = False                         # Is it alive?
+        "isLiving": False,                          # Is it alive?
 
         # Modifier text, if the object is viewed under a microscope. This is a list of strings, which are displayed in the microscope view.
-        self.attributes['microscopeModifierText'] = []
+        "microscopeModifierText": [],
 
         # Substance properties
-        self.attributes["substanceName"] = ""                     # Name of the substance
-        self.attributes['isSubstance'] = False                    # Is it a substance?
-        self.attributes['isAutoReacting'] = False                 # Does it react automatically with other substances?
-        self.attributes['mixtureDict'] = {}                       # Dictionary of substances and their proportions in the mixture
+        "substanceName": "",                        # Name of the substance
+        "isSubstance": False,                       # Is it a substance?
+        "isAutoReacting": False,                    # Does it react automatically with other substances?
+        "mixtureDict": {},                          # Dictionary of substances and their proportions in the mixture
 
         # Keys
-        self.attributes['requiresKey'] = 0                        # If it requires a key to open/use, then this is a special ID for the key.  If the value is <=0, then it doesn't require a key.
-        self.attributes['keyID'] = 0                              # If this object acts as a key, here's it's ID (0 by default)
+        "requiresKey": 0,                           # If it requires a key to open/use, then this is a special ID for the key.  If the value is <=0, then it doesn't require a key.
+        "keyID": 0,                                 # If this object acts as a key, here's it's ID (0 by default)
 
         # Radiocarbon dating age (in years)
-        self.attributes["radiocarbonAge"] = -1                    # Radiocarbon dating age (in years). -1 means it's not applicable/inconclusive.
-        self.attributes["radioisotopeValues"] = []                # Radioisotope values.  If empty, then it's not applicable/inconclusive.
+        "radiocarbonAge": -1,                       # Radiocarbon dating age (in years). -1 means it's not applicable/inconclusive.
+        "radioisotopeValues": [],                   # Radioisotope values.  If empty, then it's not applicable/inconclusive.
 
         # Soil attributes
-        self.attributes["soilNutrients"] = {}                    # Soil nutrients.  If empty, then it's not applicable/inconclusive.
-        self.attributes["needsNutrientLevels"] = {}              # For seeds/plants: What nutrient levels do they need to grow?
-        self.attributes["antirequirementsNutrientLevels"] = []   # A list of dictionaries, each containing a list of nutrient levels under which the seed/plant will NOT grow
+        "soilNutrients": {},                        # Soil nutrients.  If empty, then it's not applicable/inconclusive.
+        "needsNutrientLevels": {},                  # For seeds/plants: What nutrient levels do they need to grow?
+        "antirequirementsNutrientLevels": [],       # A list of dictionaries, each containing a list of nutrient levels under which the seed/plant will NOT grow
 
         # Object density
-        self.attributes["density"] = 0.0                         # Object density (in g/cm^3). <=0 means it's not applicable/inconclusive.
+        "density": 0.0,                             # Object density (in g/cm^3). <=0 means it's not applicable/inconclusive.
+    }
+
+    # Attributes that are always stored with the object (since they're read very frequently)
+    HOT_KEYS = ("gridX", "gridY", "isPassable", "obscuresObjectsBelow", "isAgent")
+
+    # Derived from DEFAULTS (see below the class):
+    HOT_DEFAULTS = None             # The defaults for HOT_KEYS
+    MUTABLE_DEFAULT_KEYS = None     # Defaults that are mutable (lists/dicts), and are copied into the object the first time they're accessed
+    SHARED_DEFAULTS = None          # Defaults that are immutable, and are not stored with the object when they're set back to their default value
+
+    # Attributes that affect the world's per-tile information (e.g. the cost grid, and the radiation from each tile)
+    TILE_KEYS = frozenset(["isPassable", "isPassage", "obscuresObjectsBelow", "isAgent", "isOpenContainer", "materials"])
+
+    # 'obj': The object that these attributes belong to.  'deletedKeys': The default attributes that have been deleted from this object (or None).
+    __slots__ = ("obj", "deletedKeys")
+
+    def __init__(self, obj):
+        dict.__init__(self, ObjectAttributes.HOT_DEFAULTS)
+        self.obj = obj
+        self.deletedKeys = None
+
+    # Pickling/copying: Only the attributes stored with the object are saved, and restoring them doesn't notify the world.
+    def __reduce__(self):
+        return (ObjectAttributes, (None,), (dict(dict.items(self)), self.obj, self.deletedKeys))
+
+    def __setstate__(self, state):
+        storedAttributes, self.obj, self.deletedKeys = state
+        dict.clear(self)
+        dict.update(self, storedAttributes)
+
+    # Called when an attribute isn't stored with the object -- returns the default value (if any)
+    def __missing__(self, key):
+        if (key not in ObjectAttributes.DEFAULTS) or ((self.deletedKeys != None) and (key in self.deletedKeys)):
+            raise KeyError(key)
+
+        value = ObjectAttributes.DEFAULTS[key]
+        if (key in ObjectAttributes.MUTABLE_DEFAULT_KEYS):
+            # Mutable defaults are copied into the object, since the caller may modify them
+            value = value.copy()
+            dict.__setitem__(self, key, value)
+        return value
+
+    def __setitem__(self, key, value):
+        default = ObjectAttributes.SHARED_DEFAULTS.get(key, self)
+        if (type(value) is type(default)) and (value == default):
+            # Same as the default -- no need to store it with the object
+            dict.pop(self, key, None)
+        else:
+            dict.__setitem__(self, key, value)
+
+        if (self.deletedKeys != None):
+            self.deletedKeys.discard(key)
+
+        if (key in ObjectAttributes.TILE_KEYS) and (self.obj is not None):
+            self.obj.world.invalidateObjectTile(self.obj)
+            # Opening/closing a container changes which objects are visible inside it
+            if (key == "isOpenContainer"):
+                self.obj.invalidateContainedObjectsCache()
+
+    def __delitem__(self, key):
+        if (key not in self):
+            raise KeyError(key)
+        dict.pop(self, key, None)
+        if (key in ObjectAttributes.DEFAULTS):
+            if (self.deletedKeys == None):
+                self.deletedKeys = set()
+            self.deletedKeys.add(key)
+
+        if (key in ObjectAttributes.TILE_KEYS) and (self.obj is not None):
+            self.obj.world.invalidateObjectTile(self.obj)
+
+    def __contains__(self, key):
+        if (dict.__contains__(self, key)):
+            return True
+        return (key in ObjectAttributes.DEFAULTS) and ((self.deletedKeys == None) or (key not in self.deletedKeys))
+
+    def get(self, key, default=None):
+        if (key in self):
+            return self[key]
+        return default
+
+    def setdefault(self, key, default=None):
+        if (key in self):
+            return self[key]
+        self[key] = default
+        return default
+
+    def pop(self, key, *args):
+        if (key in self):
+            value = self[key]
+            del self[key]
+            return value
+        if (len(args) > 0):
+            return args[0]
+        raise KeyError(key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self):
+        dict.clear(self)
+        self.deletedKeys = set(ObjectAttributes.DEFAULTS.keys())
+
+    # Get all the attributes, as a regular dictionary.  The default attributes come first (in the order of DEFAULTS), followed by any others.
+    # Note: Mutable defaults that haven't been accessed yet are returned as new (empty) copies, that aren't stored with the object.
+    def copy(self):
+        out = ObjectAttributes.DEFAULTS.copy()
+        out.update(dict.items(self))
+        for key in ObjectAttributes.MUTABLE_DEFAULT_KEYS:
+            if (out[key] is ObjectAttributes.DEFAULTS[key]):
+                out[key] = out[key].copy()
+        if (self.deletedKeys != None):
+            for key in self.deletedKeys:
+                del out[key]
+        return out
+
+    # Get the attributes that are stored with the object (i.e. that have been changed from the defaults, or accessed if they're mutable), as (key, value) tuples
+    def getStoredItems(self):
+        return dict.items(self)
+
+    def items(self):
+        return list(self.copy().items())
+
+    def keys(self):
+        deletedKeys = self.deletedKeys
+        out = [key for key in ObjectAttributes.DEFAULTS if (dict.__contains__(self, key)) or (deletedKeys == None) or (key not in deletedKeys)]
+        for key in dict.keys(self):
+            if (key not in ObjectAttributes.DEFAULTS):
+                out.append(key)
+        return out
+
+    def values(self):
+        return list(self.copy().values())
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __eq__(self, other):
+        if (isinstance(other, ObjectAttributes)):
+            other = other.copy()
+        return (self.copy() == other)
+
+    def __ne__(self, other):
+        return not (self == other)
+
+    def __repr__(self):
+        return repr(self.copy())
+
+ObjectAttributes.HOT_DEFAULTS = {key: ObjectAttributes.DEFAULTS[key] for key in ObjectAttributes.HOT_KEYS}
+ObjectAttributes.MUTABLE_DEFAULT_KEYS = frozenset([key for key, value in ObjectAttributes.DEFAULTS.items() if isinstance(value, (list, dict))])
+ObjectAttributes.SHARED_DEFAULTS = {key: value for key, value in ObjectAttributes.DEFAULTS.items() if (key not in ObjectAttributes.HOT_KEYS) and (key not in ObjectAttributes.MUTABLE_DEFAULT_KEYS)}
+
+# Storage class for a single object
+class Object:
+    # Tick scheduling (see World.tick()).  Objects with a 'static' tick only do the sprite bookkeeping in Object.tick(), so
+    # the world skips them until they're woken up (e.g. when they're created, moved, or their contents/neighbours change).
+    # By default this is inferred: a class is static unless it overrides tick().  Classes with trivial tick() overrides can set this to True.
+    tickIsStatic = True
+
+    # Object types that this object's sprite depends on being next to (see World.hasNeighbouringObjs()).  When a neighbouring tile gains or loses
+    # an object of one of these types, the object's sprite is marked as needing to be updated, and it's woken up.
+    autotileNeighbourTypes = ()
+
+    # Constructor
+    def __init__(self, world, objectType, objectName, defaultSpriteName, rngSeed=None):
+        self._type = objectType                                 # Object type (see the 'type' property)
+        self.name = objectName
+        self.defaultSpriteName = defaultSpriteName
+        self.uuid = world.uuidGenerator.generateUUID()          # Generate a unique integer to represent this object
+        self._rng = None                                        # Random number generator for this object (see the 'rng' property)
+        world.registerObject(self)                              # Add this object to the world's UUID index
+
+        # Whether the agent has had tick() called already this past update (stored as the step number of the last tick, see the 'tickCompleted' property)
+        self.lastTickStep = -1
+
+        # Whether the sprite name needs to be recalculated
+        # By default this is off (i.e. static sprites).
+        # If your object changes sprites based on status, then you should set this to True,
+        # especially in tick() whenever the object changes state.
+        self.needsSpriteNameUpdate = False
+
+        # Name of the current and last sprite names
+        self.curSpriteName = None
+        self.curSpriteModifiers = set()
+        self.lastSpriteName = None
+        self.tempLastSpriteName = None      # Used to store what the next 'lastSpriteName' will be -- updated when the backbuffer flips
+
+        # World back-reference
+        self.world = world
+
+        # Properties/attributes.  The defaults for the attributes common to all objects (e.g. gridX/gridY, isPassable, materials, etc.) are
+        # in ObjectAttributes.DEFAULTS, and only the attributes that an object changes from those defaults are stored with the object.
+        self.attributes = ObjectAttributes(self)
+
+        # Agent action history (if applicable)
+        self.actionHistory = None
+
+        # Contents (for containers)
+        self.parentContainer = None                                 # Back-reference for the container that this object is in
+        self.containedObjectsCache = {}                             # Cached lists of (recursively) contained objects/parts (see invalidateContainedObjectsCache())
+        self.contents = []                                          # Contents of the container (other objects)
+
+        # Parts (for composite objects -- similar to containers)
+        self.parts = []                                             # List of parts that this object is made of
 
         # Force a first infer-sprite-name
         # NOTE: Moved to a global update (since other objects that the sprite depends on may not be populated yet when it is created)
         self.firstInit = True
 
+    # Object type.  Setting it keeps the world's type index (used by World.findObjects()) up-to-date.
+    @property
+    def type(self):
+        return self._type
+
+    @type.setter
+    def type(self, value):
+        oldType = self._type
+        self._type = value
+        self.world.updateObjectTypeIndex(self, oldType)
+
+    # Whether this object has had tick() called already during the current world step.
+    # Stored as a step number (rather than a flag), so it doesn't need to be reset on every object at the start of each step.
+    @property
+    def tickCompleted(self):
+        return (self.lastTickStep == self.world.step)
+
+    @tickCompleted.setter
+    def tickCompleted(self, value):
+        if (value):
+            self.lastTickStep = self.world.step
+        else:
+            self.lastTickStep = -1
+
+    # Returns true if objects of this class have a 'static' tick (see 'tickIsStatic' above)
+    @classmethod
+    def hasStaticTick(cls):
+        for klass in cls.__mro__:
+            # An explicit setting takes precedence
+            if ("tickIsStatic" in klass.__dict__):
+                return klass.__dict__["tickIsStatic"]
+            # Otherwise, overriding tick() means the object does something every tick
+            if ("tick" in klass.__dict__):
+                return False
+        return False
+
+    # Random number generator for this object.  This is only created the first time it's used, since most objects never need one.
+    @property
+    def rng(self):
+        if (self._rng == None):
+            self._rng = random.Random()
+        return self._rng
+
+    @rng.setter
+    def rng(self, value):
+        self._rng = value
+
     def seed(self, seed):
         # Seed the random number generator
         self.rng.seed(seed)
@@ -234,8 +462,13 @@ class Object:
         self.contents.append(obj)
         # Set the parent container
         obj.parentContainer = self
+        self.invalidateContainedObjectsCache()
         # Set the world location to the same as the parent container
         obj.setWorldLocation(self.attributes["gridX"], self.attributes["gridY"])
+        # Both objects have changed, so make sure they're ticked next step
+        self.world.wakeObjectForTick(self)
+        self.world.wakeObjectForTick(obj)
+        self.world.invalidateObjectTile(self)
 
 
     # Add an object (obj) as a part of this object
@@ -246,6 +479,9 @@ class Object:
         # Add an object as part (using parentContainer as a backreference to whole)
         self.parts.append(obj)
         obj.parentContainer = self
+        self.invalidateContainedObjectsCache()
+        self.world.wakeObjectForTick(self)
+        self.world.invalidateObjectTile(self)
 
     # Remove an object from this container
     # TODO: Should also remove it from specific world coordinates?
@@ -255,10 +491,16 @@ class Object:
         if (obj in self.contents):
             self.contents.remove(obj)
             obj.parentContainer = None
+            self.invalidateContainedObjectsCache()
+            self.world.wakeObjectForTick(self)
+            self.world.invalidateObjectTile(self)
             return True
         elif (obj in self.parts):
             self.parts.remove(obj)
             obj.parentContainer = None
+            self.invalidateContainedObjectsCache()
+            self.world.wakeObjectForTick(self)
+            self.world.invalidateObjectTile(self)
             return True
         else:
             return False
@@ -286,33 +528,39 @@ class Object:
             parentContainerCopy.contents.insert(idx, obj)
             # Set the parent container
             obj.parentContainer = parentContainerCopy
+            parentContainerCopy.invalidateContainedObjectsCache()
+            self.world.wakeObjectForTick(obj)
+            self.world.invalidateObjectTile(parentContainerCopy)
+            # This object has left the world, so it no longer needs its region subscriptions (if any)
+            self.world.unsubscribeOwnerFromRegions(self)
 
 
     # Get all contained objects
+    # The result is cached (see invalidateContainedObjectsCache()), and returned as a new list that the caller can modify.
     def getAllContainedObjectsRecursive(self, respectContainerStatus=False):
+        return list(self._getAllContainedObjectsRecursive(respectContainerStatus))
+
+    # Get all contained objects (as a cached tuple, that must not be modified)
+    def _getAllContainedObjectsRecursive(self, respectContainerStatus):
+        cacheKey = ("contents", bool(respectContainerStatus))
+        out = self.containedObjectsCache.get(cacheKey)
+        if (out != None):
+            return out
+
         # Get all contained objects, recursively
         out = []
-        ##print("getAllContainedObjectsRecursive: " + self.name + " (" + str(self.attributes['isOpenContainer']) + ") ." )
-        ##print("\tList of all objects in this container: " + str([obj.name for obj in self.contents]))
         # If this is a container, and it's open, then add the contents
         if (not respectContainerStatus) or (respectContainerStatus and self.attributes['isOpenContainer']):
             for obj in self.contents:
-
-                ## DEBUG
-                # if (obj.parentContainer != None):
-                #     print("\tFound " + obj.name + " (" + str(obj.uuid) + "), which is contained in: " + obj.parentContainer.name + " (" + str(obj.parentContainer.uuid) + ")")
-                #     if (len(obj.contents) > 0):
-                #         print("\t\t it has the following immediate contents: ")
-                #         for obj2 in obj.contents:
-                #             print("\t\t\t" + obj2.name + " (" + str(obj2.uuid) + ")")
-
                 # Add self
                 out.append(obj)
 
                 # Add children
-                out.extend(obj.getAllContainedObjectsRecursive(respectContainerStatus))
+                out.extend(obj._getAllContainedObjectsRecursive(respectContainerStatus))
 
         # Return
+        out = tuple(out)
+        self.containedObjectsCache[cacheKey] = out
         return out
 
     # Get one or more objects of a specific type.
@@ -347,29 +595,43 @@ class Object:
         return out
 
     # Get all contained objects and parts, do not respect containers (this is typically used for dumping the objects to a file)
+    # Returns this object, followed by its contents and parts (each followed by their own contents and parts, recursively).
+    # The result is cached (see invalidateContainedObjectsCache()), and returned as a new list that the caller can modify.
     def getAllContainedObjectsAndParts(self, includeContents=True, includeParts=True):
-        # TODO: Fix this so it doesn't require the list(set()) hack (which prevents the duplicates, but is slow)
+        return list(self._getAllContainedObjectsAndParts(includeContents, includeParts))
+
+    # Get all contained objects and parts (as a cached tuple, that must not be modified)
+    def _getAllContainedObjectsAndParts(self, includeContents, includeParts):
+        cacheKey = ("all", bool(includeContents), bool(includeParts))
+        out = self.containedObjectsCache.get(cacheKey)
+        if (out != None):
+            return out
+
         out = []
         # Add self
         out.append(self)
 
+        # Add children (each child's list starts with the child itself)
         if (includeContents):
             for obj in self.contents:
-                # Add self
-                out.append(obj)
-
-                # Add children
-                out.extend(obj.getAllContainedObjectsAndParts(includeContents, includeParts))
+                out.extend(obj._getAllContainedObjectsAndParts(includeContents, includeParts))
 
         if (includeParts):
             for obj in self.parts:
-                # Add self
-                out.append(obj)
-                # Add children
-                out.extend(obj.getAllContainedObjectsAndParts(includeContents, includeParts))
+                out.extend(obj._getAllContainedObjectsAndParts(includeContents, includeParts))
 
         # Return
-        return list(set(out))
+        out = tuple(out)
+        self.containedObjectsCache[cacheKey] = out
+        return out
+
+    # Note that the contents or parts of this object have changed (or whether it's open).  This clears the cached lists of contained objects
+    # (see getAllContainedObjectsRecursive() and getAllContainedObjectsAndParts()) for this object, and every container it's (recursively) inside of.
+    def invalidateContainedObjectsCache(self):
+        obj = self
+        while (obj != None):
+            obj.containedObjectsCache.clear()
+            obj = obj.parentContainer
 
     # Get outermost closed container (if this object is contained in a closed container).
     # Essentially answers the question: "What is the next container that I'd have to open to (eventually) get at this object?"
@@ -446,6 +708,7 @@ class Object:
             obj.tick()
 
     # Reset the tick flag for this object (and all contained objects and parts)
+    # Note: World.tick() no longer needs to call this each step, since 'tickCompleted' is tracked per step number.
     def resetTick(self):
         # Reset the tick flag for this object
         self.tickCompleted = False
@@ -531,6 +794,7 @@ class Object:
         # Step 2: Invalidate the sprite names for all objects at this world tile
         for obj in allObjs:
             obj.needsSpriteNameUpdate = True
+            self.world.wakeObjectForTick(obj)
             #for containedObj in obj.getAllContainedObjectsRecursive():
             #    containedObj.needsSpriteNameUpdate = True
 
@@ -698,12 +962,11 @@ class Object:
             packed["parts"].append( {"objUUID": obj.uuid} )
 
         # Serialize attributes
-        for key in self.attributes:
-            value = self.attributes[key]
-            # Skip any non-primitive types (but allow lists and dicts)
+        packed["attributes"] = self.attributes.copy()
+        # Skip any non-primitive types (but allow lists and dicts).  The default attributes are all primitive types, so only the attributes stored with the object need to be checked.
+        for key, value in self.attributes.getStoredItems():
             if type(value) not in (str, int, float, bool, list, dict, set):
-                continue
-            packed["attributes"][key] = value
+                del packed["attributes"][key]
 
 
         # Serialize action history, if applicable
@@ -103,8 +103,9 @@ class GeneratorCenter(Object):
         # We could look this up each tick, but it would be expensive.
         if (len(self.attributes['linkedObjectsActivationState']) != len(self.linkedObjectsActivationState)):
             self.linkedObjectsActivationState = []
-            for worldObj in self.world.getAllWorldObjects():
-                if (worldObj.uuid in self.attributes['linkedObjectsActivationState']):
+            for linkedUUID in self.attributes['linkedObjectsActivationState']:
+                worldObj = self.world.getObjectByUUID(linkedUUID)
+                if (worldObj != None):
                     self.linkedObjectsActivationState.append(worldObj)
 
         # Check if all the objects that it's paired with are activated
@@ -674,6 +674,8 @@ class CountingComputer(Object):
                 self.flagpole.current_height = min(self.flagpole.current_height + floppy_disk.value, self.flagpole.height-1)
 
             if self.flagpole.current_height != old_height:
+                # The flag is drawn at a different height, so the flagpole's tile has changed
+                self.world.invalidateObjectTile(self.flagpole)
                 useDescriptionStr = "You hear a bip from the computer and notice the flagpole has moved.\n"
             else:
                 useDescriptionStr = "You hear a bip from the computer but nothing happened.\n"
@@ -763,6 +765,8 @@ class ProteomicsMeter(Object):
 #   Glowing Rock (that detects poisonous mushrooms)
 #
 class GlowingRockDetector(Object):
+    tickIsStatic = True                     # Only changes when it moves, or the objects around it change (see _onRegionChanged())
+
     def __init__(self, world):
         Object.__init__(self, world, "rock (glowing)", "rock (glowing)", defaultSpriteName="cave1_rock_glowing")
         self.attributes['isUsable'] = False
@@ -776,6 +780,9 @@ class GlowingRockDetector(Object):
         # By default, not luminous
         self.attributes["isLuminous"] = False
 
+        # Subscription to the area around the rock (see tick())
+        self.detectionSubscription = None
+
     #
     # Tick
     #
@@ -788,19 +795,14 @@ class GlowingRockDetector(Object):
         worldX = self.attributes["gridX"]
         worldY = self.attributes["gridY"]
         detectionSpan = 1
+        # Subscribe to the area around the rock (or move the subscription, if the rock has moved).  The subscription wakes the rock up when something
+        # in the area changes, so it doesn't need to be ticked otherwise (it's also woken up when it's moved, or ticked along with a container it's in).
+        self.detectionSubscription = self.world.updateRegionSubscription(self.detectionSubscription, worldX - detectionSpan, worldY - detectionSpan, worldX + detectionSpan, worldY + detectionSpan, predicate=self._isDetectedObject, includeContents=True, callback=self._onRegionChanged, owner=self)
+        if (not self.detectionSubscription.hasChanges()):
+            return
+
         # Check the area around the rock
-        detected = False
-        for x in range(worldX - detectionSpan, worldX + detectionSpan + 1):
-            for y in range(worldY - detectionSpan, worldY + detectionSpan + 1):
-                # Get the object at this location
-                # def getObjectsAt(self, x, y, respectContainerStatus=False, includeParts=False, excludeObjectsOnAgents=False, respectObscuringLowerLayers=False, includeContents=True):
-                objs = self.world.getObjectsAt(x, y, respectContainerStatus=False, includeParts=False, excludeObjectsOnAgents=False, respectObscuringLowerLayers=False, includeContents=True)
-                for obj in objs:
-                    ##print("Checking object: " + obj.name + " (" + obj.type + ")  isPoisonous: " + str(obj.attributes['isPoisonous']) )
-                    if (obj.type == "mushroom") and (obj.attributes['isPoisonous'] == True):
-                        detected = True
-                        #print("\t DETECTED!")
-                        break
+        detected = (len(self.detectionSubscription.getMatchingObjects()) > 0)
 
         # If a poisonous mushroom was detected, then change the sprite to the glowing rock
         if (detected):
@@ -816,6 +818,14 @@ class GlowingRockDetector(Object):
                 self.needsSpriteNameUpdate = True
             # Otherwise, no change needed
 
+    # Returns true if an object near the rock should be detected (i.e. it's a poisonous mushroom)
+    def _isDetectedObject(self, obj):
+        return (obj.type == "mushroom") and (obj.attributes['isPoisonous'] == True)
+
+    # Called when something in the area around the rock changes (see tick()), to re-check it on the next tick
+    def _onRegionChanged(self, subscription):
+        self.world.wakeObjectForTick(self)
+
     # Sprite
     # Updates the current sprite name based on the current state of the object
     def inferSpriteName(self, force:bool=False):
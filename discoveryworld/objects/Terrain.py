@@ -1,6 +1,8 @@
 from discoveryworld.objects.Object import Object
 
 class CaveFloor(Object):
+    tickIsStatic = True
+
     # Constructor
     def __init__(self, world):
         Object.__init__(self, world, "floor", "cave floor", defaultSpriteName = "cave1_rock_floor")
@@ -38,6 +40,9 @@ class CaveFloor(Object):
 
 
 class CaveWall(Object):
+    tickIsStatic = True
+    autotileNeighbourTypes = ("wall", "door", "floor")     # Sprite depends on the neighbouring tiles
+
     # TODO: Most of the interior wall parts of this code are disabled -- so they can either be removed, or the sprite sheet can be modified to include interior walls.
 
     # Constructor
@@ -65,32 +70,6 @@ class CaveWall(Object):
         # Call superclass
         Object.tick(self)
 
-    # Helper function to get the neighbouring walls
-    def _hasWall(self, x, y):
-        # Check to see if there is a wall at the given location
-        # First, get objects at a given location
-        objects = self.world.getObjectsAt(x, y)
-        # Then, check to see if any of them are walls
-        for object in objects:
-            if (object.type == "wall"):
-                return (True, object.wallShape)
-            elif (object.type == "door"):
-                return (True, "")
-        # If we get here, there are no walls
-        return (False, "")
-
-    # Helper function to get the neighbouring walls
-    def _hasFloor(self, x, y):
-        # Check to see if there is a wall at the given location
-        # First, get objects at a given location
-        objects = self.world.getObjectsAt(x, y)
-        # Then, check to see if any of them are walls
-        for object in objects:
-            if object.type == "floor":
-                return True
-        # If we get here, there are no walls
-        return False
-
 
     # def getSpriteName(self):
     #     # Get the current sprite name, in response to the current state of the object
@@ -106,17 +85,11 @@ class CaveWall(Object):
             # No need to update the sprite name
             return
 
-        # Check to see what the neighbouring walls are
-        hasWallNorth, wallShapeNorth = self._hasWall(self.attributes["gridX"], self.attributes["gridY"] - 1)
-        hasWallSouth, wallShapeSouth = self._hasWall(self.attributes["gridX"], self.attributes["gridY"] + 1)
-        hasWallWest, wallShapeWest = self._hasWall(self.attributes["gridX"] - 1, self.attributes["gridY"])
-        hasWallEast, wallShapeEast = self._hasWall(self.attributes["gridX"] + 1, self.attributes["gridY"])
+        # Check to see what the neighbouring walls are (doors count as walls)
+        hasWallNorth, hasWallSouth, hasWallWest, hasWallEast = self.world.hasNeighbouringObjs(self.attributes["gridX"], self.attributes["gridY"], ("wall", "door"))
 
         # Check to see if there is neighbouring floor
-        hasFloorNorth = self._hasFloor(self.attributes["gridX"], self.attributes["gridY"] - 1)
-        hasFloorSouth = self._hasFloor(self.attributes["gridX"], self.attributes["gridY"] + 1)
-        hasFloorWest = self._hasFloor(self.attributes["gridX"] - 1, self.attributes["gridY"])
-        hasFloorEast = self._hasFloor(self.attributes["gridX"] + 1, self.attributes["gridY"])
+        hasFloorNorth, hasFloorSouth, hasFloorWest, hasFloorEast = self.world.hasNeighbouringObjs(self.attributes["gridX"], self.attributes["gridY"], ("floor",))
 
         #isInterior = (hasFloorNorth and hasFloorSouth) or (hasFloorWest and hasFloorEast)
         isInterior = False
@@ -300,6 +273,9 @@ class Door(Object):
 
 
 class Fence(Object):
+    tickIsStatic = True
+    autotileNeighbourTypes = ("fence",)     # Sprite depends on the neighbouring tiles
+
     # Constructor
     def __init__(self, world):
         # Default sprite name
@@ -323,10 +299,7 @@ class Fence(Object):
             return
 
         # Check to see if the neighbouring tiles have paths
-        hasFenceNorth = self.world.hasObj(self.attributes["gridX"], self.attributes["gridY"] - 1, "fence")
-        hasFenceSouth = self.world.hasObj(self.attributes["gridX"], self.attributes["gridY"] + 1, "fence")
-        hasFenceWest = self.world.hasObj(self.attributes["gridX"] - 1, self.attributes["gridY"], "fence")
-        hasFenceEast = self.world.hasObj(self.attributes["gridX"] + 1, self.attributes["gridY"], "fence")
+        hasFenceNorth, hasFenceSouth, hasFenceWest, hasFenceEast = self.world.hasNeighbouringObjs(self.attributes["gridX"], self.attributes["gridY"], ("fence",))
 
         # 4 positives (should never happen unless something is wonky -- just in case, place a single fence)
         if (hasFenceNorth and hasFenceSouth and hasFenceEast and hasFenceWest):
@@ -377,6 +350,8 @@ class Fence(Object):
 
 
 class Floor(Object):
+    tickIsStatic = True
+
     # Constructor
     def __init__(self, world):
         Object.__init__(self, world, "floor", "floor", defaultSpriteName = "house2_floor")
@@ -415,6 +390,8 @@ class Floor(Object):
 
 
 class Grass(Object):
+    tickIsStatic = True
+
     # Constructor
     def __init__(self, world):
         # Default sprite name
@@ -430,6 +407,9 @@ class Grass(Object):
 
 
 class Path(Object):
+    tickIsStatic = True
+    autotileNeighbourTypes = ("path",)     # Sprite depends on the neighbouring tiles
+
     # Constructor
     def __init__(self, world):
         # Default sprite name
@@ -455,10 +435,7 @@ class Path(Object):
             return
 
         # Check to see if the neighbouring tiles have paths
-        hasPathNorth = self.world.hasObj(self.attributes["gridX"], self.attributes["gridY"] - 1, "path")
-        hasPathSouth = self.world.hasObj(self.attributes["gridX"], self.attributes["gridY"] + 1, "path")
-        hasPathWest = self.world.hasObj(self.attributes["gridX"] - 1, self.attributes["gridY"], "path")
-        hasPathEast = self.world.hasObj(self.attributes["gridX"] + 1, self.attributes["gridY"], "path")
+        hasPathNorth, hasPathSouth, hasPathWest, hasPathEast = self.world.hasNeighbouringObjs(self.attributes["gridX"], self.attributes["gridY"], ("path",))
 
         # 4 positives
         if (hasPathNorth and hasPathSouth and hasPathEast and hasPathWest):
@@ -509,6 +486,8 @@ class Path(Object):
 
 
 class Sign(Object):
+    tickIsStatic = True
+
     # Constructor
     def __init__(self, world, variant=None, text="This is a sign."):
         self.variant = variant
@@ -567,6 +546,8 @@ class Sign(Object):
 
 
 class SignVillage(Object):
+    tickIsStatic = True
+
     ### TODO: CURRENTLY DOES NOT HANDLE THAT ITS A MULTI-TILE OBJECT
 
     # Constructor
@@ -631,6 +612,8 @@ class SignVillage(Object):
 
 
 class Statue(Object):
+    tickIsStatic = True
+
     # Constructor
     def __init__(self, world):
         # Default sprite name
@@ -653,6 +636,9 @@ class Statue(Object):
 
 
 class Wall(Object):
+    tickIsStatic = True
+    autotileNeighbourTypes = ("wall", "door", "floor")     # Sprite depends on the neighbouring tiles
+
     # Constructor
     def __init__(self, world):
         # Note: Change the default sprite name to something obviously incorrect so it is obvious when it's not inferring properly.
@@ -679,32 +665,6 @@ class Wall(Object):
         # Call superclass
         Object.tick(self)
 
-    # Helper function to get the neighbouring walls
-    def _hasWall(self, x, y):
-        # Check to see if there is a wall at the given location
-        # First, get objects at a given location
-        objects = self.world.getObjectsAt(x, y)
-        # Then, check to see if any of them are walls
-        for object in objects:
-            if (object.type == "wall"):
-                return (True, object.wallShape)
-            elif (object.type == "door"):
-                return (True, "")
-        # If we get here, there are no walls
-        return (False, "")
-
-    # Helper function to get the neighbouring walls
-    def _hasFloor(self, x, y):
-        # Check to see if there is a wall at the given location
-        # First, get objects at a given location
-        objects = self.world.getObjectsAt(x, y)
-        # Then, check to see if any of them are walls
-        for object in objects:
-            if object.type == "floor":
-                return True
-        # If we get here, there are no walls
-        return False
-
     # Sprite
     # Updates the current sprite name based on the current state of the object
     def inferSpriteName(self, force:bool=False):
@@ -712,17 +672,11 @@ class Wall(Object):
             # No need to update the sprite name
             return
 
-        # Check to see what the neighbouring walls are
-        hasWallNorth, wallShapeNorth = self._hasWall(self.attributes["gridX"], self.attributes["gridY"] - 1)
-        hasWallSouth, wallShapeSouth = self._hasWall(self.attributes["gridX"], self.attributes["gridY"] + 1)
-        hasWallWest, wallShapeWest = self._hasWall(self.attributes["gridX"] - 1, self.attributes["gridY"])
-        hasWallEast, wallShapeEast = self._hasWall(self.attributes["gridX"] + 1, self.attributes["gridY"])
+        # Check to see what the neighbouring walls are (doors count as walls)
+        hasWallNorth, hasWallSouth, hasWallWest, hasWallEast = self.world.hasNeighbouringObjs(self.attributes["gridX"], self.attributes["gridY"], ("wall", "door"))
 
         # Check to see if there is neighbouring floor
-        hasFloorNorth = self._hasFloor(self.attributes["gridX"], self.attributes["gridY"] - 1)
-        hasFloorSouth = self._hasFloor(self.attributes["gridX"], self.attributes["gridY"] + 1)
-        hasFloorWest = self._hasFloor(self.attributes["gridX"] - 1, self.attributes["gridY"])
-        hasFloorEast = self._hasFloor(self.attributes["gridX"] + 1, self.attributes["gridY"])
+        hasFloorNorth, hasFloorSouth, hasFloorWest, hasFloorEast = self.world.hasNeighbouringObjs(self.attributes["gridX"], self.attributes["gridY"], ("floor",))
 
         isInterior = (hasFloorNorth and hasFloorSouth) or (hasFloorWest and hasFloorEast)
 
@@ -842,6 +796,9 @@ class Sand(Object):
         # self.attributes["manualMaterialNames"] = ["PlantMatterGeneric"]
 
 class SandPath(Object):
+    tickIsStatic = True
+    autotileNeighbourTypes = ("path",)     # Sprite depends on the neighbouring tiles
+
     # Constructor
     def __init__(self, world):
         # Default sprite name
@@ -867,10 +824,7 @@ class SandPath(Object):
             return
 
         # Check to see if the neighbouring tiles have paths
-        hasPathNorth = self.world.hasObj(self.attributes["gridX"], self.attributes["gridY"] - 1, "path")
-        hasPathSouth = self.world.hasObj(self.attributes["gridX"], self.attributes["gridY"] + 1, "path")
-        hasPathWest = self.world.hasObj(self.attributes["gridX"] - 1, self.attributes["gridY"], "path")
-        hasPathEast = self.world.hasObj(self.attributes["gridX"] + 1, self.attributes["gridY"], "path")
+        hasPathNorth, hasPathSouth, hasPathWest, hasPathEast = self.world.hasNeighbouringObjs(self.attributes["gridX"], self.attributes["gridY"], ("path",))
 
         # 4 positives
         if (hasPathNorth and hasPathSouth and hasPathEast and hasPathWest):